@@ -0,0 +1,133 @@
+import os
+import json
+import hashlib
+import zipfile
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+### Versioned binary artifacts (fitted regressions, design maps) so that a process can map saved arrays instead of recomputing them. An artifact is an
+### uncompressed .npz file, or an HDF5 file when the path ends in .h5 and h5py is installed, holding named arrays and a JSON header with the format
+### version and a fingerprint of everything the arrays were computed from. Arrays are only read when they are accessed: .npz members are memory-mapped
+### straight out of the zip file, and HDF5 datasets are read on access.
+
+FORMAT_VERSION = 1
+
+def fingerprint(*objects): # sha1 of the repr of the objects, used to detect artifacts computed from different data
+    sha = hashlib.sha1()
+    for obj in objects:
+        sha.update(repr(obj).encode("utf-8"))
+
+    return(sha.hexdigest())
+
+def module_fingerprint(module): # fingerprint of the numbers, strings and lists defined in an input module such as dep_input_file
+    values = sorted((name, val) for name, val in vars(module).items() if not name.startswith("_") and isinstance(val, (int, float, str, list, tuple)))
+
+    return(fingerprint(values))
+
+def _is_hdf5(path):
+    return(path.endswith(".h5") or path.endswith(".hdf5"))
+
+def _atomic_write(path, write): # calls write(tmp) with a temporary path next to path, then moves it over path, so that a process reading path never sees half of a file
+    tmp = "%s.%s.tmp" %(path, os.getpid())
+    try:
+        write(tmp)
+        os.replace(tmp, path)   # os.rename would not replace an existing file on Windows
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def save_artifact(path, arrays, kind, fingerprint, **meta): # writes the arrays and header to path, replacing it atomically
+    header = dict(meta, kind = kind, version = FORMAT_VERSION, fingerprint = fingerprint)
+
+    def write(tmp):
+        if _is_hdf5(path):
+            if h5py is None:
+                raise Exception("Saving %s needs h5py, which is not installed. Use a .npz path instead" %(path))
+            with h5py.File(tmp, "w") as f:
+                f.attrs["header"] = json.dumps(header)
+                for name, values in arrays.items():
+                    f.create_dataset(name, data = np.asarray(values))
+        else:
+            with open(tmp, "wb") as f:
+                np.savez(f, __header__ = np.array(json.dumps(header)), **dict((name, np.ascontiguousarray(values)) for name, values in arrays.items()))
+
+    _atomic_write(path, write)
+
+class Artifact(object): # Read only, lazy view of a saved artifact. artifact["name"] returns the array, artifact.header the JSON header
+
+    def __init__(self, path):
+        self.path = path
+        self._arrays = {}
+        if _is_hdf5(path):
+            if h5py is None:
+                raise Exception("Loading %s needs h5py, which is not installed" %(path))
+            self._file = h5py.File(path, "r")
+            self.header = json.loads(self._file.attrs["header"])
+            self._names = list(self._file.keys())
+        else:
+            self._file = None
+            self._offsets = self._npz_offsets(path)
+            self.header = json.loads(str(self._read_npz("__header__")))
+            self._names = [name for name in self._offsets if name != "__header__"]
+
+        if self.header.get("version") != FORMAT_VERSION:
+            raise Exception("%s has artifact format version %s, this code reads version %s" %(path, self.header.get("version"), FORMAT_VERSION))
+
+    @staticmethod
+    def _npz_offsets(path): # byte offset of every member's .npy data inside the zip file
+        offsets = {}
+        with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+            for info in archive.infolist():
+                if info.compress_type != zipfile.ZIP_STORED:
+                    raise Exception("%s is compressed and cannot be memory-mapped, save it with save_artifact" %(path))
+                f.seek(info.header_offset + 26)
+                name_length, extra_length = np.frombuffer(f.read(4), dtype = "<u2")
+                offsets[info.filename[:-len(".npy")]] = info.header_offset + 30 + int(name_length) + int(extra_length)
+
+        return(offsets)
+
+    def _read_npz(self, name):
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[name])
+            readers = {(1, 0): np.lib.format.read_array_header_1_0, (2, 0): np.lib.format.read_array_header_2_0}
+            version = np.lib.format.read_magic(f)
+            if version not in readers:   # version 3.0 headers (unicode field names) are read whole
+                f.seek(self._offsets[name])
+                return(np.lib.format.read_array(f))
+            shape, fortran_order, dtype = readers[version](f)
+            if dtype.hasobject or shape == ():
+                f.seek(self._offsets[name])
+                return(np.lib.format.read_array(f))
+            offset = f.tell()
+
+        return(np.memmap(self.path, dtype = dtype, mode = "r", offset = offset, shape = shape, order = "F" if fortran_order else "C"))
+
+    def __getitem__(self, name):
+        if name not in self._arrays:
+            if name not in self._names:
+                raise KeyError("%s has no array named %s" %(self.path, name))
+            self._arrays[name] = self._file[name] if self._file is not None else self._read_npz(name)
+
+        return(self._arrays[name])
+
+    def keys(self):
+        return(list(self._names))
+
+    def is_stale(self, fingerprint): # True if the artifact was computed from different data than the current fingerprint
+        return(self.header.get("fingerprint") != fingerprint)
+
+    def close(self):
+        self._arrays = {}
+        if self._file is not None:
+            self._file.close()
+
+def load_artifact(path, kind = None): # opens an artifact without reading its arrays
+    artifact = Artifact(path)
+    if kind is not None and artifact.header.get("kind") != kind:
+        raise Exception("%s holds a %s artifact, not a %s artifact" %(path, artifact.header.get("kind"), kind))
+
+    return(artifact)
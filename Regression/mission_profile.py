@@ -0,0 +1,130 @@
+import numpy as np
+from openmdao.api import ExplicitComponent, Group, IndepVarComp, Problem
+from w_motor_reg import Regression, catalog
+from w_gearbox import GearboxWeight
+from num_motors import NumMotors
+
+### The motor catalog gives both a rated power (pwr) and a 15 second peak power (pwr_max). This file sizes a motor + gearbox for a whole mission power profile
+### in one pass: the rated power is set either by the peak of the profile (divided by the catalog peak to rated ratio) or by the highest power that is held
+### for longer than the peak duration, whichever is larger.
+
+class MissionSizing(ExplicitComponent): # This component reduces a power time series to the rated power that the motor must be sized for
+
+    def initialize(self):
+        self.options.declare("num_nodes", default = 1, types = int, desc = "Number of time steps in the mission profile")
+        self.options.declare("dt", default = 1., desc = "Time step of the mission profile in seconds")
+        self.options.declare("peak_ratio", default = 1., desc = "Ratio of peak power to rated power that the motor can deliver")
+        self.options.declare("peak_duration", default = 15., desc = "Time in seconds that the motor can run above its rated power")
+        self.options.declare("sizing", default = "auto", values = ["auto", "peak", "continuous"], desc = "auto sizes for both the peak and the sustained power, peak only for the peak, and continuous rates the motor at the maximum power")
+
+    def setup(self):
+        n = self.options["num_nodes"]
+        self.window = int(np.ceil(self.options["peak_duration"] / self.options["dt"] - 1e-9)) + 1   # number of steps that exceed the peak duration
+
+        self.add_input("power", val = 500. * np.ones(n), units = "kW", desc = "Power required from each motor at each time step")
+        self.add_output("rated_power", units = "kW", desc = "Rated power the motor is sized for")
+        self.add_output("peak_sized", desc = "1 if the rated power is set by the peak power of the profile, 0 if it is set by a sustained power")
+        self.add_output("over_rating", shape = n, desc = "1 at the time steps where the motor runs above its rated power")
+        self.add_output("time_over_rating", shape = n, units = "s", desc = "Time the motor has been above its rated power at each time step")
+        self.add_output("over_duration", shape = n, desc = "1 at the time steps where the motor has been above its rated power for longer than the peak duration")
+
+        self.declare_partials("rated_power", "power")
+
+    def sizing_point(self, power): # returns the index of the time step that sets the rated power, the factor between that power and the rated power, and whether it is the peak
+        peak = np.argmax(power)
+        if self.options["sizing"] == "continuous":
+            return(peak, 1., 1.)
+        peak_power = power[peak] / self.options["peak_ratio"]
+        if self.options["sizing"] == "peak" or self.window > np.size(power):
+            return(peak, 1. / self.options["peak_ratio"], 1.)
+
+        window_min = np.lib.stride_tricks.sliding_window_view(power, self.window).min(axis = 1)   # lowest power in each window longer than the peak duration
+        start = np.argmax(window_min)
+        if peak_power >= window_min[start]:
+            return(peak, 1. / self.options["peak_ratio"], 1.)
+
+        return(start + np.argmin(power[start:start + self.window]), 1., 0.)
+
+    def compute(self, inputs, outputs):
+        power = inputs["power"]
+        index, scale, peak_sized = self.sizing_point(power.real)
+
+        outputs["rated_power"] = power[index] * scale
+        outputs["peak_sized"] = peak_sized
+
+        over = power.real > outputs["rated_power"].real * (1 + 1e-12)
+        steps = np.cumsum(over)
+        run_steps = steps - np.maximum.accumulate(np.where(over, 0, steps))   # number of consecutive steps above rating, reset whenever the motor drops below it
+        outputs["over_rating"] = over
+        outputs["time_over_rating"] = run_steps * self.options["dt"]
+        outputs["over_duration"] = run_steps * self.options["dt"] > self.options["peak_duration"]
+
+    def compute_partials(self, inputs, J):
+        index, scale, peak_sized = self.sizing_point(inputs["power"].real)
+
+        J["rated_power", "power"] = 0.
+        J["rated_power", "power"][0, index] = scale
+
+class MissionProfile(Group): # This group sizes the motors and gearboxes for a mission power profile
+
+    def initialize(self):
+        self.options.declare("profile", default = np.array([500.]), desc = "Power required from each motor at each time step in kW")
+        self.options.declare("dt", default = 1., desc = "Time step of the mission profile in seconds")
+        self.options.declare("peak_duration", default = 15., desc = "Time in seconds that the motor can run above its rated power")
+        self.options.declare("sizing", default = "auto", values = ["auto", "peak", "continuous"], desc = "Which power the motor is rated for, see MissionSizing")
+        self.options.declare("K_gearbox_metric", default = 32.688, desc = "Technology level of gearbox")
+        self.options.declare("prop_RPM", default = 4000, desc = "Propeller RPM, slower gearbox speed in RPM")
+        self.options.declare("motor_rpm", default = 20000, desc = "Motor speed in RPM")
+        self.options.declare("num_motors", default = 4, desc = "Number of motors")
+        self.options.declare("keywords", default = ["Axial"], types = list, desc = "Keywords to specify type of motor")
+
+    def setup(self):
+        profile = np.asarray(self.options["profile"], dtype = float)
+        data = catalog.project(catalog.query(self.options["keywords"]), ["pwr", "pwr_max"])
+        peak_ratio = np.median(data["pwr_max"] / data["pwr"])   # typical peak to rated power ratio of the motors used in the regression
+
+        ### set up inputs
+        indeps = self.add_subsystem("indeps", IndepVarComp(), promotes = ["*"])
+        indeps.add_output("power", profile, units = "kW", desc = "Power required from each motor at each time step")
+        indeps.add_output("K_gearbox_metric", self.options["K_gearbox_metric"], desc = "Empirical factor determined by technology level")
+        indeps.add_output("prop_RPM", self.options["prop_RPM"], units = "rpm", desc = "Rotational speed of prop attached to gearbox")
+        indeps.add_output("motor_rpm", self.options["motor_rpm"], units = "rpm", desc = "Rotational speed of motor")
+        ### create connections
+        self.add_subsystem("sizing", MissionSizing(num_nodes = np.size(profile), dt = self.options["dt"], peak_ratio = peak_ratio, peak_duration = self.options["peak_duration"],
+                                                   sizing = self.options["sizing"]), promotes_inputs = ["power"], promotes_outputs = ["rated_power"])
+        self.add_subsystem("motor", Regression(keywords = self.options["keywords"]))
+        self.add_subsystem("gearbox", GearboxWeight(), promotes_inputs = ["K_gearbox_metric"])
+        self.add_subsystem("combine", NumMotors(num_motors = self.options["num_motors"]), promotes_outputs = ["W_motor_gearbox"])
+        self.connect("rated_power", "motor.power")
+        self.connect("rated_power", "gearbox.HP_out")
+        self.connect("prop_RPM", "gearbox.R_RPM")
+        self.connect("motor_rpm", "gearbox.motor_speed")
+        self.connect("motor.wt", "combine.motor_wt")
+        self.connect("gearbox.wt", "combine.gb_wt")
+
+def mission_sensitivity(prob): # returns the sensitivity of the assembly weight to the power at every time step, found with a single reverse solve
+    totals = prob.compute_totals(of = ["W_motor_gearbox"], wrt = ["power"], return_format = "flat_dict")
+
+    return(totals["W_motor_gearbox", "power"][0])
+
+def test_mission_profile():
+    time = np.arange(0, 600, 1.)
+    profile = 300. + 100. * (time < 60) + 250. * ((time >= 300) & (time < 310))   # takeoff, cruise, and a 10 second burst
+
+    prob = Problem()
+    prob.model = MissionProfile(profile = profile, dt = 1., keywords = ["Aero", "Axial"])
+
+    prob.setup(check = False, force_alloc_complex = True, mode = "rev")
+
+    prob.run_model()
+
+    return(prob)
+
+if __name__ == "__main__":
+
+    prob = test_mission_profile()
+    prob.check_partials(compact_print = True, method = "cs")
+
+    print("Rated power: %s kW, sized by the peak: %s" %(prob["rated_power"], prob["sizing.peak_sized"]))
+    print("The total weight of all motors and gearboxes is %s kg" %(prob["W_motor_gearbox"]))
+    print("Time steps that set the weight:", np.flatnonzero(mission_sensitivity(prob)))
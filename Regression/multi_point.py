@@ -0,0 +1,111 @@
+import numpy as np
+from openmdao.api import Problem, Group, ParallelGroup, IndepVarComp, ExplicitComponent
+from w_motor_reg import Regression
+from w_gearbox import GearboxWeight
+from num_motors import NumMotors
+
+### Sizes one motor + gearbox design for several flight conditions at once. Every condition is its own subsystem under a ParallelGroup, so the points
+### run one after another without MPI and are spread across processors when the file is run with, for example:
+###     mpirun -n 3 python multi_point.py
+### motor_rpm and K_gearbox_metric are shared by all points. The motor is sized by the point that needs the heaviest motor and the gearbox by the point that
+### needs the heaviest gearbox, and the assembly weight is the sum of the two.
+
+class MotorGearboxPoint(Group): # Same model as MotorGearbox, but motor_rpm and K_gearbox_metric come from outside so that they can be shared between points
+
+    def initialize(self):
+        self.options.declare("power", default = 500, desc = "Power required from each motor at this flight condition")
+        self.options.declare("prop_RPM", default = 4000, desc = "Propeller RPM at this flight condition")
+        self.options.declare("num_motors", default = 4, desc = "Number of motors")
+        self.options.declare("keywords", default = ["Axial"], types = list, desc = "Keywords to specify type of motor")
+
+    def setup(self):
+        ### set up inputs
+        indeps = self.add_subsystem("indeps", IndepVarComp(), promotes = ["*"])
+        indeps.add_output("power", self.options["power"], units = "kW", desc = "Output power of each motor")
+        indeps.add_output("prop_RPM", self.options["prop_RPM"], units = "rpm", desc = "Rotational speed of prop attached to gearbox")
+        ### create connections
+        self.add_subsystem("motor", Regression(keywords = self.options["keywords"]), promotes_inputs = ["power"])
+        self.add_subsystem("gearbox", GearboxWeight(), promotes_inputs = ["K_gearbox_metric", ("motor_speed", "motor_rpm")])
+        self.add_subsystem("combine", NumMotors(num_motors = self.options["num_motors"]), promotes_outputs = ["W_motor_gearbox"])
+        self.connect("power", "gearbox.HP_out")
+        self.connect("prop_RPM", "gearbox.R_RPM")
+        self.connect("motor.wt", "combine.motor_wt")
+        self.connect("gearbox.wt", "combine.gb_wt")
+
+class PointMax(ExplicitComponent): # This component picks the heaviest motor and the heaviest gearbox over the points. The motor is sized by the point of peak power and the gearbox by the point of peak torque, which can be different points
+
+    def initialize(self):
+        self.options.declare("point_names", default = ["takeoff"], types = list, desc = "Names of the flight conditions")
+
+    def setup(self):
+        for name in self.options["point_names"]:
+            self.add_input("motor_wt_%s" %name, val = 1., units = "kg", desc = "Weight of one motor at %s" %name)
+            self.add_input("gb_wt_%s" %name, val = 1., units = "kg", desc = "Weight of one gearbox at %s" %name)
+            self.declare_partials("motor_wt", "motor_wt_%s" %name)
+            self.declare_partials("gb_wt", "gb_wt_%s" %name)
+
+        self.add_output("motor_wt", units = "kg", desc = "Weight of one motor sized for every flight condition")
+        self.add_output("gb_wt", units = "kg", desc = "Weight of one gearbox sized for every flight condition")
+
+    def _heaviest(self, inputs, quantity): # name of the point with the heaviest quantity, picked on the real part so that complex steps do not move it
+        names = self.options["point_names"]
+
+        return(names[int(np.argmax([inputs["%s_%s" %(quantity, name)].real for name in names]))])
+
+    def compute(self, inputs, outputs):
+        for quantity in ["motor_wt", "gb_wt"]:
+            outputs[quantity] = inputs["%s_%s" %(quantity, self._heaviest(inputs, quantity))]
+
+    def compute_partials(self, inputs, J):
+        for quantity in ["motor_wt", "gb_wt"]:
+            heaviest = self._heaviest(inputs, quantity)
+            for name in self.options["point_names"]:
+                J[quantity, "%s_%s" %(quantity, name)] = 1. if name == heaviest else 0.
+
+class MultiPointMotorGearbox(Group):
+
+    def initialize(self):
+        self.options.declare("points", default = [("takeoff", 500, 4000), ("climb", 450, 3800), ("cruise", 300, 3500)], types = list, desc = "(name, power in kW, prop RPM) of each flight condition")
+        self.options.declare("K_gearbox_metric", default = 32.688, desc = "Technology level of gearbox")
+        self.options.declare("motor_rpm", default = 20000, desc = "Motor speed in RPM")
+        self.options.declare("num_motors", default = 4, desc = "Number of motors")
+        self.options.declare("keywords", default = ["Axial"], types = list, desc = "Keywords to specify type of motor")
+
+    def setup(self):
+        names = [point[0] for point in self.options["points"]]
+
+        ### set up the shared design variables
+        indeps = self.add_subsystem("indeps", IndepVarComp(), promotes = ["*"])
+        indeps.add_output("K_gearbox_metric", self.options["K_gearbox_metric"], desc = "Empirical factor determined by technology level")
+        indeps.add_output("motor_rpm", self.options["motor_rpm"], units = "rpm", desc = "Rotational speed of motor")
+        ### one subsystem per flight condition
+        points = self.add_subsystem("points", ParallelGroup(), promotes_inputs = ["K_gearbox_metric", "motor_rpm"])
+        for name, power, prop_RPM in self.options["points"]:
+            points.add_subsystem(name, MotorGearboxPoint(power = power, prop_RPM = prop_RPM, num_motors = self.options["num_motors"], keywords = self.options["keywords"]),
+                                 promotes_inputs = ["K_gearbox_metric", "motor_rpm"])
+
+        self.add_subsystem("sizing", PointMax(point_names = names))
+        self.add_subsystem("combine", NumMotors(num_motors = self.options["num_motors"]), promotes_outputs = ["W_motor_gearbox"])
+        for name in names:
+            self.connect("points.%s.motor.wt" %name, "sizing.motor_wt_%s" %name)
+            self.connect("points.%s.gearbox.wt" %name, "sizing.gb_wt_%s" %name)
+        self.connect("sizing.motor_wt", "combine.motor_wt")
+        self.connect("sizing.gb_wt", "combine.gb_wt")
+
+def test_multi_point(points = None):
+    prob = Problem()
+    prob.model = MultiPointMotorGearbox() if points is None else MultiPointMotorGearbox(points = points)
+
+    prob.setup(check = False, force_alloc_complex = True)
+
+    prob.run_model()
+
+    return(prob)
+
+if __name__ == "__main__":
+
+    prob = test_multi_point()
+    prob.check_partials(compact_print = True, method = "cs")
+
+    if prob.comm.rank == 0:
+        print("The motors and gearboxes sized for every flight condition weigh %s kg" %(prob["W_motor_gearbox"]))
@@ -1,16 +1,20 @@
+import numpy as np
 from openmdao.api import ExplicitComponent, Problem
 
 class NumMotors(ExplicitComponent):
 
     def initialize(self):
         self.options.declare("num_motors", default = 4, desc = "Number of motors whose weight to calculate")
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of designs evaluated at once")
 
     def setup(self):
-        self.add_input("motor_wt", val = 91.8695507, units = "kg", desc = "Weight of one motor")
-        self.add_input("gb_wt", val = 10.36947702, units = "kg", desc = "Weight of one gearbox")
-        self.add_output("W_motor_gearbox", units = "kg", desc = "Weight of all the motors and gearboxes combined")
+        n = self.options["vec_size"]
+        self.add_input("motor_wt", val = 91.8695507 * np.ones(n), units = "kg", desc = "Weight of one motor")
+        self.add_input("gb_wt", val = 10.36947702 * np.ones(n), units = "kg", desc = "Weight of one gearbox")
+        self.add_output("W_motor_gearbox", shape = n, units = "kg", desc = "Weight of all the motors and gearboxes combined")
 
-        self.declare_partials("W_motor_gearbox", ["motor_wt", "gb_wt"], val = self.options["num_motors"])
+        diagonal = np.arange(n)
+        self.declare_partials("W_motor_gearbox", ["motor_wt", "gb_wt"], rows = diagonal, cols = diagonal, val = self.options["num_motors"] * np.ones(n))
 
     def compute(self, inputs, outputs):
         motor_wt = inputs["motor_wt"]
@@ -0,0 +1,56 @@
+from multiprocessing import Pool
+import numpy as np
+from openmdao.api import Problem
+from w_motor_gb import MotorGearbox
+
+### NumMotors takes the number of motors as an option, so it cannot be a design variable. This file enumerates the integer motor counts instead: for every
+### count the total power is split evenly between the motors, MotorGearbox is evaluated at one motor speed, and the counts run in parallel worker processes.
+### The speed is not optimized: the regression motor weight does not depend on it and the gearbox only gets heavier with the reduction ratio, so an
+### optimizer would always stop at the lowest speed allowed. The trade compares the motor counts at the motor_rpm given, which must be at least prop_RPM.
+
+def size_num_motors(num_motors, total_power = 2000., motor_rpm = 20000., K_gearbox_metric = 32.688, prop_RPM = 4000., keywords = ["Axial"]): # sizes the assembly for one motor count at motor_rpm and returns the design as a dictionary
+    if motor_rpm < prop_RPM:
+        raise Exception("You have specified a motor_rpm of %s, which is below the prop_RPM of %s, the gearbox cannot drive the prop faster than the motor" %(motor_rpm, prop_RPM))
+    prob = Problem()
+    prob.model = MotorGearbox(power = total_power / num_motors, K_gearbox_metric = K_gearbox_metric, prop_RPM = prop_RPM, motor_rpm = motor_rpm, num_motors = num_motors, keywords = keywords)
+
+    prob.setup(check = False)
+
+    prob.run_model()
+
+    return({"num_motors": num_motors, "power": total_power / num_motors, "motor_rpm": prob["motor_rpm"][0], "motor_wt": prob["motor.wt"][0],
+            "gb_wt": prob["gearbox.wt"][0], "W_motor_gearbox": prob["W_motor_gearbox"][0]})
+
+def _size_count(args): # unpacks the arguments for a worker process
+    num_motors, kwargs = args
+
+    return(size_num_motors(num_motors, **kwargs))
+
+def num_motors_trade(counts = range(2, 25), jobs = None, **kwargs): # returns the lightest design and the trade curve over all motor counts. kwargs are passed on to size_num_motors, jobs = 1 runs without worker processes
+    tasks = [(int(num_motors), kwargs) for num_motors in counts]
+    if jobs == 1:
+        designs = [_size_count(task) for task in tasks]
+    else:
+        pool = Pool(jobs)
+        try:
+            designs = pool.map(_size_count, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    curve = dict((key, np.array([design[key] for design in designs])) for key in designs[0])
+
+    return(designs[int(np.argmin(curve["W_motor_gearbox"]))], curve)
+
+def test_num_motors_trade():
+    best, curve = num_motors_trade(counts = range(2, 9), jobs = 2, total_power = 2000., keywords = ["Axial"])
+
+    return(best, curve)
+
+if __name__ == "__main__":
+
+    best, curve = num_motors_trade(total_power = 2000.)
+
+    for num_motors, motor_rpm, weight in zip(curve["num_motors"], curve["motor_rpm"], curve["W_motor_gearbox"]):
+        print("%2d motors at %8.1f RPM weigh %8.3f kg" %(num_motors, motor_rpm, weight))
+    print("The lightest assembly uses %s motors and weighs %s kg" %(best["num_motors"], best["W_motor_gearbox"]))
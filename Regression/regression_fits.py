@@ -0,0 +1,112 @@
+from collections import namedtuple, OrderedDict
+import numpy as np
+
+### Weight vs. power regressions fitted to many motor selections at once. A selection is a boolean mask over the motors (the motors of one keyword set,
+### for example), and every selection is fitted in the same stacked solve: the rows of the motors outside a selection are weighted by zero, so all the
+### selections share one (selections, motors, parameters) design matrix that is solved by a batched QR decomposition. Model forms:
+###   linear     w = c0 * P + c1                      (np.polyfit order, the form the Regression component has always used)
+###   quadratic  w = c0 * P**2 + c1 * P + c2
+###   loglog     w = exp(c1) * P**c0                  (power law, fitted to log(w) vs. log(P))
+###   huber      w = c0 * P + c1                      (robust linear fit, Huber weights by iteratively reweighted least squares)
+
+FitModel = namedtuple("FitModel", ["name", "powers", "log", "robust"])   # powers of P (or of log(P)) in the design matrix columns, highest first
+
+models = OrderedDict([("linear", FitModel("linear", (1, 0), False, False)),
+                      ("quadratic", FitModel("quadratic", (2, 1, 0), False, False)),
+                      ("loglog", FitModel("loglog", (1, 0), True, False)),
+                      ("huber", FitModel("huber", (1, 0), False, True))])
+
+def _model(name):
+    if name not in models:
+        raise Exception("You have specified a regression model of %s, which does not exist, choose from %s" %(name, list(models)))
+
+    return(models[name])
+
+def evaluate(name, coefficients, power): # fitted weight at power, works element-wise on arrays (and complex steps) of powers
+    model = _model(name)
+    if model.log:
+        return(np.exp(coefficients[1]) * power**coefficients[0])
+
+    return(np.polyval(coefficients, power))
+
+def derivative(name, coefficients, power): # d(weight) / d(power) of the fit at power
+    model = _model(name)
+    if model.log:
+        return(coefficients[0] * np.exp(coefficients[1]) * power**(coefficients[0] - 1))
+
+    return(np.polyval(np.polyder(coefficients), power))
+
+def _solve(X, y, weights): # weighted least squares of every selection, X (motors, parameters), y (motors,), weights (selections, motors)
+    if X.shape[0] < X.shape[1]:
+        return(np.full((len(weights), X.shape[1]), np.nan))
+    root = np.sqrt(weights)[:, :, None]
+    Q, R = np.linalg.qr(root * X[None, :, :])                       # (selections, motors, parameters), (selections, parameters, parameters)
+    rhs = np.einsum("smp,sm->sp", Q, root[:, :, 0] * y[None, :])
+    diagonal = np.abs(np.diagonal(R, axis1 = 1, axis2 = 2))
+    singular = np.any(diagonal <= 1e-12 * np.max(diagonal, axis = 1, keepdims = True), axis = 1)   # too few distinct motors for the model
+    R = np.where(singular[:, None, None], np.eye(X.shape[1]), R)
+
+    return(np.where(singular[:, None], np.nan, np.linalg.solve(R, rhs[:, :, None])[:, :, 0]))
+
+def _masked_median(values, mask): # median of every row over the entries in mask, from one sort with the other entries pushed to the end
+    ordered = np.sort(np.where(mask, values, np.inf), axis = 1)
+    count = np.sum(mask, axis = 1)
+    rows = np.arange(len(values))
+    middle = (ordered[rows, np.maximum(count - 1, 0) // 2] + ordered[rows, count // 2]) / 2
+
+    with np.errstate(invalid = "ignore"):
+        return(np.where(count > 0, middle, np.nan))
+
+def fit_batch(power, weight, masks, model = "linear", huber_k = 1.345, max_iter = 50, tol = 1e-10): # fits one model to every selection in masks (selections, motors) and returns its coefficients (selections, parameters) and residual statistics
+    model = _model(model)
+    power = np.asarray(power, dtype = float)
+    weight = np.asarray(weight, dtype = float)
+    masks = np.atleast_2d(np.asarray(masks, dtype = bool))
+
+    x = np.log(power) if model.log else power
+    y = np.log(weight) if model.log else weight
+    scale = 1. if model.log else max(np.max(np.abs(x)), 1e-300)     # columns of P / scale keep the quadratic design matrix well conditioned
+    X = np.column_stack([(x / scale)**k for k in model.powers])
+    unscale = np.array([scale**-k for k in model.powers])
+
+    robust_weights = masks.astype(float)
+    coefficients = _solve(X, y, robust_weights)
+    iterations = np.zeros(len(masks), dtype = int)
+    if model.robust:
+        active = np.flatnonzero(~np.isnan(coefficients[:, 0]))   # sets still being reweighted, sets with too few motors are never reweighted
+        for iteration in range(max_iter):
+            residuals = y[None, :] - coefficients[active].dot(X.T)
+            sigma = 1.4826 * _masked_median(np.abs(residuals), masks[active])   # median absolute deviation, a robust estimate of the residual spread
+            sigma = np.where(sigma > 0, sigma, 1.)
+            u = np.abs(residuals) / (huber_k * sigma[:, None])
+            robust_weights[active] = masks[active] * np.minimum(1., 1. / np.maximum(u, 1e-300))
+            updated = _solve(X, y, robust_weights[active])
+            change = np.max(np.abs(updated - coefficients[active]), axis = 1) / np.maximum(np.max(np.abs(updated), axis = 1), 1e-300)
+            coefficients[active] = updated
+            iterations[active] += 1
+            active = active[change > tol]
+            if len(active) == 0:
+                break
+    coefficients = coefficients * unscale
+
+    # residual statistics in weight units, over the motors of each selection
+    fitted = evaluate(model.name, coefficients.T[:, :, None], power[None, :])
+    residuals = np.where(masks, weight[None, :] - fitted, 0.)
+    count = np.sum(masks, axis = 1)
+    parameters = len(model.powers)
+    rss = np.sum(residuals**2, axis = 1)
+    mean = np.sum(masks * weight, axis = 1) / np.maximum(count, 1)
+    tss = np.sum(np.where(masks, weight[None, :] - mean[:, None], 0.)**2, axis = 1)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        stats = {"count": count, "rss": rss, "rmse": np.sqrt(rss / np.where(count > parameters, count - parameters, np.nan)),
+                 "r2": 1 - rss / tss, "max_residual": np.max(np.abs(residuals), axis = 1),
+                 "aic": count * np.log(rss / count) + 2 * parameters, "iterations": iterations, "weights": robust_weights}
+
+    return({"model": model.name, "coefficients": coefficients, "stats": stats})
+
+def fit(power, weight, model = "linear"): # coefficients of one fit, in the order evaluate takes them
+    coefficients = fit_batch(power, weight, np.ones((1, np.size(power)), dtype = bool), model)["coefficients"][0]
+    if np.any(np.isnan(coefficients)):
+        raise Exception("The %s regression needs at least %s motors with different powers, there are %s" %(model, len(_model(model).powers), np.size(power)))
+
+    return(coefficients)
@@ -1,6 +1,6 @@
 from openmdao.api import Problem, ScipyOptimizeDriver
-from regression_motor_sizing import Regression
-from gearbox_weight_component import GearboxWeight
+from w_motor_reg import Regression
+from w_gearbox import GearboxWeight
 from num_motors import NumMotors
 from w_motor_gb import MotorGearbox
 
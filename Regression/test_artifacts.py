@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from openmdao.api import Problem
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
+
+import w_motor_reg
+from artifacts import save_artifact, load_artifact, FORMAT_VERSION
+from w_motor_reg import Regression, MotorCatalog, Motors, load_regression, regression_coefficients
+
+class TestArtifacts(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_round_trip(self):
+        path = os.path.join(self.cache_dir, "map.npz")
+        arrays = {"a": np.arange(12.).reshape(3, 4), "b": np.asfortranarray(np.ones((2, 5))), "names": np.array(["x", "y"])}
+        save_artifact(path, arrays, "test", "abc", note = "hello")
+
+        artifact = load_artifact(path, "test")
+        self.assertEqual(sorted(artifact.keys()), ["a", "b", "names"])
+        self.assertEqual(artifact.header["version"], FORMAT_VERSION)
+        self.assertEqual(artifact.header["note"], "hello")
+        self.assertTrue(isinstance(artifact["a"], np.memmap))
+        np.testing.assert_array_equal(artifact["a"], arrays["a"])
+        np.testing.assert_array_equal(artifact["b"], arrays["b"])
+        np.testing.assert_array_equal(artifact["names"], arrays["names"])
+        self.assertFalse(artifact.is_stale("abc"))
+        self.assertTrue(artifact.is_stale("abd"))
+
+        with self.assertRaises(Exception):
+            load_artifact(path, "regression")
+
+    def test_regression(self):
+        path = os.path.join(self.cache_dir, "regression.npz")
+        keywords = ["Aero", "OutRunner"]
+        artifact = load_regression(path, keywords)
+        assert_rel_error(self, np.asarray(artifact["coefficients"]), regression_coefficients(keywords), 1e-12)
+        self.assertEqual(artifact.header["keywords"], sorted(keywords))
+        self.assertFalse(load_regression(path, keywords).is_stale(artifact.header["fingerprint"]))
+
+        refit = load_regression(path, ["Axial"])   # a different selection replaces the saved fit
+        assert_rel_error(self, np.asarray(refit["coefficients"]), regression_coefficients(["Axial"]), 1e-12)
+
+        catalog = w_motor_reg.catalog
+        try:
+            w_motor_reg.catalog = MotorCatalog(Motors[:-1])   # a catalog edit makes the saved fit stale
+            self.assertTrue(load_artifact(path).is_stale(w_motor_reg.regression_fingerprint(["Axial"])))
+        finally:
+            w_motor_reg.catalog = catalog
+
+    def test_component(self):
+        path = os.path.join(self.cache_dir, "regression.npz")
+        for i in range(2):   # fits and saves, then loads
+            prob = Problem()
+            prob.model.add_subsystem("motor", Regression(artifact = path), promotes = ["*"])
+            prob.setup(check = False, force_alloc_complex = True)
+            prob.run_model()
+
+            assert_rel_error(self, prob["wt"], 91.8695507, 1e-4)
+        self.assertTrue(os.path.exists(path))
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
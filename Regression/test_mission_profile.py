@@ -0,0 +1,24 @@
+import unittest
+import numpy as np
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
+
+from mission_profile import test_mission_profile, mission_sensitivity
+
+class TestMissionProfile(unittest.TestCase):
+
+    def test_sizing(self):
+        prob = test_mission_profile()
+
+        assert_rel_error(self, prob["rated_power"], 400., 1e-8)
+        assert_rel_error(self, prob["W_motor_gearbox"], 330.639663, 1e-4)
+        self.assertEqual(prob["sizing.peak_sized"], 0.)
+        self.assertEqual(prob["sizing.time_over_rating"].max(), 10.)
+        self.assertEqual(prob["sizing.over_duration"].sum(), 0.)
+        self.assertEqual(list(np.flatnonzero(mission_sensitivity(prob))), [0])
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
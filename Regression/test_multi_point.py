@@ -0,0 +1,31 @@
+import unittest
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
+
+from multi_point import test_multi_point
+
+class TestMultiPoint(unittest.TestCase):
+
+    def test_weight(self):
+        prob = test_multi_point()
+
+        assert_rel_error(self, prob["points.takeoff.W_motor_gearbox"], 408.95615459, 1e-4)
+        assert_rel_error(self, prob["points.cruise.W_motor_gearbox"], 255.46829399, 1e-4)
+        assert_rel_error(self, prob["W_motor_gearbox"], 408.95615459, 1e-4)
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+    def test_different_points(self): # the takeoff point needs the heaviest motor and the slow hover point the heaviest gearbox
+        prob = test_multi_point([("takeoff", 500, 4000), ("hover", 400, 1500), ("cruise", 300, 3500)])
+
+        assert_rel_error(self, prob["sizing.motor_wt"], prob["points.takeoff.motor.wt"], 1e-12)
+        assert_rel_error(self, prob["sizing.gb_wt"], prob["points.hover.gearbox.wt"], 1e-12)
+        assert_rel_error(self, prob["W_motor_gearbox"], 4 * (91.8695507 + 20.95163274), 1e-4)
+        self.assertTrue(prob["W_motor_gearbox"][0] > max(prob["points.takeoff.W_motor_gearbox"][0], prob["points.hover.W_motor_gearbox"][0]))
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
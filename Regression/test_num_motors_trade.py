@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+from openmdao.utils.assert_utils import assert_rel_error
+
+import num_motors_trade as trade
+
+class TestNumMotorsTrade(unittest.TestCase):
+
+    def test_trade(self):
+        best, curve = trade.test_num_motors_trade()
+
+        self.assertEqual(list(curve["num_motors"]), list(range(2, 9)))
+        self.assertEqual(best["num_motors"], 2)
+        assert_rel_error(self, best["W_motor_gearbox"], 398.47638817, 1e-4)
+        assert_rel_error(self, curve["W_motor_gearbox"][2], 408.95615459, 1e-4)   # 4 motors of 500 kW, the MotorGearbox default
+        self.assertTrue(np.all(np.diff(curve["W_motor_gearbox"]) > 0))
+
+        design = trade.size_num_motors(5, total_power = 2000.)
+        assert_rel_error(self, design["W_motor_gearbox"], curve["W_motor_gearbox"][3], 1e-8)
+
+    def test_motor_speed(self):
+        design = trade.size_num_motors(4, total_power = 2000., motor_rpm = 6000.)
+        assert_rel_error(self, design["W_motor_gearbox"], 402.94672269, 1e-4)
+
+        with self.assertRaises(Exception):
+            trade.size_num_motors(4, total_power = 2000., motor_rpm = 1000.)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
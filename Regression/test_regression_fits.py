@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from openmdao.api import Problem
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
+
+import regression_fits
+from regression_fits import fit_batch, fit, evaluate
+from w_motor_reg import filter_data, fit_keyword_sets, Regression
+
+class TestRegressionFits(unittest.TestCase):
+
+    def setUp(self):
+        self.keyword_sets = [["Aero"], ["Axial"], ["Radial"], ["Aero", "OutRunner"], ["Auto"], ["AirCool", "Commercial"]]
+
+    def test_polyfit(self): # every selection of the batch matches a fit of its own motors
+        fits = fit_keyword_sets(self.keyword_sets, ["linear", "quadratic", "loglog"])
+        for s, keywords in enumerate(self.keyword_sets):
+            x, y = np.array(filter_data(keywords)[:2], dtype = float)
+            assert_rel_error(self, fits["linear"]["coefficients"][s], np.polyfit(x, y, 1), 1e-10)
+            assert_rel_error(self, fits["quadratic"]["coefficients"][s], np.polyfit(x, y, 2), 1e-7)
+            assert_rel_error(self, fits["loglog"]["coefficients"][s], np.polyfit(np.log(x), np.log(y), 1), 1e-10)
+
+            residuals = y - np.polyval(np.polyfit(x, y, 1), x)
+            stats = fits["linear"]["stats"]
+            self.assertEqual(stats["count"][s], len(x))
+            assert_rel_error(self, stats["rss"][s], np.sum(residuals**2), 1e-8)
+            assert_rel_error(self, stats["rmse"][s], np.sqrt(np.sum(residuals**2) / (len(x) - 2)), 1e-8)
+            assert_rel_error(self, stats["r2"][s], 1 - np.sum(residuals**2) / np.sum((y - np.mean(y))**2), 1e-8)
+            assert_rel_error(self, stats["max_residual"][s], np.max(np.abs(residuals)), 1e-8)
+
+    def test_huber(self): # one outlier pulls the least squares line, but not the robust one
+        rng = np.random.RandomState(0)
+        power = np.linspace(10., 500., 40)
+        weight = .2 * power + 5. + rng.normal(0., 1., 40)
+        weight[-1] += 300.
+        masks = np.ones((2, 40), dtype = bool)
+        masks[1, -1] = False   # the second selection leaves the outlier out
+
+        linear = fit_batch(power, weight, masks, "linear")
+        huber = fit_batch(power, weight, masks, "huber")
+        self.assertTrue(abs(linear["coefficients"][0, 0] - .2) > .05)
+        self.assertTrue(abs(huber["coefficients"][0, 0] - .2) < .01)
+        assert_rel_error(self, huber["coefficients"][1], linear["coefficients"][1], 1e-2)
+        self.assertTrue(huber["stats"]["weights"][0, -1] < .05)
+
+    def test_too_few_motors(self):
+        result = fit_batch([100., 200.], [10., 20.], [[True, False], [True, True]], "quadratic")
+        self.assertTrue(np.all(np.isnan(result["coefficients"])))
+        self.assertRaises(Exception, fit, [100.], [10.], "linear")
+        self.assertRaises(Exception, fit, [100., 200.], [10., 20.], "cubic")
+
+    def test_component(self):
+        for model in regression_fits.models:
+            prob = Problem()
+            prob.model = Regression(keywords = ["Aero"], model = model)
+            prob.setup(check = False, force_alloc_complex = True)
+            prob["power"] = 300.
+            prob.run_model()
+
+            x, y = filter_data(["Aero"])[:2]
+            assert_rel_error(self, prob["wt"], evaluate(model, fit(x, y, model), 300.), 1e-10)
+
+            cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+            assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
@@ -1,7 +1,10 @@
 import unittest 
+import numpy as np
+from openmdao.api import Problem
 from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
 
-from gearbox_weight_component import test_gearbox_weight
+from w_gearbox import test_gearbox_weight, test_multistage_gearbox_weight, multistage_gearbox_weight, stage_arrangements, gearbox_weight
+from w_motor_gb import test_w_motor_gb, MotorGearbox
 
 class TestGearboxWeightComponent(unittest.TestCase):
 
@@ -13,6 +16,54 @@ class TestGearboxWeightComponent(unittest.TestCase):
         cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
         assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
 
+class TestMultiStageGearboxWeight(unittest.TestCase):
+
+    def test_single_stage(self): # at a ratio of 5 one stage is the lightest, and it is the Krantz formula
+        prob = test_multistage_gearbox_weight()
+
+        assert_rel_error(self, prob["wt"], 10.36948929, 1e-4)
+        assert_rel_error(self, prob["num_stages"], 1., 1e-12)
+        assert_rel_error(self, prob["stage_ratios"][0], [5., 1., 1., 1.], 1e-12)
+
+    def test_arrangements(self):
+        counts, fractions = stage_arrangements((1, 2, 3, 4), 12)
+        self.assertEqual(list(np.bincount(counts)), [0, 1, 11, 55, 165])
+        assert_rel_error(self, np.sum(fractions, axis = 1), np.ones(len(counts)), 1e-12)
+
+    def test_split(self): # the stage weights of a 2 stage split, summed by hand
+        weight, best = multistage_gearbox_weight(670.511044, 32.688, 500., 20000., stages = (2,), splits = 100)
+        fraction = stage_arrangements((2,), 100)[1][best[0], 0]
+        n_1 = 20000. / 40.**fraction
+        assert_rel_error(self, weight[0], gearbox_weight(670.511044, 32.688, n_1, 20000.) + gearbox_weight(670.511044, 32.688, 500., n_1), 1e-12)
+
+    def test_vectorized(self):
+        prob = test_multistage_gearbox_weight(vec_size = 4, max_stage_ratio = 6.)
+        prob["R_RPM"] = [4000., 2000., 500., 200.]
+        prob.run_model()
+
+        weight, best = multistage_gearbox_weight(670.511044, 32.688, prob["R_RPM"], 20000., max_stage_ratio = 6.)
+        assert_rel_error(self, prob["wt"], weight, 1e-12)
+        assert_rel_error(self, prob["num_stages"], [1., 2., 3., 3.], 1e-12)
+        self.assertTrue(np.all(prob["stage_ratios"] <= 6. * (1 + 1e-9)))
+        assert_rel_error(self, np.prod(prob["stage_ratios"], axis = 1), 20000. / prob["R_RPM"], 1e-12)
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+    def test_motor_gearbox(self):
+        prob = test_w_motor_gb()
+        staged = Problem()
+        staged.model = MotorGearbox(gearbox_stages = [1, 2, 3, 4], prop_RPM = 400.)
+        staged.setup(check = False, force_alloc_complex = True)
+        staged.run_model()
+
+        self.assertTrue(staged["gearbox.num_stages"][0] > 1)
+        assert_rel_error(self, staged["gearbox.wt"], multistage_gearbox_weight(staged["power"] * 1.34102, 32.688, 400., 20000.)[0], 1e-4)
+        self.assertTrue(staged["W_motor_gearbox"] > prob["W_motor_gearbox"])
+
+        cpd = staged.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
 if __name__ == "__main__":
 
     unittest.main()
\ No newline at end of file
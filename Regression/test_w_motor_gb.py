@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
 
 from w_motor_gb import test_w_motor_gb
@@ -13,6 +14,26 @@ class TestWMotorGearbox(unittest.TestCase):
         cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
         assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
 
+    def test_vectorized(self):
+        prob = test_w_motor_gb(vec_size = 3)
+        prob["power"] = [250., 500., 750.]
+        prob["motor_rpm"] = [10000., 20000., 15000.]
+        prob.run_model()
+
+        assert_rel_error(self, prob["W_motor_gearbox"][1], 408.95615459, 1e-4)
+        for i in range(3):   # every design only depends on its own inputs
+            single = test_w_motor_gb()
+            single["power"] = prob["power"][i]
+            single["motor_rpm"] = prob["motor_rpm"][i]
+            single.run_model()
+            assert_rel_error(self, prob["W_motor_gearbox"][i], single["W_motor_gearbox"][0], 1e-12)
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+        J = prob.compute_totals(["W_motor_gearbox"], ["power", "motor_rpm"])
+        for wrt in ["power", "motor_rpm"]:
+            np.testing.assert_array_equal(J["W_motor_gearbox", wrt], np.diag(np.diag(J["W_motor_gearbox", wrt])))
+
 if __name__ == "__main__":
 
     unittest.main()
\ No newline at end of file
@@ -1,7 +1,9 @@
 import unittest
+import numpy as np
+from openmdao.api import Problem
 from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
 
-from regression_motor_sizing import test_regression_motor_sizing
+from w_motor_reg import test_regression_motor_sizing, catalog, filter_data, Regression
 
 class TestRegressionMotorSizing(unittest.TestCase):
 
@@ -13,6 +15,32 @@ class TestRegressionMotorSizing(unittest.TestCase):
         cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
         assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
 
+class TestMotorCatalog(unittest.TestCase):
+
+    def test_query(self):
+        index = catalog.query(["Aero"], pwr = (100, 400), rpm_max = (5000, None), v = (200, None))
+        data = catalog.project(index, ["pwr", "rpm_max", "v"])
+
+        self.assertEqual(list(catalog.names[index]), ["ThinGap Aurora Canard PF1.0", "ThinGap Aurora Wing PF1.0", "ThinGap Aurora Wing PF0.9"])
+        self.assertTrue(np.all((data["pwr"] >= 100) & (data["pwr"] <= 400) & (data["rpm_max"] >= 5000) & (data["v"] >= 200)))
+
+        x, y, motors = filter_data(["Axial", "Aero"])
+        index = catalog.query(["Axial", "Aero"])
+        self.assertEqual(list(catalog.names[index]), motors)
+        self.assertTrue(np.all(catalog.project(index)["w"] == y))
+
+        self.assertRaises(Exception, catalog.query, ["Hover"])
+
+    def test_regression_on_query(self):
+        prob = Problem()
+        prob.model.add_subsystem("motor", Regression(keywords = ["Aero"], ranges = {"pwr": (100, 400)}))
+        prob.setup(check = False, force_alloc_complex = True)
+        prob.run_model()
+
+        data = catalog.project(catalog.query(["Aero"], pwr = (100, 400)))
+        coefficients = np.polyfit(data["pwr"], data["w"], 1)
+        assert_rel_error(self, prob["motor.wt"], coefficients[0] * 500 + coefficients[1], 1e-10)
+
 if __name__ == "__main__":
 
-    unittest.main()
\ No newline at end of file
+    unittest.main()
\ No newline at end of file
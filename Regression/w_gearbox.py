@@ -1,16 +1,26 @@
+from itertools import combinations
+import numpy as np
 from openmdao.api import ExplicitComponent, Problem
 
+def gearbox_weight(HP_out, K_gearbox, R_RPM, motor_speed): # Krantz formula, works element-wise on arrays of designs
+    return(K_gearbox * HP_out**.76 * motor_speed**.13 / R_RPM**.89)
+
 class GearboxWeight(ExplicitComponent):
 
+    def initialize(self):
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of designs evaluated at once")
+
     def setup(self):
-        self.add_input("HP_out", val = 670.511044, units = "hp", desc = "Output power of motor")
-        self.add_input("K_gearbox_metric", val = 32.688, desc = "Technology level of gearbox")    
-        self.add_input("R_RPM", val = 4000, units = "rpm", desc = "Rotor RPM, slower gearbox speed")
-        self.add_input("motor_speed", val = 20000, units = "rpm", desc = "Motor speed")
+        n = self.options["vec_size"]
+        self.add_input("HP_out", val = 670.511044 * np.ones(n), units = "hp", desc = "Output power of motor")
+        self.add_input("K_gearbox_metric", val = 32.688 * np.ones(n), desc = "Technology level of gearbox")    
+        self.add_input("R_RPM", val = 4000 * np.ones(n), units = "rpm", desc = "Rotor RPM, slower gearbox speed")
+        self.add_input("motor_speed", val = 20000 * np.ones(n), units = "rpm", desc = "Motor speed")
         
-        self.add_output("wt", units = "kg", desc = "weight of the gearbox")
+        self.add_output("wt", shape = n, units = "kg", desc = "weight of the gearbox")
 
-        self.declare_partials("wt", ["R_RPM", "K_gearbox_metric", "motor_speed","HP_out"])
+        diagonal = np.arange(n)   # every design only depends on its own inputs
+        self.declare_partials("wt", ["R_RPM", "K_gearbox_metric", "motor_speed","HP_out"], rows = diagonal, cols = diagonal)
 
     def compute(self, inputs, outputs):
         HP_out = inputs["HP_out"]
@@ -18,7 +28,7 @@ class GearboxWeight(ExplicitComponent):
         R_RPM = inputs["R_RPM"]
         motor_speed = inputs["motor_speed"]
 
-        outputs["wt"] = K_gearbox * HP_out**.76 * motor_speed**.13 / R_RPM**.89 
+        outputs["wt"] = gearbox_weight(HP_out, K_gearbox, R_RPM, motor_speed)
         # Output equation based off of NPSS Electric Machine and Gearbox Sizing Tool for Electric Aircraft Applications by Nathaniel Renner, James L. Felder, and Peter E. Kascak
 
     def compute_partials(self, inputs, J):
@@ -32,9 +42,123 @@ class GearboxWeight(ExplicitComponent):
         J["wt", "K_gearbox_metric"] = HP_out**.76 * motor_speed**.13 / (R_RPM**.89)
         J["wt", "R_RPM"] = -.89 * K_gearbox * HP_out**.76 * motor_speed**.13 / (R_RPM**1.89)
 
-def test_gearbox_weight():
+### Multi-stage gearbox ###
+# The Krantz formula is applied to every stage, from the speed into the stage to the speed out of it, and the stage weights are summed. A k stage
+# arrangement splits the total ratio R = motor_speed / R_RPM into stage ratios R**f_1 ... R**f_k with f_1 + ... + f_k = 1, so the weight of stage i is a
+# power law K * HP_out**.76 * motor_speed**a_i * R_RPM**b_i with exponents that only depend on the split. Every stage count and every split on a grid
+# of the fractions is evaluated in one pass, and the lightest arrangement is kept. A single stage is the lightest at low ratios, more stages win as the
+# ratio grows, and max_stage_ratio rules out arrangements with a stage ratio that is not practical.
+
+def stage_arrangements(stages = (1, 2, 3, 4), splits = 12): # stage count, split fractions (padded with zeros to the largest stage count) of every arrangement
+    width = max(stages)
+    counts, fractions = [], []
+    for k in stages:
+        if k < 1:
+            raise Exception("You have specified a stage count of %s, a gearbox has at least 1 stage" %(k))
+        if k > splits:
+            raise Exception("A %s stage gearbox needs a split grid of at least %s, not %s" %(k, k, splits))
+        # every way of writing splits as a sum of k positive integers, as the cuts between the parts
+        cuts = list(combinations(range(1, splits), k - 1))
+        cuts = np.array(cuts, dtype = int).reshape(len(cuts), k - 1)
+        edges = np.column_stack([np.zeros(len(cuts), dtype = int), cuts, np.full(len(cuts), splits)])
+        parts = np.diff(edges, axis = 1) / float(splits)
+        counts.append(np.full(len(parts), k))
+        fractions.append(np.column_stack([parts, np.zeros((len(parts), width - k))]))
+
+    return(np.concatenate(counts), np.concatenate(fractions))
+
+def stage_exponents(fractions): # exponents of motor_speed and R_RPM in the Krantz weight of every stage of every arrangement, zero for unused stages
+    after = np.cumsum(fractions, axis = 1)         # fraction of log(R) taken out by the end of each stage
+    before = after - fractions
+    used = fractions > 0
+
+    return(np.where(used, .13 * (1 - before) - .89 * (1 - after), 0.), np.where(used, .13 * before - .89 * after, 0.), used)
+
+def multistage_gearbox_weight(HP_out, K_gearbox, R_RPM, motor_speed, stages = (1, 2, 3, 4), splits = 12, max_stage_ratio = None): # weight of the lightest arrangement of every design and the index of that arrangement in stage_arrangements
+    counts, fractions = stage_arrangements(stages, splits)
+    a, b, used = stage_exponents(fractions)
+    HP_out, K_gearbox, R_RPM, motor_speed = np.broadcast_arrays(*[np.atleast_1d(value) for value in [HP_out, K_gearbox, R_RPM, motor_speed]])
+
+    # (designs, arrangements, stages) stage weights without K * HP_out**.76, from logs so that all the arrangements are one broadcast
+    log_n = np.log(motor_speed)[:, None, None]
+    log_R = np.log(R_RPM)[:, None, None]
+    weights = np.sum(np.where(used, np.exp(a * log_n + b * log_R), 0.), axis = 2)
+    if max_stage_ratio is not None:
+        ratios = np.exp(fractions * (log_n - log_R))
+        feasible = np.all(ratios <= max_stage_ratio * (1 + 1e-12), axis = 2)
+        feasible |= ~np.any(feasible, axis = 1, keepdims = True)   # when no arrangement meets the limit, all are kept, see the stage_ratios output
+        weights = np.where(feasible, weights, np.inf)
+    best = np.argmin(weights, axis = 1)
+
+    return(K_gearbox * HP_out**.76 * weights[np.arange(len(best)), best], best)
+
+class MultiStageGearboxWeight(ExplicitComponent): # Gearbox weight of the lightest stage count and ratio split, for vec_size designs at once
+
+    def initialize(self):
+        self.options.declare("stages", default = [1, 2, 3, 4], types = list, desc = "Stage counts to consider")
+        self.options.declare("splits", default = 12, types = int, desc = "Number of steps the total ratio is split into between the stages")
+        self.options.declare("max_stage_ratio", default = None, allow_none = True, desc = "Largest ratio of a single stage, None for no limit")
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of designs evaluated at once")
+
+    def setup(self):
+        n = self.options["vec_size"]
+        self.counts, self.fractions = stage_arrangements(self.options["stages"], self.options["splits"])
+        self.a, self.b, self.used = stage_exponents(self.fractions)
+
+        self.add_input("HP_out", val = 670.511044 * np.ones(n), units = "hp", desc = "Output power of motor")
+        self.add_input("K_gearbox_metric", val = 32.688 * np.ones(n), desc = "Technology level of gearbox")
+        self.add_input("R_RPM", val = 4000 * np.ones(n), units = "rpm", desc = "Rotor RPM, slower gearbox speed")
+        self.add_input("motor_speed", val = 20000 * np.ones(n), units = "rpm", desc = "Motor speed")
+
+        self.add_output("wt", shape = n, units = "kg", desc = "weight of the gearbox")
+        self.add_output("num_stages", shape = n, desc = "stage count of the lightest arrangement")
+        self.add_output("stage_ratios", shape = (n, self.fractions.shape[1]), desc = "ratio of every stage of the lightest arrangement, 1 for unused stages")
+
+        diagonal = np.arange(n)
+        self.declare_partials("wt", ["R_RPM", "K_gearbox_metric", "motor_speed", "HP_out"], rows = diagonal, cols = diagonal)
+
+    def _best(self, inputs): # index of the lightest arrangement of every design, picked on the real part so that complex steps do not move it
+        real = [np.real(inputs[name]) for name in ["HP_out", "K_gearbox_metric", "R_RPM", "motor_speed"]]
+
+        return(multistage_gearbox_weight(*real, stages = self.options["stages"], splits = self.options["splits"], max_stage_ratio = self.options["max_stage_ratio"])[1])
+
+    def _stage_terms(self, inputs, best): # motor_speed**a_i * R_RPM**b_i of the stages of the lightest arrangements, (vec_size, stages)
+        a, b = self.a[best], self.b[best]
+
+        return(a, b, np.where(self.used[best], inputs["motor_speed"][:, None]**a * inputs["R_RPM"][:, None]**b, 0.))
+
+    def compute(self, inputs, outputs):
+        best = self._best(inputs)
+        terms = self._stage_terms(inputs, best)[2]
+
+        outputs["wt"] = inputs["K_gearbox_metric"] * inputs["HP_out"]**.76 * np.sum(terms, axis = 1)
+        outputs["num_stages"] = self.counts[best]
+        outputs["stage_ratios"] = (np.real(inputs["motor_speed"]) / np.real(inputs["R_RPM"]))[:, None]**self.fractions[best]
+
+    def compute_partials(self, inputs, J):
+        HP_out = inputs["HP_out"]
+        K_gearbox = inputs["K_gearbox_metric"]
+        a, b, terms = self._stage_terms(inputs, self._best(inputs))
+        scale = K_gearbox * HP_out**.76
+
+        J["wt", "motor_speed"] = scale * np.sum(a * terms, axis = 1) / inputs["motor_speed"]
+        J["wt", "R_RPM"] = scale * np.sum(b * terms, axis = 1) / inputs["R_RPM"]
+        J["wt", "HP_out"] = .76 * K_gearbox * HP_out**(-.24) * np.sum(terms, axis = 1)
+        J["wt", "K_gearbox_metric"] = HP_out**.76 * np.sum(terms, axis = 1)
+
+def test_gearbox_weight(vec_size = 1):
+    prob = Problem()
+    prob.model = GearboxWeight(vec_size = vec_size)
+
+    prob.setup(check = False, force_alloc_complex = True)
+
+    prob.run_model()
+
+    return(prob)
+
+def test_multistage_gearbox_weight(vec_size = 1, **options):
     prob = Problem()
-    prob.model = GearboxWeight()
+    prob.model = MultiStageGearboxWeight(vec_size = vec_size, **options)
 
     prob.setup(check = False, force_alloc_complex = True)
 
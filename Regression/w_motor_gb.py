@@ -1,6 +1,7 @@
+import numpy as np
 from openmdao.api import Problem, Group, IndepVarComp
-from regression_motor_sizing import Regression
-from gearbox_weight_component import GearboxWeight
+from w_motor_reg import Regression
+from w_gearbox import GearboxWeight, MultiStageGearboxWeight
 from num_motors import NumMotors 
 
 class MotorGearbox(Group):
@@ -12,18 +13,24 @@ class MotorGearbox(Group):
         self.options.declare("motor_rpm", default = 20000, desc = "Motor speed in RPM")
         self.options.declare("num_motors", default = 4, desc = "Number of motors")
         self.options.declare("keywords", default = ["Axial"], types = list, desc = "Keywords to specify type of motor")
+        self.options.declare("gearbox_stages", default = None, types = list, allow_none = True, desc = "Stage counts of a multi-stage gearbox to pick the lightest from, None for the single stage formula")
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of independent designs sized at once, the inputs and outputs are vectors of this length")
 
     def setup(self):
         ### set up inputs
+        n = self.options["vec_size"]
         indeps = self.add_subsystem("indeps", IndepVarComp(), promotes = ["*"])
-        indeps.add_output("power", self.options["power"], units = "kW", desc = "Output power of each motor")
-        indeps.add_output("K_gearbox_metric", self.options["K_gearbox_metric"], desc = "Empirical factor determined by technology level")
-        indeps.add_output("prop_RPM", self.options["prop_RPM"], units = "rpm", desc = "Rotational speed of prop attached to gearbox")
-        indeps.add_output("motor_rpm", self.options["motor_rpm"], units = "rpm", desc = "Rotational speed of motor")
+        indeps.add_output("power", self.options["power"] * np.ones(n), units = "kW", desc = "Output power of each motor")
+        indeps.add_output("K_gearbox_metric", self.options["K_gearbox_metric"] * np.ones(n), desc = "Empirical factor determined by technology level")
+        indeps.add_output("prop_RPM", self.options["prop_RPM"] * np.ones(n), units = "rpm", desc = "Rotational speed of prop attached to gearbox")
+        indeps.add_output("motor_rpm", self.options["motor_rpm"] * np.ones(n), units = "rpm", desc = "Rotational speed of motor")
         ### create connections
-        self.add_subsystem("motor", Regression(keywords = self.options["keywords"]), promotes_inputs = ["power"])
-        self.add_subsystem("gearbox", GearboxWeight(), promotes_inputs = ["K_gearbox_metric"])
-        self.add_subsystem("combine", NumMotors(num_motors = self.options["num_motors"]), promotes_outputs = ["W_motor_gearbox"])
+        self.add_subsystem("motor", Regression(keywords = self.options["keywords"], vec_size = n), promotes_inputs = ["power"])
+        if self.options["gearbox_stages"] is None:
+            self.add_subsystem("gearbox", GearboxWeight(vec_size = n), promotes_inputs = ["K_gearbox_metric"])
+        else:
+            self.add_subsystem("gearbox", MultiStageGearboxWeight(stages = self.options["gearbox_stages"], vec_size = n), promotes_inputs = ["K_gearbox_metric"])
+        self.add_subsystem("combine", NumMotors(num_motors = self.options["num_motors"], vec_size = n), promotes_outputs = ["W_motor_gearbox"])
         self.connect("power", "gearbox.HP_out")
         self.connect("prop_RPM", "gearbox.R_RPM")
         self.connect("motor_rpm", "gearbox.motor_speed")
@@ -31,9 +38,9 @@ class MotorGearbox(Group):
         self.connect("gearbox.wt", "combine.gb_wt")
 
 
-def test_w_motor_gb():
+def test_w_motor_gb(vec_size = 1):
     prob = Problem()
-    prob.model = MotorGearbox()
+    prob.model = MotorGearbox(vec_size = vec_size)
 
     prob.setup(check = False, force_alloc_complex = True)
 
@@ -1,8 +1,11 @@
-from collections import namedtuple
+import os
+from collections import namedtuple, OrderedDict
 from itertools import chain
 import numpy as np 
 import matplotlib.pyplot as plt 
 from openmdao.api import Problem, Group, IndepVarComp, ExplicitComponent
+from artifacts import fingerprint, save_artifact, load_artifact
+import regression_fits
 
 # Motor Specification
 # pwr - Rated power (kW)
@@ -129,32 +132,143 @@ def filter_data(keywords): # This function extracts the motor weight, motor powe
     return(x, y, motors)
 
 
+class MotorCatalog(object): # This class stores the motor data as columns, with a sorted index for each column and a keyword bitmask for each motor, so that queries never loop over the motors
+
+    def __init__(self, motors = Motors):
+        self.names = np.array([i[0] for i in motors])
+        self.size = len(motors)
+        self.columns = {}   # one float array per MotorDatum field
+        self.order = {}     # argsort of each column, used to map a binary search result back to motor indices
+        self.sorted = {}    # each column in ascending order, used for the binary search
+        for field in MotorDatum._fields:
+            column = np.array([getattr(i[1], field) for i in motors], dtype = float)
+            self.columns[field] = column
+            self.order[field] = np.argsort(column, kind = "mergesort")
+            self.sorted[field] = column[self.order[field]]
+
+        self.words = sorted(set(chain.from_iterable(i[2] for i in motors)))
+        if len(self.words) > 64:
+            raise Exception("The catalog has %s keywords, but the keyword bitmasks only hold 64" %(len(self.words)))
+        self.bits = dict((word, np.uint64(1) << np.uint64(k)) for k, word in enumerate(self.words))
+        self.masks = np.array([sum(int(self.bits[word]) for word in i[2]) for i in motors], dtype = np.uint64)
+        self.fingerprint = fingerprint(list(self.names), [self.columns[field].tolist() for field in MotorDatum._fields], self.words, self.masks.tolist())   # changes whenever a motor is added, removed or edited
+
+    def keyword_mask(self, keywords): # returns a boolean array of the motors whose keywords include every keyword specified
+        keywords = set(keywords)
+        if not keywords.issubset(self.bits):
+            raise Exception("One or more of your keywords: %s are incompatible or not allowed" %(keywords))
+        want = np.uint64(sum(int(self.bits[word]) for word in keywords))
+
+        return((self.masks & want) == want)
+
+    def range_mask(self, field, lower = None, upper = None): # returns a boolean array of the motors with lower <= field <= upper, found by binary search of the sorted column
+        if field not in self.columns:
+            raise Exception("%s is not a motor attribute, choose from %s" %(field, MotorDatum._fields))
+        start = 0 if lower is None else np.searchsorted(self.sorted[field], lower, side = "left")
+        stop = self.size if upper is None else np.searchsorted(self.sorted[field], upper, side = "right")
+        mask = np.zeros(self.size, dtype = bool)
+        mask[self.order[field][start:stop]] = True
+
+        return(mask)
+
+    def query(self, keywords = [], **ranges): # returns the indices of the motors that have all the keywords and fall inside every (lower, upper) range, None meaning unbounded. Example: query(["Aero"], pwr = (100, 400), rpm_max = (5000, None))
+        mask = self.keyword_mask(keywords)
+        for field, (lower, upper) in ranges.items():
+            mask &= self.range_mask(field, lower, upper)
+
+        return(np.flatnonzero(mask))
+
+    def project(self, index, columns = ("pwr", "w")): # returns the requested columns for the motors in index, one array per column
+        return(dict((field, self.columns[field][index]) for field in columns))
+
+catalog = MotorCatalog()
+
+
+def query_data(keywords, ranges): # Same outputs as filter_data, but for the motors returned by a catalog range query
+    index = catalog.query(keywords, **ranges)
+    if np.size(index) == 0:
+        raise Exception("No motors have the keywords: %s within the ranges: %s" %(set(keywords), ranges))
+    data = catalog.project(index)
+
+    return(data["pwr"], data["w"], list(catalog.names[index]))
+
+
+def regression_coefficients(keywords, ranges = None, model = "linear"): # returns the coefficients of the weight vs. power regression (slope and intercept for the linear model), so that weights can be computed for arrays of powers without a Problem
+    data = filter_data(keywords) if ranges is None else query_data(keywords, ranges)
+
+    return(regression_fits.fit(data[0], data[1], model))
+
+
+def fit_keyword_sets(keyword_sets, models = ("linear",), ranges = None): # fits every model to the motors of every keyword set in one batched solve per model. Returns the fits by model, see regression_fits.fit_batch
+    mask = np.ones(catalog.size, dtype = bool)
+    for field, (lower, upper) in (ranges or {}).items():
+        mask &= catalog.range_mask(field, lower, upper)
+    masks = np.array([catalog.keyword_mask(keywords) & mask for keywords in keyword_sets]).reshape(len(keyword_sets), catalog.size)
+
+    return(OrderedDict((model, regression_fits.fit_batch(catalog.columns["pwr"], catalog.columns["w"], masks, model)) for model in models))
+
+
+def regression_fingerprint(keywords, ranges = None, model = "linear"): # fingerprint of the catalog, of the motor selection and of the model form that a regression is fitted with
+    return(fingerprint(catalog.fingerprint, sorted(keywords), sorted((ranges or {}).items()), model))
+
+
+def save_regression(path, keywords, ranges = None, model = "linear"): # fits the regression and saves its coefficients and data to an artifact at path (.npz, or .h5 with h5py)
+    data = filter_data(keywords) if ranges is None else query_data(keywords, ranges)
+    arrays = {"coefficients": regression_fits.fit(data[0], data[1], model), "power": np.array(data[0], dtype = float), "weight": np.array(data[1], dtype = float), "names": np.array(data[2])}
+    save_artifact(path, arrays, "regression", regression_fingerprint(keywords, ranges, model), keywords = sorted(keywords), ranges = sorted((ranges or {}).items()), model = model)
+
+
+def load_regression(path, keywords, ranges = None, model = "linear"): # returns the regression artifact at path, refitting and saving it first if it is missing or was fitted to a different catalog, selection or model
+    fresh = regression_fingerprint(keywords, ranges, model)
+    if os.path.exists(path):
+        artifact = load_artifact(path, "regression")
+        if not artifact.is_stale(fresh):
+            return(artifact)
+        artifact.close()
+    save_regression(path, keywords, ranges, model)
+
+    return(load_artifact(path, "regression"))
+
+
 #################################################################################### OpenMDAO model ####################################################################################################
 
 class Regression(ExplicitComponent): # This component calculates a linear regression and its derivatives for the power and weight of the desired motors.
 
     def initialize(self):
         self.options.declare("keywords", default = ["Axial"], types = list, desc = "keywords to use in component")
+        self.options.declare("ranges", default = None, types = dict, allow_none = True, desc = "optional (lower, upper) bounds on motor attributes, e.g. {'pwr': (100, 400)}, to narrow the motors used in the fit")
+        self.options.declare("model", default = "linear", values = list(regression_fits.models), desc = "form of the regression, see regression_fits.py")
+        self.options.declare("artifact", default = None, types = str, allow_none = True, desc = "optional path of a saved regression (see save_regression), loaded instead of fitting. It is refitted and saved when missing or stale")
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of motor powers evaluated at once")
 
     def setup(self):
-        data = filter_data(self.options["keywords"])
-        self.raw_power = data[0]     # powers of the motors
-        raw_weight = data[1]    # actual weights of the motors
-          
-        self.coefficients = np.polyfit(self.raw_power, raw_weight, 1)    # coefficients of the linear regression line.  [0] is the slope, and [1] is the y-intercept
-
-        self.add_input("power", val = 500, units = "kW", desc = "power of the motor") 
-        self.add_output("wt", units = "kg", desc = "outputted weight of motor")   
+        if self.options["artifact"] is not None:
+            artifact = load_regression(self.options["artifact"], self.options["keywords"], self.options["ranges"], self.options["model"])
+            self.raw_power = artifact["power"]
+            self.coefficients = np.array(artifact["coefficients"])
+        else:
+            if self.options["ranges"] is None:
+                data = filter_data(self.options["keywords"])
+            else:
+                data = query_data(self.options["keywords"], self.options["ranges"])
+            self.raw_power = data[0]     # powers of the motors
+            raw_weight = data[1]    # actual weights of the motors
+
+            self.coefficients = regression_fits.fit(self.raw_power, raw_weight, self.options["model"])    # coefficients of the regression.  For the linear model [0] is the slope, and [1] is the y-intercept
+
+        n = self.options["vec_size"]
+        self.add_input("power", val = 500 * np.ones(n), units = "kW", desc = "power of the motor") 
+        self.add_output("wt", shape = n, units = "kg", desc = "outputted weight of motor")   
         self.add_output("regression_weights", shape = np.shape(self.raw_power), units = "kg", desc = "corresponding fitted weights for regression plot, no actual bearing on model, but used for visual aid")
 
-        self.declare_partials("wt", "power")
+        self.declare_partials("wt", "power", rows = np.arange(n), cols = np.arange(n))
 
     def compute(self, inputs, outputs):
-        outputs["wt"] = np.add(np.multiply(self.coefficients[0], inputs["power"]), self.coefficients[1])
-        outputs["regression_weights"] = np.add(np.multiply(self.coefficients[0], self.raw_power), self.coefficients[1])
+        outputs["wt"] = regression_fits.evaluate(self.options["model"], self.coefficients, inputs["power"])
+        outputs["regression_weights"] = regression_fits.evaluate(self.options["model"], self.coefficients, np.asarray(self.raw_power, dtype = float))
 
     def compute_partials(self, inputs, J):
-        J["wt", "power"] = self.coefficients[0]
+        J["wt", "power"] = regression_fits.derivative(self.options["model"], self.coefficients, inputs["power"])
 
 ############################################################################################### Test Function ##############################################################################################
 def test_regression_motor_sizing():
@@ -194,4 +308,4 @@ if __name__ == "__main__":
         plt.xlabel("Power (kW)")
         plt.ylabel("Weight (kg)")
         plt.legend(["Actual Motors", "Your Motor", "Regression Line"])
-        plt.show()
\ No newline at end of file
+        plt.show()
\ No newline at end of file
@@ -0,0 +1,122 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from dep_computational_sizing import design_point, design_margins, D_out_s_min, D_out_s_max, n_min, n_max
+
+### Adaptive version of the design map in dep_computational_sizing.py. The (outer diameter, speed) plane starts as a coarse grid of cells and a cell is
+### split in four (or in two once one side is at its tolerance) while a constraint margin changes sign between its corners or the weight changes by
+### more than weight_tol across it. The corners of all the cells of one level are evaluated as one batch. Cell corners sit on an integer lattice at the
+### finest resolution, so a corner shared by several cells is evaluated once. The boundaries end up resolved to the tolerance with far fewer
+### evaluations than a uniform grid at that tolerance.
+
+constraints = list(design_margins(design_point(D_out_s_min, n_min * 10**3)))
+
+def _lattice(lower, upper, cells, tol): # number of refinement levels so that a coarse cell split that many times is no larger than tol
+    levels = int(max(np.ceil(np.log2((upper - lower) / (cells * tol))), 0))
+
+    return(levels, (upper - lower) / (cells * 2**levels))
+
+def refine_map(D_range = (D_out_s_min, D_out_s_max), n_range = (n_min * 10**3, n_max * 10**3), coarse = (8, 8), tol = (1e-4, 10.), weight_tol = .05, max_evaluations = 10**6): # returns the evaluated points and the leaf cells of the adaptive map
+    levels_D, step_D = _lattice(D_range[0], D_range[1], coarse[0], tol[0])
+    levels_n, step_n = _lattice(n_range[0], n_range[1], coarse[1], tol[1])
+    size_D, size_n = 2**levels_D, 2**levels_n             # coarse cell size in lattice units
+    columns = coarse[1] * size_n + 1                        # lattice points along the speed axis, used to number the points
+
+    i, j = np.meshgrid(np.arange(coarse[0]) * size_D, np.arange(coarse[1]) * size_n, indexing = "ij")
+    cells = np.column_stack([i.ravel(), j.ravel(), np.full(i.size, size_D), np.full(i.size, size_n)])   # lower corner and size of every open cell
+    keys = np.zeros(0, dtype = np.int64)    # lattice numbers of the evaluated points, sorted
+    values = None                            # design_point and design_margins results of the evaluated points, in the order of keys
+    leaves = []
+
+    while len(cells) > 0:
+        corners = [(cells[:, 0] + a * cells[:, 2], cells[:, 1] + b * cells[:, 3]) for a in [0, 1] for b in [0, 1]]
+        corner_keys = np.column_stack([ci * columns + cj for ci, cj in corners])
+        new = np.setdiff1d(corner_keys, keys)
+        if len(keys) + len(new) > max_evaluations:
+            raise Exception("The adaptive map needs more than %s evaluations, increase the tolerances or max_evaluations" %(max_evaluations))
+        D = D_range[0] + (new // columns) * step_D
+        n = n_range[0] + (new % columns) * step_n
+        point = design_point(D, n)
+        point.update(design_margins(point))
+        point["weight"] = point["Motor_tot_w_s"] + point["Gearbox_w_kg"]
+        point.update({"D_out_s": D, "n": n})
+
+        keys = np.concatenate([keys, new])
+        order = np.argsort(keys, kind = "mergesort")
+        keys = keys[order]
+        values = point if values is None else dict((name, np.concatenate([values[name], point[name]])[order]) for name in values)
+
+        rows = np.searchsorted(keys, corner_keys)   # (cells, 4) rows of the corners in values
+        split = np.zeros(len(cells), dtype = bool)
+        for name in constraints:
+            margins = values[name][rows]
+            split |= (np.min(margins, axis = 1) < 0) & (np.max(margins, axis = 1) >= 0)
+        weights = values["weight"][rows]
+        split |= (np.max(weights, axis = 1) - np.min(weights, axis = 1)) > weight_tol * np.min(weights, axis = 1)
+        split &= (cells[:, 2] > 1) | (cells[:, 3] > 1)
+
+        leaves.append(cells[~split])
+        cells = cells[split]
+        half_D = np.maximum(cells[:, 2] // 2, 1)
+        half_n = np.maximum(cells[:, 3] // 2, 1)
+        children = []
+        for a in [0, 1]:
+            for b in [0, 1]:
+                child = np.column_stack([cells[:, 0] + a * half_D, cells[:, 1] + b * half_n, half_D, half_n])
+                keep = ((a == 0) | (cells[:, 2] > 1)) & ((b == 0) | (cells[:, 3] > 1))   # a side at its tolerance is not split
+                children.append(child[keep])
+        cells = np.concatenate(children)
+
+    leaves = np.concatenate(leaves)
+    corner_keys = np.column_stack([(leaves[:, 0] + a * leaves[:, 2]) * columns + leaves[:, 1] + b * leaves[:, 3] for a in [0, 1] for b in [0, 1]])
+    cell_bounds = np.column_stack([D_range[0] + leaves[:, 0] * step_D, D_range[0] + (leaves[:, 0] + leaves[:, 2]) * step_D,
+                                   n_range[0] + leaves[:, 1] * step_n, n_range[0] + (leaves[:, 1] + leaves[:, 3]) * step_n])
+
+    return({"points": values, "cells": cell_bounds, "corners": np.searchsorted(keys, corner_keys), "evaluations": len(keys),
+            "step": (step_D, step_n), "uniform_evaluations": (coarse[0] * size_D + 1) * columns})
+
+def boundary_points(result, constraint): # (D_out_s, n) points where a constraint margin is zero, interpolated linearly along the edges of the leaf cells
+    margins = result["points"][constraint]
+    D = result["points"]["D_out_s"]
+    n = result["points"]["n"]
+    corners = result["corners"]   # corners in the order (D low, n low), (D low, n high), (D high, n low), (D high, n high)
+    edges = np.concatenate([corners[:, [0, 1]], corners[:, [2, 3]], corners[:, [0, 2]], corners[:, [1, 3]]])
+    edges = np.unique(np.sort(edges, axis = 1), axis = 0)
+    m0, m1 = margins[edges[:, 0]], margins[edges[:, 1]]
+    crossing = (m0 < 0) != (m1 < 0)
+    edges, m0, m1 = edges[crossing], m0[crossing], m1[crossing]
+    t = m0 / (m0 - m1)
+
+    return(D[edges[:, 0]] + t * (D[edges[:, 1]] - D[edges[:, 0]]), n[edges[:, 0]] + t * (n[edges[:, 1]] - n[edges[:, 0]]))
+
+def feasible_minimum(result, weight = "weight"): # lightest evaluated design that meets every constraint, as a dictionary of its values
+    points = result["points"]
+    feasible = np.all([points[name] >= 0 for name in constraints], axis = 0)
+    if not np.any(feasible):
+        raise Exception("No evaluated design meets every constraint")
+    best = np.flatnonzero(feasible)[np.argmin(points[weight][feasible])]
+
+    return(dict((name, values[best]) for name, values in points.items()))
+
+def test_adaptive_map():
+    return(refine_map())
+
+if __name__ == "__main__":
+
+    result = test_adaptive_map()
+    best = feasible_minimum(result)
+    print("%s evaluations instead of %s for a uniform grid at %.2e m / %.1f RPM" %(result["evaluations"], result["uniform_evaluations"], result["step"][0], result["step"][1]))
+    print("Lightest feasible design: D_out = %.4f m at %.0f RPM, motor + gearbox weight %.2f kg" %(best["D_out_s"], best["n"], best["weight"]))
+
+    points = result["points"]
+    plt.figure(0)
+    plt.plot(points["n"], points["D_out_s"], ",", color = "grey")
+    for name, style in [("Tip_speed_max", ":k"), ("Tip_speed_min", ":b"), ("Thermal_AR_max", "--k"), ("Thermal_AR_min", "--b"), ("L_D_AR_max", "-.k"), ("L_D_AR_min", "-.b")]:
+        D, n = boundary_points(result, name)
+        order = np.argsort(n)
+        plt.plot(n[order], D[order], style, linewidth = 1.75, label = name)
+    plt.plot(best["n"], best["D_out_s"], "o", color = "red", label = "Lightest feasible design")
+
+    plt.xlabel('Motor Operating Speed, RPM')
+    plt.ylabel('Outer Diameter, m')
+    plt.legend()
+    plt.show()
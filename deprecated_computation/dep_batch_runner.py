@@ -0,0 +1,181 @@
+import io
+import re
+import sys
+import csv
+from itertools import islice
+import argparse
+from collections import deque, OrderedDict
+from multiprocessing import Pool
+import numpy as np
+import dep_input_file as input_file
+from dep_service import WarmModel, request_fields
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+### Command line batch runner. Reads design rows from a CSV file (or stdin) in chunks, sizes every chunk as one vectorized batch with the same models as
+### the MotorGearbox group, and streams the results to CSV (or stdout) or Parquet, so memory stays bounded by the chunk size whatever the table size.
+### Columns: power, motor_rpm, prop_RPM, K_gearbox_metric, num_motors (missing columns and blank cells take the MotorGearbox defaults) and keywords, separated by ; or
+### spaces (the dep_input_file keywords when empty). Example: python dep_batch_runner.py designs.csv -o results.parquet --jobs 4 --algorithm computation
+
+_models = {}   # warm models of this process by (keywords, algorithm)
+
+def warm_model(keywords, algorithm):
+    key = (tuple(sorted(keywords)), algorithm)
+    if key not in _models:
+        _models[key] = WarmModel(keywords, algorithm)
+
+    return(_models[key])
+
+def parse_keywords(text):
+    keywords = [word for word in re.split(r"[;\s]+", text) if word]
+
+    return(keywords if keywords else list(input_file.keywords))
+
+def evaluate_chunk(header, rows, algorithm = "regression"): # sizes a chunk of CSV rows and returns its output columns, rows with the same keywords are evaluated as one batch
+    chunk = OrderedDict()
+    if not rows:   # a chunk of blank lines, its empty request columns are skipped by run
+        for name in request_fields:
+            chunk[name] = np.zeros(0)
+        return(chunk)
+
+    columns = list(zip(*[row + [""] * (len(header) - len(row)) for row in rows]))   # short rows are padded with blank cells
+    for name, default in request_fields.items():
+        if name in header:
+            chunk[name] = np.array([cell if cell.strip() else default for cell in columns[header.index(name)]], dtype = float)
+        else:
+            chunk[name] = np.full(len(rows), float(default))
+    texts, groups = np.unique(columns[header.index("keywords")] if "keywords" in header else [""], return_inverse = True)
+    keywords = [parse_keywords(text) for text in texts]   # parsed once per distinct keyword set
+
+    results = OrderedDict()
+    groups = np.broadcast_to(groups, (len(rows),))
+    for k, words in enumerate(keywords):
+        index = np.flatnonzero(groups == k)
+        batch = dict((name, values[index]) for name, values in chunk.items())
+        for name, values in warm_model(words, algorithm).evaluate(batch).items():
+            results.setdefault(name, np.zeros(len(rows)))[index] = values
+
+    chunk.update(results)   # motor_rpm is replaced by the speed the model was evaluated at, the optimal one for the computation algorithm
+    chunk["keywords"] = np.array([";".join(words) for words in keywords])[groups]
+
+    return(chunk)
+
+def read_chunks(stream, chunk_size): # yields (header, lines) for every chunk_size lines of a CSV stream. The lines are parsed by the workers
+    header = [name.strip() for name in next(csv.reader([stream.readline()]))]
+    while True:
+        lines = list(islice(stream, chunk_size))
+        if not lines:
+            break
+        yield(header, lines)
+
+def process_chunk(header, lines, algorithm, encode): # parses, sizes and encodes one chunk, run by the workers
+    rows = [row for row in csv.reader(lines) if row]
+
+    return(encode(evaluate_chunk(header, rows, algorithm)))
+
+def evaluate_chunks(chunks, algorithm = "regression", jobs = 1, encode = None): # yields the encoded results of the chunks in input order (the column arrays by default). With jobs > 1 at most 2 * jobs chunks are in flight at once
+    encode = column_arrays if encode is None else encode
+    if jobs == 1:
+        for header, lines in chunks:
+            yield(process_chunk(header, lines, algorithm, encode))
+        return
+
+    with Pool(jobs) as pool:
+        in_flight = deque()
+        for header, lines in chunks:
+            in_flight.append(pool.apply_async(process_chunk, (header, lines, algorithm, encode)))
+            if len(in_flight) >= 2 * jobs:
+                yield(in_flight.popleft().get())
+        while in_flight:
+            yield(in_flight.popleft().get())
+
+def csv_text(chunk): # the column names and the CSV text of an evaluated chunk
+    text = io.StringIO()
+    csv.writer(text, lineterminator = "\n").writerows(zip(*[values.tolist() for values in chunk.values()]))
+
+    return(list(chunk), len(chunk["power"]), text.getvalue())
+
+def column_arrays(chunk):
+    return(list(chunk), len(chunk["power"]), chunk)
+
+class CsvWriter(object):
+    encode = staticmethod(csv_text)
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.header = None
+
+    def write(self, header, text):
+        if self.header is None:
+            self.header = header
+            csv.writer(self.stream, lineterminator = "\n").writerow(header)
+        self.stream.write(text)
+
+    def close(self):
+        pass
+
+class ParquetWriter(object): # writes every chunk as a row group of one Parquet file, needs pyarrow
+    encode = staticmethod(column_arrays)
+
+    def __init__(self, path):
+        if pyarrow is None:
+            raise Exception("Parquet output needs pyarrow, which is not installed. Write CSV instead")
+        self.path = path
+        self.writer = None
+
+    def write(self, header, chunk):
+        table = pyarrow.table(OrderedDict((name, values) for name, values in chunk.items()))
+        if self.writer is None:
+            self.writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def run(source, destination, output_format = "csv", algorithm = "regression", chunk_size = 65536, jobs = 1): # sizes every design of the source stream into destination, a stream for CSV or a path for Parquet, and returns the number of designs
+    writer = ParquetWriter(destination) if output_format == "parquet" else CsvWriter(destination)
+    count = 0
+    try:
+        for header, size, encoded in evaluate_chunks(read_chunks(source, chunk_size), algorithm, jobs, writer.encode):
+            if size > 0:
+                writer.write(header, encoded)
+                count += size
+    finally:
+        writer.close()
+
+    return(count)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Size a CSV table of motor + gearbox designs")
+    parser.add_argument("input", nargs = "?", default = "-", help = "CSV file of designs, - for stdin")
+    parser.add_argument("-o", "--output", default = "-", help = "output file, - for stdout. A .parquet extension writes Parquet")
+    parser.add_argument("--format", choices = ["csv", "parquet"], default = None, help = "output format, by default from the output extension")
+    parser.add_argument("--algorithm", choices = ["regression", "computation"], default = "regression")
+    parser.add_argument("--chunk-size", type = int, default = 65536, help = "designs evaluated per batch")
+    parser.add_argument("--jobs", type = int, default = 1, help = "number of worker processes")
+    args = parser.parse_args(argv)
+
+    output_format = args.format or ("parquet" if args.output.endswith(".parquet") else "csv")
+    if output_format == "parquet" and args.output == "-":
+        raise Exception("Parquet output needs a file, use --output")
+
+    source = sys.stdin if args.input == "-" else open(args.input, newline = "")
+    destination = args.output if output_format == "parquet" else sys.stdout if args.output == "-" else open(args.output, "w", newline = "")
+    try:
+        count = run(source, destination, output_format, args.algorithm, args.chunk_size, args.jobs)
+    finally:
+        for stream in [source, destination]:
+            if stream not in [sys.stdin, sys.stdout] and not isinstance(stream, str):
+                stream.close()
+
+    return(count)
+
+if __name__ == "__main__":
+
+    count = main()
+    sys.stderr.write("Sized %s designs\n" %(count))
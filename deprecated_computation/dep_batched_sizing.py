@@ -0,0 +1,103 @@
+import io
+import os
+import tempfile
+from time import time
+from contextlib import redirect_stdout
+import numpy as np
+from openmdao.api import Problem, Group, ExplicitComponent, ScipyOptimizeDriver
+from openmdao.utils.coloring import dynamic_total_coloring
+from dep_switch_sizing_method import MotorGearbox
+
+### Gradient-based sizing of many independent designs at once. MotorGearbox is set up with vec_size designs, so motor_speed is a vector design variable
+### and the weight of every design is a vector constraint, and the objective is the total weight. Every component declares its partials as diagonal
+### (rows = cols), so the total jacobian is block diagonal apart from the objective row, and the driver's simultaneous total derivative coloring solves
+### it with one forward solve for all the design points plus one reverse solve for the objective, however many designs are in the batch. Without the
+### coloring compute_totals does one linear solve per design variable entry.
+### Example: python dep_batched_sizing.py
+
+class BatchTotal(ExplicitComponent): # sum of the weights of all the designs, the objective of a batch
+
+    def initialize(self):
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of designs in the batch")
+
+    def setup(self):
+        n = self.options["vec_size"]
+        self.add_input("W_motor_gearbox", val = np.ones(n), units = "kg", desc = "weight of the motors and gearboxes of every design")
+        self.add_output("total_wt", units = "kg", desc = "weight of the motors and gearboxes of all the designs")
+
+        self.declare_partials("total_wt", "W_motor_gearbox", val = np.ones((1, n)))
+
+    def compute(self, inputs, outputs):
+        outputs["total_wt"] = np.sum(inputs["W_motor_gearbox"])
+
+class BatchedSizing(Group):
+
+    def initialize(self):
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of independent designs sized at once")
+        self.options.declare("algorithm", default = "computation", desc = "Name of a vectorized sizing backend, see dep_switch_sizing_method.py")
+        self.options.declare("sizing_options", default = {}, types = dict, desc = "Other options of the MotorGearbox group")
+
+    def setup(self):
+        n = self.options["vec_size"]
+        self.add_subsystem("sizing", MotorGearbox(algorithm = self.options["algorithm"], vec_size = n, **self.options["sizing_options"]), promotes = ["*"])
+        self.add_subsystem("total", BatchTotal(vec_size = n), promotes = ["*"])
+
+def batched_problem(vec_size, algorithm = "computation", coloring = True, max_weight = 10**4, coloring_dir = None, **sizing_options): # batch optimization problem of motor_speed, with the total derivative coloring declared on the driver
+    prob = Problem()
+    prob.model = BatchedSizing(vec_size = vec_size, algorithm = algorithm, sizing_options = sizing_options)
+    group = MotorGearbox(**sizing_options)   # for the default speed limits
+    prob.model.add_design_var("motor_speed", lower = group.options["min_RPM"], upper = group.options["max_RPM"], ref = 10**4)
+    prob.model.add_objective("total_wt", ref = 100. * vec_size)
+    prob.model.add_constraint("W_motor_gearbox", upper = max_weight, ref = max_weight)
+
+    prob.driver = ScipyOptimizeDriver()
+    prob.driver.options["optimizer"] = "SLSQP"
+    prob.driver.options["disp"] = False
+    if coloring:
+        prob.driver.declare_coloring(show_summary = False)
+    # the coloring is written to a file at the start of run_driver, kept out of the working directory
+    prob.options["coloring_dir"] = os.path.join(tempfile.gettempdir(), "dep_batched_sizing") if coloring_dir is None else coloring_dir
+
+    prob.setup(check = False)
+
+    return(prob)
+
+def count_linear_solves(prob): # number of linear solves and time of one total jacobian of the driver's design variables and responses, with the driver's coloring once it is computed
+    # Problem.compute_totals prints one "Elapsed Time:" line per linear solve with debug_print (OpenMDAO 2.x), which is what is counted. The time is
+    # taken from a second call without the printing
+    output = io.StringIO()
+    with redirect_stdout(output):
+        prob.compute_totals(debug_print = True)
+    t0 = time()
+    prob.compute_totals()
+    elapsed = time() - t0
+
+    return(sum(line.startswith("Elapsed Time:") for line in output.getvalue().splitlines()), elapsed)
+
+def benchmark(sizes = (1, 10, 100, 1000), algorithm = "computation"): # linear solves and time of a total jacobian, without and with coloring, for every batch size
+    rows = []
+    for vec_size in sizes:
+        row = {"vec_size": vec_size}
+        for coloring in [False, True]:
+            prob = batched_problem(vec_size, algorithm, coloring)
+            prob.run_model()
+            if coloring:
+                dynamic_total_coloring(prob.driver, run_model = False)   # as run_driver does before the first iteration
+            solves, elapsed = count_linear_solves(prob)
+            row["colored" if coloring else "uncolored"] = {"solves": solves, "time": elapsed}
+        rows.append(row)
+
+    return(rows)
+
+def test_batched_sizing(vec_size = 8, algorithm = "computation"):
+    prob = batched_problem(vec_size, algorithm)
+    prob["motor_speed"] = np.linspace(prob.model.sizing.options["min_RPM"], prob.model.sizing.options["max_RPM"], vec_size)
+    prob.run_driver()
+
+    return(prob)
+
+if __name__ == "__main__":
+
+    print("%8s %18s %18s %12s %12s" %("designs", "solves uncolored", "solves colored", "time (s)", "colored (s)"))
+    for row in benchmark():
+        print("%8d %18d %18d %12.4f %12.4f" %(row["vec_size"], row["uncolored"]["solves"], row["colored"]["solves"], row["uncolored"]["time"], row["colored"]["time"]))
@@ -38,11 +38,16 @@
 # 10) Operational Speed of rotor [RPM] - Fan_RPM 
 # 11) Technology factor of gearbox - K_gearbox 
 
+import os
+import sys
 from math import pi
 import numpy as np
 import matplotlib.pyplot as plt
 from openmdao.api import Problem, Group, IndepVarComp, ScipyOptimizeDriver
-from computational_sizing_component import MotorGearboxWeight
+from dep_computational_sizing_component import MotorGearboxWeight
+import dep_input_file as input_file
+from artifacts import fingerprint, module_fingerprint, save_artifact, load_artifact
+from dep_recorder import ColumnRecorder
 
 ### Inputs #################################################################################################################################################################################################
 
@@ -212,26 +217,90 @@ L_ts_min = np.zeros((n_sz,1))                   # Corresponding Length to Min al
 E_RPM = n                                                         # 'Motor RPM' in Krantz Formula - This is the faster speed input to the gearbox [RPM]
 R_RPM = np.ones((n_sz, 1))*Fan_RPM                                # 'Rotor RPM' in Krantz Formula - This is the slower speed input to gearbox [RPM]
 
+### Vectorized Map #########################################################################################################################################################################################
+def design_point(D_out_s, n): # returns the map calculations at the bottom of this file for outer diameters and speeds of any broadcastable shapes
+    n = np.asarray(n, dtype = float)
+    D_out_s = np.asarray(D_out_s, dtype = float)
+    D_out_ratio = D_out_s/D_out
+    Vol_s = np.divide(P_out*60 * 1000,(pi**2*S_stress*n*E*P_factor))
+    L_active_s = Vol_s/(D_ratio*D_out_s)**2
+
+    # every region keeps its baseline density, so its weight per unit stack length scales with the diameter ratio squared
+    radii = [Heat_sink_in, Yoke_in, Windings_in, Air_gap_in, Perm_mag_in, Titanium_in, Carbon_fib_in, Motor_out]
+    densities = [Heat_sink_d, Yoke_d, Windings_d, 0., Perm_mag_d, Titanium_d, Carbon_fib_d]   # the air gap has no weight
+    Region_w_per_L = sum(pi*(r_out**2 - r_in**2)*d for r_in, r_out, d in zip(radii[:-1], radii[1:], densities))
+    Stray_w_per_L = pi*Motor_out**2/Vol*Stray_w
+
+    return({"L_active_s": L_active_s,
+            "Motor_tot_w_s": (Region_w_per_L + Stray_w_per_L)*D_out_ratio**2*L_active_s,
+            "Thermal_AR": L_active_s*pole_num/(pi*D_ratio*D_out_s),
+            "L_D_AR": L_active_s/D_out_s,
+            "Tip_speed": pi*D_out_s*n/60,
+            "Gearbox_w_kg": K_gearbox*np.power(HP_out,0.76)*np.power(n,0.13)/np.power(Fan_RPM,0.89)*0.4535})
+
+def design_margins(point): # constraint margins of design_point results, as fractions of the limits. A design is feasible when every margin is >= 0
+    return({"Tip_speed_max": 1 - point["Tip_speed"]/max_ts, "Tip_speed_min": point["Tip_speed"]/min_ts - 1,
+            "Thermal_AR_max": 1 - point["Thermal_AR"]/Thermal_AR_max, "Thermal_AR_min": point["Thermal_AR"]/Thermal_AR_min - 1,
+            "L_D_AR_max": 1 - point["L_D_AR"]/LD_AR_max, "L_D_AR_min": point["L_D_AR"]/LD_AR_min - 1})
+
+def design_map(n = n, D_out_s = D_out_s): # returns the map calculations at the bottom of this file for every outer diameter (rows) and speed (columns) at once
+    n = np.asarray(n, dtype = float)
+    D_out_s = np.asarray(D_out_s, dtype = float)
+    point = design_point(D_out_s[:, np.newaxis], n)
+    Vol_s = np.divide(P_out*60 * 1000,(pi**2*S_stress*n*E*P_factor))
+    D_ts_max = np.divide(max_ts*60, (pi*n))
+    D_ts_min = np.divide(min_ts*60, (pi*n))
+
+    return({"n": n, "D_out_s": D_out_s,
+            "L_active_s": point["L_active_s"],
+            "Motor_tot_w_s": point["Motor_tot_w_s"],
+            "Thermal_AR": point["Thermal_AR"],
+            "L_D_AR": point["L_D_AR"],
+            "D_ts_max": D_ts_max, "D_ts_min": D_ts_min,
+            "L_ts_max": Vol_s/((D_ts_max*D_ratio)**2), "L_ts_min": Vol_s/((D_ts_min*D_ratio)**2),
+            "Gearbox_w_kg": point["Gearbox_w_kg"]})
+
+def design_map_fingerprint(n = n, D_out_s = D_out_s): # fingerprint of the inputs at the top of this file, of dep_input_file and of the map grid
+    return(fingerprint(module_fingerprint(sys.modules[__name__]), module_fingerprint(input_file), np.asarray(n, dtype = float).tolist(), np.asarray(D_out_s, dtype = float).tolist()))
+
+def save_design_map(path, n = n, D_out_s = D_out_s): # computes the design map and saves it to an artifact at path (.npz, or .h5 with h5py)
+    save_artifact(path, design_map(n, D_out_s), "design_map", design_map_fingerprint(n, D_out_s))
+
+def load_design_map(path, n = n, D_out_s = D_out_s): # returns the design map artifact at path, recomputing and saving it first if it is missing or its inputs changed
+    fresh = design_map_fingerprint(n, D_out_s)
+    if os.path.exists(path):
+        artifact = load_artifact(path, "design_map")
+        if not artifact.is_stale(fresh):
+            return(artifact)
+        artifact.close()
+    save_design_map(path, n, D_out_s)
+
+    return(load_artifact(path, "design_map"))
+
 ### Optimization ###########################################################################################################################################################################################
 class ComputationalWeight(Group):
 
+    def initialize(self):
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of independent designs sized at once, the inputs and outputs are vectors of this length")
+
     def setup(self):
         ### set up inputs
+        ones = np.ones(self.options["vec_size"])
         indeps = self.add_subsystem("indeps", IndepVarComp(), promotes = ["*"])
-        indeps.add_output("Motor_Density", Motor_Density, units = "kg / m**3", desc = "Volumetric Density of entire motor")
-        indeps.add_output("P_out", P_out, units = "kW", desc = "Output power of motor in W")
-        indeps.add_output("HP_out", HP_out, units = "hp", desc = "Output power of motor in HP")
-        indeps.add_output("S_stress", S_stress, units = "Pa", desc = "Magnetic shear stress of motor")
-        indeps.add_output("P_factor", P_factor, desc = "Power factor of motor")
-        indeps.add_output("K_gearbox_metric", K_gearbox_metric, desc = "Technology level of gearbox")
-        indeps.add_output("R_RPM", R_RPM[0], units = "rpm", desc = "Rotor RPM, slower gearbox speed")
-        indeps.add_output("motor_speed", n_max * 10**3, units = "rpm", desc = "Motor speed, the value that will be varied by the optimizer")
+        indeps.add_output("Motor_Density", Motor_Density * ones, units = "kg / m**3", desc = "Volumetric Density of entire motor")
+        indeps.add_output("P_out", P_out * ones, units = "kW", desc = "Output power of motor in W")
+        indeps.add_output("HP_out", HP_out * ones, units = "hp", desc = "Output power of motor in HP")
+        indeps.add_output("S_stress", S_stress * ones, units = "Pa", desc = "Magnetic shear stress of motor")
+        indeps.add_output("P_factor", P_factor * ones, desc = "Power factor of motor")
+        indeps.add_output("K_gearbox_metric", K_gearbox_metric * ones, desc = "Technology level of gearbox")
+        indeps.add_output("R_RPM", R_RPM[0] * ones, units = "rpm", desc = "Rotor RPM, slower gearbox speed")
+        indeps.add_output("motor_speed", n_max * 10**3 * ones, units = "rpm", desc = "Motor speed, the value that will be varied by the optimizer")
 
         ### create connections
-        self.add_subsystem("combined_weight", MotorGearboxWeight(), promotes_inputs = ["Motor_Density", "P_out", "HP_out", "S_stress", "P_factor", "K_gearbox_metric", "R_RPM", "motor_speed"])
+        self.add_subsystem("combined_weight", MotorGearboxWeight(vec_size = self.options["vec_size"]), promotes_inputs = ["Motor_Density", "P_out", "HP_out", "S_stress", "P_factor", "K_gearbox_metric", "R_RPM", "motor_speed"])
 
 ### Test Function ##########################################################################################################################################################################################
-def test_computational_weight():
+def test_computational_weight(recorder = None): # recorder, e.g. a dep_recorder.ColumnRecorder, is attached to the driver
     prob = Problem()
     prob.model = ComputationalWeight()
     prob.model.add_design_var("motor_speed", lower = n_min * 10**3, upper = n_max * 10**3)
@@ -240,6 +309,8 @@ def test_computational_weight():
     prob.driver = ScipyOptimizeDriver()
     prob.driver.options["maxiter"] = 20000
     prob.driver.options["optimizer"] = "COBYLA"
+    if recorder is not None:
+        prob.driver.add_recorder(recorder)
 
     prob.setup(check = False, force_alloc_complex = True)
 
@@ -252,7 +323,9 @@ def test_computational_weight():
 if __name__ == "__main__":
 
 ### OpenMDAO model #########################################################################################################################################################################################
-    prob = test_computational_weight()
+    path = ColumnRecorder(["motor_speed", "combined_weight.wt"])
+    prob = test_computational_weight(path)
+    prob.cleanup()
     prob.check_partials(compact_print = True, method = "cs")
 
     print("RPM: ", prob["motor_speed"], "Combined Weight: ", prob["combined_weight.wt"]) #at 15,000 RPM, actual motor weight = 65.381 kg, gearbox weight from equation = 16.897 kg, total = 82.278 kg
@@ -378,9 +451,10 @@ if __name__ == "__main__":
     plt.plot(n, Motor_tot_w_s[1,:],'b', linewidth= 2)#motor weight
     plt.plot(n, mySum, linewidth = 2)#total weight
     plt.plot(prob["motor_speed"], prob["combined_weight.wt"], "o", color = "red")#optimizer returned answer
+    plt.plot(path["motor_speed"], path["combined_weight.wt"], ".:", color = "red")#optimizer path
 
     plt.xlabel('Motor Operating Speed, RPM')
     plt.ylabel('Weight, kg')
 
-    plt.legend(['Theoretical Drive Systems', '1MW Power Trend Line', 'Gearbox Weight', 'Motor Weight', "Total Assembly Weight", "Optimizer's Total Assembly Weight"])
+    plt.legend(['Theoretical Drive Systems', '1MW Power Trend Line', 'Gearbox Weight', 'Motor Weight', "Total Assembly Weight", "Optimizer's Total Assembly Weight", "Optimizer Path"])
     plt.show()
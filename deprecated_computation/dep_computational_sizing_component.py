@@ -1,21 +1,30 @@
+import numpy as np
 from openmdao.api import ExplicitComponent, Problem
 from math import pi
 
+def motor_gearbox_weight(rho, P_out, HP_out, S_stress, P_factor, K_gearbox, R_RPM, motor_speed): # combined weight, works element-wise on arrays of designs
+    return(rho * (pi / 4) * 60 * P_out * 1000 / (pi**2 * S_stress * P_factor * motor_speed) + K_gearbox * HP_out**.76 * motor_speed**.13 / R_RPM**.89)
+
 class MotorGearboxWeight(ExplicitComponent):
 
+    def initialize(self):
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of designs evaluated at once")
+
     def setup(self):
-        self.add_input("Motor_Density", val = 3279.626, units = "kg / m**3", desc = "Volumetric Density of entire motor")
-        self.add_input("P_out", val = 1000, units = "kW", desc = "Output power of motor")
-        self.add_input("HP_out", val = 1341.02, units = "hp", desc = "Output power of motor in HP")
-        self.add_input("S_stress", val = 24.1 * 10**3, units = "Pa", desc = "Magnetic shear stress of motor")
-        self.add_input("P_factor", val = .95, desc = "Power factor of motor")
-        self.add_input("K_gearbox_metric", val = 32.688, desc = "Technology level of gearbox")
-        self.add_input("R_RPM", val = 4000, units = "rpm", desc = "Rotor RPM, slower gearbox speed")
-        self.add_input("motor_speed", val = 21000, units = "rpm", desc = "Motor speed, the value that will be varied by the optimizer")
+        n = self.options["vec_size"]
+        self.add_input("Motor_Density", val = 3279.626 * np.ones(n), units = "kg / m**3", desc = "Volumetric Density of entire motor")
+        self.add_input("P_out", val = 1000 * np.ones(n), units = "kW", desc = "Output power of motor")
+        self.add_input("HP_out", val = 1341.02 * np.ones(n), units = "hp", desc = "Output power of motor in HP")
+        self.add_input("S_stress", val = 24.1 * 10**3 * np.ones(n), units = "Pa", desc = "Magnetic shear stress of motor")
+        self.add_input("P_factor", val = .95 * np.ones(n), desc = "Power factor of motor")
+        self.add_input("K_gearbox_metric", val = 32.688 * np.ones(n), desc = "Technology level of gearbox")
+        self.add_input("R_RPM", val = 4000 * np.ones(n), units = "rpm", desc = "Rotor RPM, slower gearbox speed")
+        self.add_input("motor_speed", val = 21000 * np.ones(n), units = "rpm", desc = "Motor speed, the value that will be varied by the optimizer")
 
-        self.add_output("wt", units = "kg", desc = "weight of motor and gearbox")
+        self.add_output("wt", shape = n, units = "kg", desc = "weight of motor and gearbox")
 
-        self.declare_partials("wt", ["motor_speed", "Motor_Density", "P_out", "HP_out", "S_stress", "P_factor", "K_gearbox_metric", "R_RPM"])
+        diagonal = np.arange(n)   # every design only depends on its own inputs
+        self.declare_partials("wt", ["motor_speed", "Motor_Density", "P_out", "HP_out", "S_stress", "P_factor", "K_gearbox_metric", "R_RPM"], rows = diagonal, cols = diagonal)
 
     def compute(self, inputs, outputs):
         rho = inputs["Motor_Density"]
@@ -27,7 +36,7 @@ class MotorGearboxWeight(ExplicitComponent):
         R_RPM = inputs["R_RPM"]
         motor_speed = inputs["motor_speed"]
 
-        outputs["wt"] = rho * (pi / 4) * 60 * P_out * 1000 / (pi**2 * S_stress * P_factor * motor_speed) + K_gearbox * HP_out**.76 * motor_speed**.13 / R_RPM**.89 
+        outputs["wt"] = motor_gearbox_weight(rho, P_out, HP_out, S_stress, P_factor, K_gearbox, R_RPM, motor_speed)
 
     def compute_partials(self, inputs, J):
         rho = inputs["Motor_Density"]
@@ -48,9 +57,9 @@ class MotorGearboxWeight(ExplicitComponent):
         J["wt", "K_gearbox_metric"] = HP_out**.76 * motor_speed**.13 / (R_RPM**.89)
         J["wt", "R_RPM"] = -.89 * K_gearbox * HP_out**.76 * motor_speed**.13 / (R_RPM**1.89)
 
-def test_motor_gearbox_weight():
+def test_motor_gearbox_weight(vec_size = 1):
     prob = Problem()
-    prob.model = MotorGearboxWeight()
+    prob.model = MotorGearboxWeight(vec_size = vec_size)
 
     prob.setup(check = False, force_alloc_complex = True)
 
@@ -0,0 +1,81 @@
+from math import pi
+import dataclasses
+from dataclasses import dataclass, field
+import dep_input_file as input_file
+from artifacts import fingerprint
+
+### Immutable set of the computational sizing inputs that dep_input_file.py holds as module globals. A SizingConfig is passed explicitly to the groups
+### and components, so several parameter sets can be sized in one process, and its hash (or key, which is stable across processes) identifies the
+### results and artifacts computed from it. Derived values are computed on first use and kept. The defaults are the values in dep_input_file.py.
+
+@dataclass(frozen = True, slots = True)
+class SizingConfig:
+    #Physical Constants
+    S_stress: float = input_file.S_stress       # Rated Shear Stress [Pa]
+    P_factor: float = input_file.P_factor       # Power Factor [unitless]
+    E: float = input_file.E                     # Efficiency [unitless]
+    pole_num: float = input_file.pole_num       # Number of Poles
+    K_gearbox: float = input_file.K_gearbox     # Technology Level Scaling in Krantz Formula Factor [lb]
+    prop_RPM: float = input_file.prop_RPM       # Expected propeller Speed [RPM]
+    #Dimensions
+    D_out: float = input_file.D_out             # Baseline Motor Outer Diameter [m]
+    L_active: float = input_file.L_active       # Stack Length [m]
+    D_ag: float = input_file.D_ag               # Baseline Airgap Diameter [m]
+    Motor_out: float = input_file.Motor_out     # Baseline Motor Outer Radius [m]
+    #Component Weights
+    Heat_sink_w: float = input_file.Heat_sink_w     # Weight of Heat Sink [kg]
+    Yoke_w: float = input_file.Yoke_w               # Weight of Yoke [kg]
+    Windings_w: float = input_file.Windings_w       # Weight of Windings [kg]
+    Perm_mag_w: float = input_file.Perm_mag_w       # Weight of Magnet [kg]
+    Titanium_w: float = input_file.Titanium_w       # Weight of Titanium [kg]
+    Carbon_fib_w: float = input_file.Carbon_fib_w   # Weight of Carbon Fiber ring [kg]
+    #Stray Weights
+    Ground_cyl_w: float = input_file.Ground_cyl_w   # Ground Cylinar weight [kg]
+    Bearing_w: float = input_file.Bearing_w         # Bearing weight [kg]
+    Ground_ring_w: float = input_file.Ground_ring_w # Ground ring Weight [kg]
+    Lock_nut_w: float = input_file.Lock_nut_w       # Lock Nut Weight [kg]
+    Fan_w: float = input_file.Fan_w                 # Fan Weight [kg]
+    Stator_ring_w: float = input_file.Stator_ring_w # Stator weight [kg]
+
+    _derived: dict = field(default = None, init = False, repr = False, compare = False)   # derived values, filled on first use
+
+    def _lazy(self, name, compute): # returns a derived value, computing it the first time it is asked for
+        if self._derived is None:
+            object.__setattr__(self, "_derived", {})
+        if name not in self._derived:
+            self._derived[name] = compute()
+
+        return(self._derived[name])
+
+    def replace(self, **changes): # returns a copy of the configuration with some inputs changed
+        return(dataclasses.replace(self, **changes))
+
+    @property
+    def key(self): # hex digest of the inputs, identical in every process, for cache files and artifacts
+        return(self._lazy("key", lambda: fingerprint(type(self).__name__, [(f.name, getattr(self, f.name)) for f in dataclasses.fields(self) if f.compare])))
+
+    @property
+    def K_gearbox_metric(self): # Conversion factor from pounds to kg
+        return(self._lazy("K_gearbox_metric", lambda: .454 * self.K_gearbox))
+
+    @property
+    def Vol(self): # Baseline Volume [m**3]
+        return(self._lazy("Vol", lambda: pi*(self.D_out/2)**2*self.L_active))
+
+    @property
+    def Region_w(self): # Total Region Weight [kg]
+        return(self._lazy("Region_w", lambda: self.Heat_sink_w+self.Yoke_w+self.Windings_w+self.Perm_mag_w+self.Titanium_w+self.Carbon_fib_w))
+
+    @property
+    def Stray_w(self): # Total Stray Weight [kg]
+        return(self._lazy("Stray_w", lambda: self.Ground_cyl_w + self.Bearing_w + self.Ground_ring_w + self.Lock_nut_w + self.Fan_w + self.Stator_ring_w))
+
+    @property
+    def Motor_tot_w(self): # Total Motor Weight [kg]
+        return(self._lazy("Motor_tot_w", lambda: self.Region_w + self.Stray_w))
+
+    @property
+    def Motor_Density(self): # Total material density of motor [kg/m**3]
+        return(self._lazy("Motor_Density", lambda: self.Motor_tot_w/self.Vol))
+
+baseline = SizingConfig()
@@ -0,0 +1,125 @@
+from time import time
+from math import pi
+from collections import OrderedDict
+import numpy as np
+import dep_computational_sizing as sizing
+
+### Design map of dep_computational_sizing.py that is updated instead of recomputed. The required motor volume is Vol_s = volume_constant / n with
+### volume_constant = P_out*60*1000/(pi**2*S_stress*E*P_factor), and the stack length, motor weight, aspect ratios and tip speed lengths are all Vol_s
+### times a factor of the diameter, speed and pole count only. Those factors are cached as one (quantities, diameters, speeds) array, so a new power,
+### efficiency, power factor or shear stress is one broadcast multiply of the cache by the new volume_constant. The gearbox weight is HP_out**.76 times
+### a factor of the speed. Every cached array is tied to the inputs it is computed from, and changing an input only drops the arrays that depend on it.
+### Example: python dep_incremental_map.py
+
+inputs = ["n", "D_out_s", "pole_num", "P_out", "E", "P_factor", "S_stress"]
+invalidates = OrderedDict([("n", ["geometry", "tip_speed", "gearbox_speed"]),   # cached arrays computed from every input
+                           ("D_out_s", ["geometry"]),
+                           ("pole_num", ["geometry"]),
+                           ("P_out", ["volume", "gearbox_power"]),
+                           ("E", ["volume"]),
+                           ("P_factor", ["volume"]),
+                           ("S_stress", ["volume"])])
+geometry_names = ["L_active_s", "Motor_tot_w_s", "Thermal_AR", "L_D_AR"]   # quantities in the geometry cache, in order
+
+def volume_constant(P_out, E, P_factor, S_stress): # required D_ag**2 * L_active times the speed, Vol_s * n, for an output power in kW
+    return(P_out*60 * 1000/(pi**2*S_stress*E*P_factor))
+
+class IncrementalDesignMap(object):
+
+    def __init__(self, n = sizing.n, D_out_s = sizing.D_out_s, pole_num = sizing.pole_num, P_out = sizing.P_out, E = sizing.E, P_factor = sizing.P_factor, S_stress = sizing.S_stress):
+        self.inputs = {}
+        self.cache = {}
+        self.computed = dict((name, 0) for name in set(sum(invalidates.values(), [])))   # number of times every cached array was computed
+        self.update(n = n, D_out_s = D_out_s, pole_num = pole_num, P_out = P_out, E = E, P_factor = P_factor, S_stress = S_stress)
+
+    def update(self, **values): # changes inputs and returns the names of the cached arrays that were dropped
+        dropped = set()
+        for name, value in values.items():
+            if name not in invalidates:
+                raise Exception("You have specified an input of %s, which does not exist, choose from %s" %(name, inputs))
+            value = np.array(value, dtype = float) if name in ["n", "D_out_s"] else float(value)
+            if name in self.inputs and np.array_equal(self.inputs[name], value):
+                continue
+            self.inputs[name] = value
+            for cached in invalidates[name]:
+                if self.cache.pop(cached, None) is not None:
+                    dropped.add(cached)
+
+        return(sorted(dropped))
+
+    def _cached(self, name):
+        if name not in self.cache:
+            self.cache[name] = getattr(self, "_" + name)()
+            self.computed[name] += 1
+
+        return(self.cache[name])
+
+    ### Cached arrays ###
+    def _geometry(self): # (quantities, diameters, speeds) factors of volume_constant, from the map at the inputs of dep_computational_sizing.py
+        n, D_out_s = self.inputs["n"], self.inputs["D_out_s"]
+        point = sizing.design_point(D_out_s[:, np.newaxis], n)
+        point["Thermal_AR"] = point["Thermal_AR"] * self.inputs["pole_num"] / sizing.pole_num
+
+        return(np.stack([point[name] for name in geometry_names]) / volume_constant(sizing.P_out, sizing.E, sizing.P_factor, sizing.S_stress))
+
+    def _tip_speed(self): # diameters at the tip speed limits, and the factors of volume_constant of the stack lengths there, (2, speeds) each
+        n = self.inputs["n"]
+        D_ts = np.stack([np.divide(sizing.max_ts*60, (pi*n)), np.divide(sizing.min_ts*60, (pi*n))])
+
+        return(D_ts, 1 / (n*(D_ts*sizing.D_ratio)**2))
+
+    def _gearbox_speed(self): # gearbox weight over HP_out**.76
+        return(sizing.design_point(sizing.D_out, self.inputs["n"])["Gearbox_w_kg"] / sizing.HP_out**.76)
+
+    def _volume(self):
+        return(volume_constant(self.inputs["P_out"], self.inputs["E"], self.inputs["P_factor"], self.inputs["S_stress"]))
+
+    def _gearbox_power(self):
+        return((self.inputs["P_out"]*1.34102)**.76)
+
+    def design_map(self): # the design_map results of dep_computational_sizing.py at the current inputs
+        volume = self._cached("volume")
+        quantities = self._cached("geometry") * volume   # the one full size operation of an electrical change
+        D_ts, L_ts = self._cached("tip_speed")
+        design = {"n": self.inputs["n"], "D_out_s": self.inputs["D_out_s"], "D_ts_max": D_ts[0], "D_ts_min": D_ts[1],
+                  "L_ts_max": L_ts[0] * volume, "L_ts_min": L_ts[1] * volume, "Gearbox_w_kg": self._cached("gearbox_speed") * self._cached("gearbox_power")}
+        design.update(zip(geometry_names, quantities))
+
+        return(design)
+
+    def at(self, **values): # the map at other inputs, e.g. at(P_out = 500)
+        self.update(**values)
+
+        return(self.design_map())
+
+def from_design_map(design): # an IncrementalDesignMap at the inputs of dep_computational_sizing.py whose caches are filled from the arrays of its design_map, e.g. a saved artifact
+    incremental = IncrementalDesignMap(np.asarray(design["n"]), np.asarray(design["D_out_s"]))
+    volume = volume_constant(sizing.P_out, sizing.E, sizing.P_factor, sizing.S_stress)
+    incremental.cache["geometry"] = np.stack([np.asarray(design[name]) for name in geometry_names]) / volume
+    incremental.cache["tip_speed"] = (np.stack([design["D_ts_max"], design["D_ts_min"]]), np.stack([design["L_ts_max"], design["L_ts_min"]]) / volume)
+    incremental.cache["gearbox_speed"] = np.asarray(design["Gearbox_w_kg"]) / sizing.HP_out**.76
+
+    return(incremental)
+
+def test_incremental_map():
+    return(IncrementalDesignMap())
+
+if __name__ == "__main__":
+
+    n = np.arange(sizing.n_min, sizing.n_max, .01)*10**3                 # a finer grid than the map of dep_computational_sizing.py
+    D_out_s = np.arange(sizing.D_out_s_min, sizing.D_out_s_max, .0005)
+    powers = np.linspace(250, 2000, 36)
+
+    t0 = time()
+    for power in powers:
+        IncrementalDesignMap(n, D_out_s, P_out = power).design_map()       # every array computed from scratch
+    full = time() - t0
+
+    design = IncrementalDesignMap(n, D_out_s)
+    design.design_map()
+    t0 = time()
+    for power in powers:
+        design.at(P_out = power)
+    incremental = time() - t0
+    print("%s power levels on a %s x %s map: %.3f s recomputing, %.3f s updating (%.1fx)" %(len(powers), len(D_out_s), len(n), full, incremental, full / incremental))
+    print("Cached arrays computed: %s" %(design.computed))
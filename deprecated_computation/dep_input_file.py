@@ -10,12 +10,16 @@ keywords = ["Axial", "Aero", "OutRunner", "LiquidCool"] # user input specifies w
 #Physical Constants
 S_stress = 24.1*10**3   # Rated Shear Stress for UIUC Motor
 P_factor = 0.95 # Power Factor [unitless] 
+E = 0.95    # Efficiency [unitless] 
+pole_num = 20   # Number of Poles 
 K_gearbox = 72  # Technology Level Scaling in Krantz Formula Factor [Unitless] 
 K_gearbox_metric = .454 * K_gearbox # Conversion factor from pounds to kg
 prop_RPM = 4000 # Expected propeller Speed [RPM] 
 #Dimensions
 D_out = 0.337   # Baseline Motor Outer Diameter [m]
 L_active = 0.2235   # Stack Length [m] 
+D_ag = 0.277    # Baseline Airgap Diameter [m] 
+Motor_out = 0.1697  # Baseline Motor Outer Radius [m] 
 #Component Weights
 Heat_sink_w = 6.168 # Weight of Heat Sink [kg] 
 Yoke_w = 9.253  # Weight of Yoke [kg] 
@@ -0,0 +1,200 @@
+from time import time
+from math import pi
+from multiprocessing import Pool
+import numpy as np
+from openmdao.api import Problem, Group, IndepVarComp, ExplicitComponent, ScipyOptimizeDriver
+import dep_computational_sizing as sizing
+from dep_surrogate import latin_hypercube
+
+### Multi-start optimization of the computational sizing over outer diameter, active length, speed and pole count. With the diameter and length free the
+### power, tip speed and aspect ratio limits of dep_computational_sizing.py become constraints, and the problem has several local optima at constraint
+### corners. Start points are Latin hypercube samples of the design space, SLSQP with the analytic partials below is run from every start in a pool of
+### worker processes, and the converged designs are deduplicated into a ranked list of distinct local optima.
+### The pole count is relaxed to a continuous design variable for SLSQP, then rounded to the nearest even count and the diameter, length and speed are
+### optimized again with it fixed, so that every reported optimum has a realizable pole count.
+### Example: python dep_multistart.py
+
+_baseline = sizing.design_point(sizing.D_out, sizing.n_max * 10**3)
+weight_per_volume = float(_baseline["Motor_tot_w_s"] / (_baseline["L_active_s"] * sizing.D_out**2))   # motor weight / (D_out**2 * L_active) [kg/m**3]
+gearbox_per_speed = float(_baseline["Gearbox_w_kg"] / (sizing.n_max * 10**3)**.13)                   # gearbox weight / motor_speed**.13
+power_per_volume = pi**2 * sizing.S_stress * sizing.E * sizing.P_factor * sizing.D_ratio**2 / (sizing.P_out * 60 * 1000)   # rated power fraction / (D_out**2 * L_active * motor_speed)
+
+domain = {"D_out_s": (sizing.D_out_s_min, sizing.D_out_s_max), "L_active": (.02, 1.5), "motor_speed": (sizing.n_min * 10**3, sizing.n_max * 10**3), "pole_num": (4., 40.)}
+design_vars = ["D_out_s", "L_active", "motor_speed", "pole_num"]
+design_refs = {"D_out_s": 1., "L_active": 1., "motor_speed": 10**4, "pole_num": 10.}
+
+class SizingDesignWeight(ExplicitComponent):
+
+    def setup(self):
+        self.add_input("D_out_s", val = sizing.D_out, units = "m", desc = "Motor outer diameter")
+        self.add_input("L_active", val = sizing.L_active, units = "m", desc = "Motor stack length")
+        self.add_input("motor_speed", val = 15000, units = "rpm", desc = "Motor speed")
+        self.add_input("pole_num", val = sizing.pole_num, desc = "Number of poles, continuous for the optimizer")
+
+        self.add_output("wt", units = "kg", desc = "weight of motor and gearbox")
+        self.add_output("power_margin", desc = "rated power of the design over the required output power, minus one")
+        self.add_output("Tip_speed", units = "m/s", desc = "rotor tip speed")
+        self.add_output("Thermal_AR", desc = "thermal aspect ratio, stack length over pole pitch")
+        self.add_output("L_D_AR", desc = "stack length over outer diameter")
+
+        self.declare_partials("wt", ["D_out_s", "L_active", "motor_speed"])
+        self.declare_partials("power_margin", ["D_out_s", "L_active", "motor_speed"])
+        self.declare_partials("Tip_speed", ["D_out_s", "motor_speed"])
+        self.declare_partials("Thermal_AR", ["D_out_s", "L_active", "pole_num"])
+        self.declare_partials("L_D_AR", ["D_out_s", "L_active"])
+
+    def compute(self, inputs, outputs):
+        D = inputs["D_out_s"]
+        L = inputs["L_active"]
+        n = inputs["motor_speed"]
+        poles = inputs["pole_num"]
+
+        outputs["wt"] = weight_per_volume * D**2 * L + gearbox_per_speed * n**.13
+        outputs["power_margin"] = power_per_volume * D**2 * L * n - 1
+        outputs["Tip_speed"] = pi * D * n / 60
+        outputs["Thermal_AR"] = L * poles / (pi * sizing.D_ratio * D)
+        outputs["L_D_AR"] = L / D
+
+    def compute_partials(self, inputs, J):
+        D = inputs["D_out_s"]
+        L = inputs["L_active"]
+        n = inputs["motor_speed"]
+        poles = inputs["pole_num"]
+
+        J["wt", "D_out_s"] = 2 * weight_per_volume * D * L
+        J["wt", "L_active"] = weight_per_volume * D**2
+        J["wt", "motor_speed"] = .13 * gearbox_per_speed * n**-.87
+        J["power_margin", "D_out_s"] = 2 * power_per_volume * D * L * n
+        J["power_margin", "L_active"] = power_per_volume * D**2 * n
+        J["power_margin", "motor_speed"] = power_per_volume * D**2 * L
+        J["Tip_speed", "D_out_s"] = pi * n / 60
+        J["Tip_speed", "motor_speed"] = pi * D / 60
+        J["Thermal_AR", "D_out_s"] = -L * poles / (pi * sizing.D_ratio * D**2)
+        J["Thermal_AR", "L_active"] = poles / (pi * sizing.D_ratio * D)
+        J["Thermal_AR", "pole_num"] = L / (pi * sizing.D_ratio * D)
+        J["L_D_AR", "D_out_s"] = -L / D**2
+        J["L_D_AR", "L_active"] = 1 / D
+
+class SizingDesign(Group):
+
+    def setup(self):
+        indeps = self.add_subsystem("indeps", IndepVarComp(), promotes = ["*"])
+        indeps.add_output("D_out_s", sizing.D_out, units = "m")
+        indeps.add_output("L_active", sizing.L_active, units = "m")
+        indeps.add_output("motor_speed", 15000, units = "rpm")
+        indeps.add_output("pole_num", sizing.pole_num)
+
+        self.add_subsystem("design", SizingDesignWeight(), promotes = ["*"])
+
+def sizing_problem(free_poles = True, maxiter = 200, tol = 1e-8): # SLSQP problem of the sizing design, the pole count is a design variable when free_poles
+    prob = Problem()
+    prob.model = SizingDesign()
+    for name in design_vars:
+        if name != "pole_num" or free_poles:
+            prob.model.add_design_var(name, lower = domain[name][0], upper = domain[name][1], ref = design_refs[name])
+    prob.model.add_objective("wt", ref = 100.)
+    prob.model.add_constraint("power_margin", lower = 0.)
+    prob.model.add_constraint("Tip_speed", lower = sizing.min_ts, upper = sizing.max_ts, ref = sizing.max_ts)
+    prob.model.add_constraint("Thermal_AR", lower = sizing.Thermal_AR_min, upper = sizing.Thermal_AR_max, ref = sizing.Thermal_AR_max)
+    prob.model.add_constraint("L_D_AR", lower = sizing.LD_AR_min, upper = sizing.LD_AR_max, ref = sizing.LD_AR_max)
+
+    prob.driver = ScipyOptimizeDriver()
+    prob.driver.options["optimizer"] = "SLSQP"
+    prob.driver.options["maxiter"] = maxiter
+    prob.driver.options["tol"] = tol
+    prob.driver.options["disp"] = False
+
+    prob.setup(check = False)
+
+    return(prob)
+
+def design_margins(prob): # constraint margins of a solved problem as fractions of the limits, as dep_computational_sizing.design_margins
+    point = dict((name, prob[name][0]) for name in ["Tip_speed", "Thermal_AR", "L_D_AR"])
+    margins = sizing.design_margins(point)
+    margins["power"] = prob["power_margin"][0]
+
+    return(margins)
+
+def _solve(prob, start): # runs the driver of prob from start and returns the design and the driver statistics
+    for name, value in start.items():
+        prob[name] = value
+    t0 = time()
+    failed = prob.run_driver()
+    result = prob.driver.result
+
+    return({"design": dict((name, float(prob[name][0])) for name in design_vars), "wt": float(prob["wt"][0]), "success": not failed,
+            "margins": design_margins(prob), "iterations": getattr(result, "nit", prob.driver.iter_count), "evaluations": prob.driver.iter_count,
+            "time": time() - t0})
+
+def run_start(start, feas_tol = 1e-6): # relaxed and rounded pole count optimizations from one start point, run by the workers
+    relaxed = _solve(sizing_problem(free_poles = True), start)
+    poles = max(2 * round(relaxed["design"]["pole_num"] / 2.), int(domain["pole_num"][0]))
+    rounded = _solve(sizing_problem(free_poles = False), dict(relaxed["design"], pole_num = poles))
+    rounded["design"]["pole_num"] = poles
+
+    return(dict(rounded, start = start, feasible = min(rounded["margins"].values()) >= -feas_tol, success = relaxed["success"] and rounded["success"],
+                iterations = relaxed["iterations"] + rounded["iterations"], evaluations = relaxed["evaluations"] + rounded["evaluations"],
+                time = relaxed["time"] + rounded["time"]))
+
+def start_points(num_starts, seed = 0): # Latin hypercube start points over domain
+    lower = np.array([domain[name][0] for name in design_vars])
+    upper = np.array([domain[name][1] for name in design_vars])
+    x = lower + latin_hypercube(num_starts, len(design_vars), seed) * (upper - lower)
+
+    return([dict(zip(design_vars, map(float, row))) for row in x])
+
+def active_set(run, tol = 1e-5): # names of the constraints and design variable bounds a run ends on
+    active = [name for name, margin in sorted(run["margins"].items()) if margin <= tol]
+    for name in design_vars[:-1]:   # the pole count is fixed after rounding
+        lower, upper = domain[name]
+        if run["design"][name] <= lower + tol * (upper - lower):
+            active.append(name + "_lower")
+        elif run["design"][name] >= upper - tol * (upper - lower):
+            active.append(name + "_upper")
+
+    return(tuple(active))
+
+def distinct_optima(runs, tol = 1e-4): # groups the converged, feasible runs into distinct optima and ranks them by weight
+    # The motor weight only depends on D_out**2 * L_active, so at a given speed every diameter on the power constraint is equally light and the optima
+    # are valleys rather than points. Runs that end on the same active constraints with weights within tol are the same optimum, and the lightest
+    # design that reached it represents it
+    optima = []
+    for run in sorted([run for run in runs if run["success"] and run["feasible"]], key = lambda run: run["wt"]):
+        active = active_set(run)
+        for optimum in optima:
+            if optimum["active"] == active and abs(run["wt"] - optimum["wt"]) <= tol * optimum["wt"]:
+                optimum["starts"] += 1
+                optimum["iterations"].append(run["iterations"])
+                optimum["time"].append(run["time"])
+                break
+        else:
+            optima.append({"design": run["design"], "wt": run["wt"], "margins": run["margins"], "active": active, "starts": 1,
+                           "iterations": [run["iterations"]], "time": [run["time"]]})
+
+    return(optima)
+
+def multistart(num_starts = 16, seed = 0, jobs = 1, tol = 1e-4): # returns the lightest design, the ranked distinct optima and the statistics of every start
+    starts = start_points(num_starts, seed)
+    t0 = time()
+    if jobs == 1:
+        runs = [run_start(start) for start in starts]
+    else:
+        with Pool(jobs) as pool:
+            runs = pool.map(run_start, starts, chunksize = 1)
+    optima = distinct_optima(runs, tol)
+    if not optima:
+        raise Exception("None of the %s starts converged to a feasible design" %(num_starts))
+
+    return({"best": optima[0], "optima": optima, "runs": runs, "failed": sum(not (run["success"] and run["feasible"]) for run in runs), "time": time() - t0})
+
+def test_multistart():
+    return(multistart())
+
+if __name__ == "__main__":
+
+    result = test_multistart()
+    print("%s starts, %s failed or infeasible, %s distinct optima in %.2f s" %(len(result["runs"]), result["failed"], len(result["optima"]), result["time"]))
+    for rank, optimum in enumerate(result["optima"]):
+        design = optimum["design"]
+        print("%2d  %.3f kg  D_out = %.4f m  L = %.4f m  %.0f RPM  %d poles  on %s (%d starts, %.1f iterations, %.3f s mean)" %(rank + 1, optimum["wt"], design["D_out_s"],
+              design["L_active"], design["motor_speed"], design["pole_num"], ", ".join(optimum["active"]), optimum["starts"], np.mean(optimum["iterations"]), np.mean(optimum["time"])))
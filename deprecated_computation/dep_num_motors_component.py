@@ -1,3 +1,4 @@
+import numpy as np
 from openmdao.api import ExplicitComponent, Problem
 
 class NumMotors(ExplicitComponent):
@@ -5,26 +6,36 @@ class NumMotors(ExplicitComponent):
     def initialize(self):
         self.options.declare("algorithm", default = "regression", desc = "Tells the component which calculation algorithm is being used")
         self.options.declare("motors", default = 4, desc = "Number of motors on aircraft")
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of designs evaluated at once")
+        self.options.declare("outputs", default = None, values = [None, "split", "combined"], allow_none = True, desc = "split for separate motor_wt and gb_wt inputs, combined for one combined_wt input. None picks split for the regression algorithm and combined otherwise")
+
+    def _split(self):
+        if self.options["outputs"] is None:
+            return(self.options["algorithm"] == "regression")
+
+        return(self.options["outputs"] == "split")
 
     def setup(self):
+        n = self.options["vec_size"]
 
-        if self.options["algorithm"] == "regression":
-            self.add_input("motor_wt", val = 106.47367303, units = "kg", desc = "Weight of motor alone")
-            self.add_input("gb_wt", val = 10.36947702, units = "kg", desc = "Weight of gearbox alone")
+        if self._split():
+            self.add_input("motor_wt", val = 106.47367303 * np.ones(n), units = "kg", desc = "Weight of motor alone")
+            self.add_input("gb_wt", val = 10.36947702 * np.ones(n), units = "kg", desc = "Weight of gearbox alone")
 
         else:
-            self.add_input("combined_wt", val = 27.46825587, units = "kg", desc = "Combined weight of motor and gearbox")
+            self.add_input("combined_wt", val = 27.46825587 * np.ones(n), units = "kg", desc = "Combined weight of motor and gearbox")
 
-        self.add_output("W_motor_gearbox", units = "kg", desc = "weight of all the motors and gearboxes combined")
+        self.add_output("W_motor_gearbox", shape = n, units = "kg", desc = "weight of all the motors and gearboxes combined")
 
-        if self.options["algorithm"] == "regression":
-            self.declare_partials("W_motor_gearbox", ["motor_wt", "gb_wt"], val = self.options["motors"])
+        diagonal = np.arange(n)
+        if self._split():
+            self.declare_partials("W_motor_gearbox", ["motor_wt", "gb_wt"], rows = diagonal, cols = diagonal, val = self.options["motors"] * np.ones(n))
 
         else:
-            self.declare_partials("W_motor_gearbox", "combined_wt", val = self.options["motors"])
+            self.declare_partials("W_motor_gearbox", "combined_wt", rows = diagonal, cols = diagonal, val = self.options["motors"] * np.ones(n))
 
     def compute(self, inputs, outputs):
-        if self.options["algorithm"] == "regression":
+        if self._split():
             outputs["W_motor_gearbox"] = self.options["motors"] * (inputs["motor_wt"] + inputs["gb_wt"])
 
         else:
@@ -0,0 +1,77 @@
+import numpy as np
+
+### Extracts the non-dominated designs from batched sweep outputs (for example motor weight, gearbox weight, speed and diameter from the design map) so that
+### a design no longer has to be picked by eye from the weight vs. speed plots. Every function returns indices into the sweep arrays.
+
+def _as_objectives(objectives, maximize): # stacks the objectives as columns and flips the sign of the ones to be maximized, so that every column is minimized
+    objectives = np.array(objectives, dtype = float)
+    if objectives.ndim == 1:
+        objectives = objectives[:, np.newaxis]
+    if maximize is not None:
+        sign = np.where(np.broadcast_to(np.asarray(maximize, dtype = bool), objectives.shape[1:]), -1., 1.)
+        objectives = objectives * sign
+
+    return(objectives)
+
+def pareto_2d(f1, f2): # returns the indices of the non-dominated points of two minimized objectives in O(n log n): sort by f1, then keep the points that improve on the best f2 seen so far
+    order = np.lexsort((f2, f1))
+    f2_sorted = f2[order]
+    best_before = np.concatenate(([np.inf], np.minimum.accumulate(f2_sorted)[:-1]))
+
+    return(np.sort(order[f2_sorted < best_before]))
+
+def pareto_nd(objectives): # returns the indices of the non-dominated rows of an (n, k) array of minimized objectives
+    order = np.lexsort(objectives.T[::-1])   # lexicographic order, so no point can be dominated by a point after it
+    remaining = objectives[order]
+    index = order
+    front = []
+
+    while np.size(index) > 0:
+        front.append(index[0])   # the first remaining point is never dominated
+        dominated = np.all(remaining >= remaining[0], axis = 1)
+        remaining = remaining[~dominated]
+        index = index[~dominated]
+
+    return(np.sort(np.array(front, dtype = int)))
+
+def pareto_front(objectives, margins = None, maximize = None): # returns the indices of the feasible non-dominated designs, identical designs are reported once. objectives is (n, k) or a list of k arrays of length n, margins are constraint margins that must be >= 0, and maximize flags the objectives to be maximized
+    if isinstance(objectives, (list, tuple)):
+        objectives = np.column_stack(objectives)
+    objectives = _as_objectives(objectives, maximize)
+    feasible = np.all(np.isfinite(objectives), axis = 1)
+    if margins is not None:
+        margins = np.asarray(margins, dtype = float).reshape(np.shape(objectives)[0], -1)
+        feasible &= np.all(margins >= 0, axis = 1)
+    candidates = np.flatnonzero(feasible)
+
+    if objectives.shape[1] == 1:
+        best = objectives[candidates, 0]
+        return(candidates[best == np.min(best)][:1] if np.size(candidates) > 0 else candidates)
+    if objectives.shape[1] == 2:
+        return(candidates[pareto_2d(objectives[candidates, 0], objectives[candidates, 1])])
+
+    return(candidates[pareto_nd(objectives[candidates])])
+
+def test_pareto():
+    ### weight vs. speed of the 1 MW motor + gearbox over a speed sweep, with the tip speed limit of a 0.3 m diameter rotor as the constraint
+    speed = np.linspace(4000., 21000., 1000)
+    motor_wt = 3279.626 * (np.pi / 4) * 60 * 1000 * 1000 / (np.pi**2 * 24.1e3 * .95 * speed)
+    gearbox_wt = 32.688 * 1341.02**.76 * speed**.13 / 4000**.89
+    tip_margin = 280. - np.pi * 0.3 * speed / 60
+
+    front = pareto_front([motor_wt + gearbox_wt, speed], margins = tip_margin)
+
+    return(front, speed, motor_wt + gearbox_wt)
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    front, speed, weight = test_pareto()
+
+    plt.plot(speed, weight, linewidth = 1.25)
+    plt.plot(speed[front], weight[front], "o", color = "red")
+
+    plt.xlabel('Motor Operating Speed, RPM')
+    plt.ylabel('Weight, kg')
+    plt.legend(["Total Assembly Weight", "Non-dominated Designs"])
+    plt.show()
@@ -0,0 +1,153 @@
+import os
+import numpy as np
+from openmdao.recorders.case_recorder import CaseRecorder
+from artifacts import save_artifact, load_artifact
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+### Case recorder that keeps selected variables of every driver (or system, solver, problem) iteration in growable NumPy columns instead of writing a
+### pickled row per case to SQLite. recorder["motor_speed"] is a view of the recorded values, for plotting the optimizer path without copies. The
+### columns are written to .npz (see artifacts.py) or Parquet once at shutdown, or every block_size cases so that memory stays bounded on long runs.
+
+class ColumnRecorder(CaseRecorder):
+
+    def __init__(self, variables = None, path = None, block_size = None, capacity = 1024):
+        super(ColumnRecorder, self).__init__(record_viewer_data = False)
+        self.variables = variables        # names to record, promoted or absolute. None records every variable in the cases
+        self.path = path                  # .npz or .parquet file written at shutdown, None to only keep the columns in memory
+        self.block_size = block_size      # with a path, write and drop the columns every block_size cases
+        self.capacity = capacity
+        self.columns = {}
+        self.count = 0                    # cases in the columns
+        self.flushed = 0                  # cases already written to path
+        self.blocks = 0
+        self._sources = None              # name of every column in the case data
+        self._writer = None
+
+    def startup(self, recording_requester, comm = None):
+        if comm is None:   # OpenMDAO 2 starts recorders without a comm, and its CaseRecorder.startup does not take one
+            super(ColumnRecorder, self).startup(recording_requester)
+        else:
+            super(ColumnRecorder, self).startup(recording_requester, comm)
+        self.columns = {}
+        self.count = 0
+        self.flushed = 0
+        self.blocks = 0
+        self._sources = None
+
+    def _resolve(self, values): # maps every requested name to its key in the case data, a promoted name matches the absolute name it ends with
+        if self.variables is None:
+            return(dict((name, name) for name in values))
+        sources = {}
+        for name in self.variables:
+            matches = [key for key in values if key == name] or [key for key in values if key.endswith("." + name)]
+            if len(matches) != 1:
+                raise Exception("%s matches %s of the recorded variables %s, give its absolute name" %(name, "none" if not matches else matches, sorted(values)))
+            sources[name] = matches[0]
+
+        return(sources)
+
+    def _append(self, values, metadata):
+        if self._sources is None:
+            self._sources = self._resolve(values)
+        row = dict((name, np.ravel(values[source])) for name, source in self._sources.items())
+        row["counter"] = np.array([self._counter])
+        row["success"] = np.array([metadata.get("success", 1) if metadata else 1])
+
+        if not self.columns:
+            self.columns = dict((name, np.zeros((self.capacity, np.size(value)), dtype = float)) for name, value in row.items())
+        elif self.count == len(self.columns["counter"]):
+            for name, column in self.columns.items():   # double the capacity, so that appending stays amortized O(1)
+                self.columns[name] = np.concatenate([column, np.zeros_like(column)])
+        for name, value in row.items():
+            self.columns[name][self.count] = np.real(value)
+        self.count += 1
+
+        if self.path is not None and self.block_size is not None and self.count >= self.block_size:
+            self.flush()
+
+    def record_iteration_driver(self, recording_requester, data, metadata):
+        self._append(data["output"], metadata)
+
+    def record_iteration_system(self, recording_requester, data, metadata):
+        self._append(data["output"], metadata)
+
+    def record_iteration_solver(self, recording_requester, data, metadata):
+        self._append(data["output"], metadata)
+
+    def record_iteration_problem(self, recording_requester, data, metadata):
+        self._append(data["output"], metadata)
+
+    def record_metadata_system(self, system, run_number = None):   # the columns hold iteration values only, so there is no metadata to keep
+        pass
+
+    def record_metadata_solver(self, solver, run_number = None):
+        pass
+
+    def record_derivatives_driver(self, recording_requester, data, metadata):
+        pass
+
+    def record_viewer_data(self, model_viewer_data):
+        pass
+
+    def __getitem__(self, name): # view of the values of a variable in the columns, 1-D for scalars
+        column = self.columns[name][:self.count]
+
+        return(column[:, 0] if column.shape[1] == 1 else column)
+
+    def keys(self):
+        return(list(self.columns))
+
+    def _block_path(self):
+        stem, extension = os.path.splitext(self.path)
+
+        return("%s.part%04d%s" %(stem, self.blocks, extension))
+
+    def flush(self): # writes the cases in the columns to path and empties the columns. Every block goes to its own .npz file, or is a row group of the Parquet file
+        if self.path is None or self.count == 0:
+            return
+        arrays = dict((name, self[name]) for name in self.columns)
+        if self.path.endswith(".parquet"):
+            if pyarrow is None:
+                raise Exception("Parquet output needs pyarrow, which is not installed. Use a .npz path instead")
+            table = pyarrow.table(dict((name if np.ndim(values) == 1 else "%s[%s]" %(name, i), values if np.ndim(values) == 1 else values[:, i])
+                                       for name, values in arrays.items() for i in range(np.shape(values)[1] if np.ndim(values) > 1 else 1)))
+            if self._writer is None:
+                self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            save_artifact(self.path if self.block_size is None else self._block_path(), arrays, "cases", None, first_case = self.flushed)
+        self.blocks += 1
+        if self.block_size is None:
+            self.flushed = self.count
+        else:
+            self.flushed += self.count
+            self.count = 0   # the columns are reused for the next block
+
+    def shutdown(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+def load_cases(path): # reads the columns written by a ColumnRecorder at path, joining the blocks of a run that was flushed in blocks
+    stem, extension = os.path.splitext(path)
+    if extension == ".parquet":
+        return(dict((name, np.asarray(values)) for name, values in pyarrow.parquet.read_table(path).to_pydict().items()))
+    if os.path.exists(path):
+        parts = [path]
+    else:
+        parts = []
+        while os.path.exists("%s.part%04d%s" %(stem, len(parts), extension)):
+            parts.append("%s.part%04d%s" %(stem, len(parts), extension))
+    if not parts:
+        raise Exception("There are no recorded cases at %s" %(path))
+    artifacts = [load_artifact(part, "cases") for part in parts]
+    if len(artifacts) == 1:
+        return(dict((name, artifacts[0][name]) for name in artifacts[0].keys()))
+
+    return(dict((name, np.concatenate([artifact[name] for artifact in artifacts])) for name in artifacts[0].keys()))
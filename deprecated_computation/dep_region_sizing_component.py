@@ -0,0 +1,104 @@
+from openmdao.api import ExplicitComponent, Problem
+from math import pi
+from dep_config import SizingConfig, baseline
+
+### Motor + gearbox weight resolved by motor region, following the map calculations in dep_computational_sizing.py. Every region of the baseline motor is
+### scaled with the outer diameter and the active length that gives the required D_ag**2 * L, and keeps its baseline density, so the weight of the regions
+### only depends on D_ag**2 * L. The outer diameter and the pole count set the tip speed and aspect ratios that limit the design space.
+
+class RegionMotorGearboxWeight(ExplicitComponent):
+
+    def initialize(self):
+        self.options.declare("config", default = baseline, types = SizingConfig, desc = "Baseline motor geometry and region weights the design is scaled from")
+
+    def setup(self):
+        self.add_input("D_out", val = self.options["config"].D_out, units = "m", desc = "Outer diameter of the motor")
+        self.add_input("P_out", val = 1000, units = "kW", desc = "Output power of motor")
+        self.add_input("HP_out", val = 1341.02, units = "hp", desc = "Output power of motor in HP")
+        self.add_input("S_stress", val = 24.1 * 10**3, units = "Pa", desc = "Magnetic shear stress of motor")
+        self.add_input("P_factor", val = .95, desc = "Power factor of motor")
+        self.add_input("E", val = .95, desc = "Efficiency of motor")
+        self.add_input("pole_num", val = 20., desc = "Number of poles of the motor")
+        self.add_input("K_gearbox_metric", val = 32.688, desc = "Technology level of gearbox")
+        self.add_input("R_RPM", val = 4000, units = "rpm", desc = "Rotor RPM, slower gearbox speed")
+        self.add_input("motor_speed", val = 21000, units = "rpm", desc = "Motor speed")
+
+        self.add_output("wt", units = "kg", desc = "weight of motor and gearbox")
+        self.add_output("motor_wt", units = "kg", desc = "weight of the motor regions and stray weight")
+        self.add_output("L_active", units = "m", desc = "Active stack length of the motor")
+        self.add_output("tip_speed", units = "m/s", desc = "Rotor tip speed at the outer diameter")
+        self.add_output("thermal_AR", desc = "Thermal aspect ratio, active length over pole pitch")
+        self.add_output("LD_AR", desc = "Active length over outer diameter")
+
+        self.declare_partials(["wt", "motor_wt"], ["P_out", "S_stress", "P_factor", "E", "motor_speed"])
+        self.declare_partials("wt", ["HP_out", "K_gearbox_metric", "R_RPM"])
+        self.declare_partials(["L_active", "thermal_AR", "LD_AR"], ["D_out", "P_out", "S_stress", "P_factor", "E", "motor_speed"])
+        self.declare_partials("thermal_AR", "pole_num")
+        self.declare_partials("tip_speed", ["D_out", "motor_speed"])
+
+        config = self.options["config"]
+        self.D_ratio = config.D_ag / config.D_out   # airgap to outer diameter ratio kept from the baseline
+        # weight per unit D_ag**2 * L: the regions scale with the outer diameter squared and the stray weight with the outer volume, both times L / L_base
+        self.density = (config.Region_w / config.D_out**2 + config.Stray_w * (2 * config.Motor_out)**2 / config.D_out**4) / (self.D_ratio**2 * config.L_active)
+
+    def compute(self, inputs, outputs):
+        D_out = inputs["D_out"]
+        motor_speed = inputs["motor_speed"]
+        Vol_s = inputs["P_out"] * 60 * 1000 / (pi**2 * inputs["S_stress"] * motor_speed * inputs["E"] * inputs["P_factor"])   # D_ag**2 * L [m**3]
+        L_active = Vol_s / (self.D_ratio * D_out)**2
+
+        outputs["motor_wt"] = self.density * Vol_s
+        outputs["wt"] = outputs["motor_wt"] + inputs["K_gearbox_metric"] * inputs["HP_out"]**.76 * motor_speed**.13 / inputs["R_RPM"]**.89
+        outputs["L_active"] = L_active
+        outputs["tip_speed"] = pi * D_out * motor_speed / 60
+        outputs["thermal_AR"] = L_active * inputs["pole_num"] / (pi * self.D_ratio * D_out)
+        outputs["LD_AR"] = L_active / D_out
+
+    def compute_partials(self, inputs, J):
+        D_out = inputs["D_out"]
+        HP_out = inputs["HP_out"]
+        K_gearbox = inputs["K_gearbox_metric"]
+        R_RPM = inputs["R_RPM"]
+        motor_speed = inputs["motor_speed"]
+        pole_num = inputs["pole_num"]
+        Vol_s = inputs["P_out"] * 60 * 1000 / (pi**2 * inputs["S_stress"] * motor_speed * inputs["E"] * inputs["P_factor"])
+        L_active = Vol_s / (self.D_ratio * D_out)**2
+        thermal_AR = L_active * pole_num / (pi * self.D_ratio * D_out)
+        LD_AR = L_active / D_out
+
+        # Vol_s is a product of powers of P_out, S_stress, motor_speed, E and P_factor, so each log derivative is +-1
+        for name, power in [("P_out", 1.), ("S_stress", -1.), ("P_factor", -1.), ("E", -1.), ("motor_speed", -1.)]:
+            J["motor_wt", name] = power * self.density * Vol_s / inputs[name]
+            J["wt", name] = J["motor_wt", name]
+            J["L_active", name] = power * L_active / inputs[name]
+            J["thermal_AR", name] = power * thermal_AR / inputs[name]
+            J["LD_AR", name] = power * LD_AR / inputs[name]
+
+        J["wt", "motor_speed"] += K_gearbox * HP_out**.76 * .13 / (R_RPM**.89 * motor_speed**.87)
+        J["wt", "HP_out"] = .76 * K_gearbox * HP_out**(-.24) * motor_speed**.13 / (R_RPM**.89)
+        J["wt", "K_gearbox_metric"] = HP_out**.76 * motor_speed**.13 / (R_RPM**.89)
+        J["wt", "R_RPM"] = -.89 * K_gearbox * HP_out**.76 * motor_speed**.13 / (R_RPM**1.89)
+        J["L_active", "D_out"] = -2 * L_active / D_out
+        J["thermal_AR", "D_out"] = -3 * thermal_AR / D_out
+        J["thermal_AR", "pole_num"] = thermal_AR / pole_num
+        J["LD_AR", "D_out"] = -3 * LD_AR / D_out
+        J["tip_speed", "D_out"] = pi * motor_speed / 60
+        J["tip_speed", "motor_speed"] = pi * D_out / 60
+
+def test_region_weight():
+    prob = Problem()
+    prob.model.add_subsystem("region", RegionMotorGearboxWeight(), promotes = ["*"])
+
+    prob.setup(check = False, force_alloc_complex = True)
+
+    prob["motor_speed"] = 4000
+    prob.run_model()
+
+    return(prob)
+
+if __name__ == "__main__":
+
+    prob = test_region_weight()
+
+    prob.check_partials(compact_print = True, method = "cs")
+    print(prob["motor_wt"], prob["wt"])
@@ -0,0 +1,181 @@
+import os
+import re
+import sys
+import html
+import argparse
+from collections import OrderedDict
+from multiprocessing import Pool
+import matplotlib
+matplotlib.use("Agg")   # no display is needed, so reports render on build machines and in worker processes
+import matplotlib.pyplot as plt
+import numpy as np
+import dep_input_file as input_file
+import dep_computational_sizing as sizing
+from w_motor_reg import load_regression
+from regression_fits import evaluate
+from dep_incremental_map import from_design_map
+
+### Headless report of the regression and design map plots of w_motor_reg.py and dep_computational_sizing.py. The regressions of every keyword set and
+### the design map are saved as artifacts (see artifacts.py) first, then every chart is rendered from the artifacts in a pool of worker processes with the
+### Agg backend and saved as PNG and/or SVG, and an HTML index links them all. The design map is computed at the P_out of dep_computational_sizing.py and
+### rescaled to the other power levels by dep_incremental_map.py.
+### Example: python dep_report.py report_dir --keywords Axial "Aero OutRunner" --powers 250 500 1000 --formats png svg --jobs 4
+
+map_figures = OrderedDict([("stack_length", "Stack Length vs. Outer Diameter"), ("constraints", "Stack Length vs. Outer Diameter with Constraint Lines"),
+                           ("motor_weight", "Motor Weight vs. Speed"), ("assembly_weight", "Motor, Gearbox and Combined Weights vs. Speed")])
+
+def slug(text):
+    return(re.sub(r"[^A-Za-z0-9.]+", "-", str(text)).strip("-"))
+
+def regression_path(artifact_dir, keywords, model = "linear"):
+    return(os.path.join(artifact_dir, "regression_%s_%s.npz" %(slug("-".join(sorted(keywords))), model)))
+
+def map_path(artifact_dir):
+    return(os.path.join(artifact_dir, "design_map.npz"))
+
+### Charts ###
+def regression_chart(artifact_dir, keywords, power, model = "linear", show_motors = True): # the regression plot of w_motor_reg.py
+    artifact = load_regression(regression_path(artifact_dir, keywords, model), keywords, model = model)
+    data_power = np.asarray(artifact["power"])
+    data_weight = np.asarray(artifact["weight"])
+    coefficients = np.asarray(artifact["coefficients"])
+    line = np.linspace(0., max(np.max(data_power), power), 200)
+
+    figure = plt.figure()
+    plt.plot(data_power, data_weight, "o")
+    plt.plot(power, evaluate(model, coefficients, power), marker = "o", color = "red")
+    plt.plot(line, evaluate(model, coefficients, line))
+    if show_motors:
+        for name, x, y in zip(artifact["names"], data_power, data_weight):
+            plt.annotate("%s" %name, xy = (x, y), textcoords = "data", fontsize = 6)
+
+    plt.title("Motor Keywords: %s, %s kW" %(list(keywords), power))
+    plt.xlabel("Power (kW)")
+    plt.ylabel("Weight (kg)")
+    plt.legend(["Actual Motors", "Your Motor", "Regression Line"])
+
+    return(figure)
+
+def map_chart(artifact_dir, name, power): # one of the design map plots of dep_computational_sizing.py
+    artifact = sizing.load_design_map(map_path(artifact_dir))
+    design = from_design_map(artifact).at(P_out = power)
+    n = design["n"]
+    D_out_s = design["D_out_s"]
+    motor = design["Motor_tot_w_s"][1, :]                                         # the second diameter row, as in the plots of dep_computational_sizing.py
+    gearbox = np.broadcast_to(design["Gearbox_w_kg"], np.shape(design["Motor_tot_w_s"]))[1, :]   # the gearbox weight only depends on speed
+
+    figure = plt.figure()
+    if name in ["stack_length", "constraints"]:
+        plt.plot(design["L_active_s"], D_out_s, linewidth = 1.25)
+        if name == "constraints":
+            plt.plot(design["L_ts_max"], design["D_ts_max"], ':k', linewidth = 2.5)
+            plt.plot(design["L_ts_min"], design["D_ts_min"], ':k', linewidth = 2.5)
+            plt.plot(np.pi * sizing.D_ratio * D_out_s / sizing.pole_num * sizing.Thermal_AR_max, D_out_s, '--k', linewidth = 1.75)
+            plt.plot(D_out_s * sizing.LD_AR_min, D_out_s, '-.k', linewidth = 1.75)
+            axes = plt.gca()
+            axes.set_xlim([0.00, 2.10 * power / sizing.P_out])
+            axes.set_ylim([0.14, 0.61])
+        plt.xlabel('Stack Length, m')
+        plt.ylabel('Outer Diameter, m')
+        plt.legend(["%d RPM" % rpm for rpm in n], fontsize = 6, ncol = 2)
+    elif name == "motor_weight":
+        plt.plot(n, motor, 'b', linewidth = 2)
+        plt.xlabel('Motor Operating Speed, RPM')
+        plt.ylabel('Weight, kg')
+        plt.legend(['Motor Weight'])
+    elif name == "assembly_weight":
+        plt.plot(n, gearbox, linewidth = 2)
+        plt.plot(n, motor, 'b', linewidth = 2)
+        plt.plot(n, gearbox + motor, linewidth = 2)
+        plt.xlabel('Motor Operating Speed, RPM')
+        plt.ylabel('Weight, kg')
+        plt.legend(['Gearbox Weight', 'Motor Weight', "Total Assembly Weight"])
+    else:
+        raise Exception("You have specified a design map figure of %s, which does not exist, choose from %s" %(name, list(map_figures)))
+    plt.title("%s, %s kW" %(map_figures[name], power))
+
+    return(figure)
+
+def render_chart(job): # renders one chart job to its files, run by the workers. Returns the job with the names of the files written
+    figure = regression_chart(job["artifact_dir"], job["keywords"], job["power"], job["model"]) if job["kind"] == "regression" else map_chart(job["artifact_dir"], job["figure"], job["power"])
+    files = []
+    try:
+        for extension in job["formats"]:
+            files.append("%s.%s" %(job["name"], extension))
+            figure.savefig(os.path.join(job["output_dir"], files[-1]), dpi = 100)
+    finally:
+        plt.close(figure)
+
+    return(dict(job, files = files))
+
+### Report ###
+def chart_jobs(output_dir, artifact_dir, keyword_sets, powers, model = "linear", formats = ("png",), map_powers = None): # one job per regression chart (keyword set and power) and per design map figure and power
+    common = {"output_dir": output_dir, "artifact_dir": artifact_dir, "formats": list(formats), "model": model}
+    jobs = [dict(common, kind = "regression", keywords = list(keywords), power = power, name = "regression_%s_%s_%skW" %(slug("-".join(keywords)), model, slug(power)),
+                 title = "%s, %s kW" %(" ".join(keywords), power)) for keywords in keyword_sets for power in powers]
+    jobs += [dict(common, kind = "design_map", figure = figure, power = power, name = "map_%s_%skW" %(figure, slug(power)), title = "%s, %s kW" %(map_figures[figure], power))
+             for power in (powers if map_powers is None else map_powers) for figure in map_figures]
+
+    return(jobs)
+
+def write_index(output_dir, results, title = "Motor and Gearbox Sizing Report"): # HTML page with every chart, grouped by kind
+    sections = OrderedDict([("regression", "Motor Regressions"), ("design_map", "Design Maps")])
+    lines = ["<!DOCTYPE html>", "<html><head><meta charset=\"utf-8\"><title>%s</title>" %html.escape(title),
+             "<style>body {font-family: sans-serif} figure {display: inline-block; margin: 8px} img {width: 400px}</style></head><body>", "<h1>%s</h1>" %html.escape(title)]
+    for kind, heading in sections.items():
+        charts = [result for result in results if result["kind"] == kind]
+        if not charts:
+            continue
+        lines.append("<h2>%s</h2>" %html.escape(heading))
+        for result in charts:
+            image = result["files"][0]
+            links = " ".join("<a href=\"%s\">%s</a>" %(html.escape(name), html.escape(name.rsplit(".", 1)[1].upper())) for name in result["files"])
+            lines.append("<figure><a href=\"%s\"><img src=\"%s\" alt=\"%s\"></a><figcaption>%s %s</figcaption></figure>" %(html.escape(image), html.escape(image), html.escape(result["title"]), html.escape(result["title"]), links))
+    lines.append("</body></html>")
+    path = os.path.join(output_dir, "index.html")
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+
+    return(path)
+
+def build_report(output_dir, keyword_sets = (input_file.keywords,), powers = (500.,), model = "linear", formats = ("png",), jobs = 1, artifact_dir = None, map_powers = None): # renders every chart and the index into output_dir and returns the path of the index
+    for extension in formats:
+        if extension not in ["png", "svg"]:
+            raise Exception("You have specified a format of %s, choose from png and svg" %(extension))
+    artifact_dir = os.path.join(output_dir, "artifacts") if artifact_dir is None else artifact_dir
+    for directory in [output_dir, artifact_dir]:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    # the artifacts are brought up to date here, so that the workers only read them
+    for keywords in keyword_sets:
+        load_regression(regression_path(artifact_dir, keywords, model), keywords, model = model).close()
+    sizing.load_design_map(map_path(artifact_dir)).close()
+
+    tasks = chart_jobs(output_dir, artifact_dir, keyword_sets, powers, model, formats, map_powers)
+    if jobs == 1:
+        results = [render_chart(task) for task in tasks]
+    else:
+        with Pool(jobs) as pool:
+            results = pool.map(render_chart, tasks, chunksize = max(1, len(tasks) // (4 * jobs)))
+
+    return(write_index(output_dir, results))
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Render the regression and design map charts of many keyword sets and power levels")
+    parser.add_argument("output", help = "directory the charts and index.html are written to")
+    parser.add_argument("--keywords", nargs = "+", default = [" ".join(input_file.keywords)], help = "keyword sets, the keywords of a set separated by spaces or ;")
+    parser.add_argument("--powers", nargs = "+", type = float, default = [500.], help = "motor powers in kW")
+    parser.add_argument("--model", default = "linear", help = "regression model, see regression_fits.py")
+    parser.add_argument("--formats", nargs = "+", default = ["png"], choices = ["png", "svg"])
+    parser.add_argument("--jobs", type = int, default = 1, help = "number of worker processes")
+    parser.add_argument("--artifact-dir", default = None, help = "directory of the saved regressions and design map, by default inside the output directory")
+    args = parser.parse_args(argv)
+
+    keyword_sets = [[word for word in re.split(r"[;\s]+", text) if word] for text in args.keywords]
+
+    return(build_report(args.output, keyword_sets, args.powers, args.model, args.formats, args.jobs, args.artifact_dir))
+
+if __name__ == "__main__":
+
+    sys.stderr.write("Report written to %s\n" %(main()))
@@ -0,0 +1,179 @@
+from time import time
+from math import pi
+import numpy as np
+import dep_input_file as input_file
+from dep_config import baseline
+from w_motor_reg import regression_coefficients
+from w_gearbox import gearbox_weight
+from dep_computational_sizing_component import motor_gearbox_weight
+
+### Multi-fidelity screening of motor + gearbox candidates. Candidates stream through a list of stages as batches (dictionaries of equal length arrays with
+### the fields below). Each stage evaluates a whole batch at once, adds its results as new fields, and only passes on the candidates that survive its
+### filter, so the expensive stages only see what the cheap ones kept. Every stage records how many candidates it evaluated and dropped and how fast.
+
+fields = ["power", "motor_rpm", "prop_RPM", "K_gearbox_metric", "num_motors"]
+
+def batches_from_rows(rows, batch_size = 4096): # groups an iterable of candidate dictionaries into batches
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == batch_size:
+            yield dict((field, np.array([candidate[field] for candidate in chunk], dtype = float)) for field in chunk[0])
+            chunk = []
+    if chunk:
+        yield dict((field, np.array([candidate[field] for candidate in chunk], dtype = float)) for field in chunk[0])
+
+def rebatch(batches, batch_size): # regroups a stream of batches of any length into batches of batch_size
+    pending = []
+    size = 0
+    for batch in batches:
+        pending.append(batch)
+        size += len(next(iter(batch.values())))
+        while size >= batch_size:
+            merged = concatenate(pending)
+            yield dict((field, values[:batch_size]) for field, values in merged.items())
+            pending = [dict((field, values[batch_size:]) for field, values in merged.items())]
+            size -= batch_size
+    if size > 0:
+        yield concatenate(pending)
+
+def concatenate(batches):
+    if not batches:
+        raise Exception("No candidates survived the screening, relax the top_k, margin or max_score of the stages")
+
+    return(dict((field, np.concatenate([batch[field] for batch in batches])) for field in batches[0]))
+
+def select(batch, index):
+    return(dict((field, values[index]) for field, values in batch.items()))
+
+class Stage(object): # One fidelity level: evaluate(batch) returns a dictionary of new fields, one of which is the score (lower is better) used by the filter
+
+    def __init__(self, name, evaluate, score, batch_size = 4096, top_k = None, margin = None, max_score = None):
+        self.name = name
+        self.evaluate = evaluate
+        self.score = score
+        self.batch_size = batch_size
+        self.top_k = top_k              # keep the top_k best candidates
+        self.margin = margin            # keep the candidates within this fraction of the best score
+        self.max_score = max_score      # drop the candidates whose score is above this value
+        self.stats = {"stage": name, "evaluated": 0, "kept": 0, "dropped": 0, "seconds": 0.}
+
+    def run(self, batches): # generator of the surviving batches. Streams batch by batch unless top_k or margin need to see every candidate first
+        pool = None
+        for batch in rebatch(batches, self.batch_size):
+            start = time()
+            batch.update(self.evaluate(batch))
+            scores = batch[self.score]
+            self.stats["evaluated"] += len(scores)
+            if self.max_score is not None:
+                batch = select(batch, scores <= self.max_score)
+
+            if self.top_k is None and self.margin is None:
+                self._count(batch)
+                self.stats["seconds"] += time() - start
+                if len(batch[self.score]) > 0:
+                    yield batch
+                continue
+
+            pool = batch if pool is None else concatenate([pool, batch])
+            pool = self._prune(pool)   # only the candidates that can still survive are kept in memory
+            self.stats["seconds"] += time() - start
+
+        if pool is not None:
+            pool = select(pool, np.argsort(pool[self.score], kind = "mergesort"))
+            self._count(pool)
+            yield pool
+
+    def _prune(self, pool):
+        scores = pool[self.score]
+        keep = np.ones(len(scores), dtype = bool)
+        if self.margin is not None and len(scores) > 0:
+            keep &= scores <= np.min(scores) * (1 + self.margin)
+        if self.top_k is not None and np.count_nonzero(keep) > self.top_k:
+            index = np.flatnonzero(keep)
+            keep[:] = False
+            keep[index[np.argpartition(scores[index], self.top_k - 1)[:self.top_k]]] = True
+
+        return(select(pool, keep))
+
+    def _count(self, batch):
+        self.stats["kept"] += len(batch[self.score])
+        self.stats["dropped"] = self.stats["evaluated"] - self.stats["kept"]
+
+class ScreeningPipeline(object):
+
+    def __init__(self, stages):
+        self.stages = stages
+
+    def run(self, candidates, batch_size = 4096): # generator of the batches that survive every stage. candidates is an iterable of candidate dictionaries or of batches
+        candidates = iter(candidates)
+        first = next(candidates, None)
+        if first is None:
+            raise Exception("There are no candidates to screen")
+        stream = _chain(first, candidates)
+        if np.ndim(first[fields[0]]) == 0:
+            stream = batches_from_rows(stream, batch_size)
+        for stage in self.stages:
+            stream = stage.run(stream)
+
+        return(stream)
+
+    def report(self): # per stage counts, time and throughput in candidates per second
+        report = []
+        for stage in self.stages:
+            stats = dict(stage.stats)
+            stats["throughput"] = stats["evaluated"] / stats["seconds"] if stats["seconds"] > 0 else np.inf
+            report.append(stats)
+
+        return(report)
+
+def _chain(first, rest):
+    yield first
+    for item in rest:
+        yield item
+
+### Stages ###
+
+def regression_stage(keywords = input_file.keywords, **kwargs): # cheap screen: regression motor weight plus Krantz gearbox weight at the candidate's motor_rpm
+    coefficients = regression_coefficients(keywords)
+
+    def evaluate(batch):
+        motor_wt = np.polyval(coefficients, batch["power"])
+        gb_wt = gearbox_weight(batch["power"] * 1.34102, batch["K_gearbox_metric"], batch["prop_RPM"], batch["motor_rpm"])
+        return({"W_regression": batch["num_motors"] * (motor_wt + gb_wt)})
+
+    return(Stage("regression", evaluate, "W_regression", **kwargs))
+
+def optimal_motor_speed(P_out, HP_out, K_gearbox, R_RPM, min_RPM, max_RPM, rho = baseline.Motor_Density, S_stress = baseline.S_stress, P_factor = baseline.P_factor): # speed that minimizes the computational weight, for arrays of designs
+    # the weight is a / motor_speed + b * motor_speed**.13, which is convex with a single minimum where a / n**2 = .13 * b * n**-.87
+    a = rho * (pi / 4) * 60 * P_out * 1000 / (pi**2 * S_stress * P_factor)
+    b = K_gearbox * HP_out**.76 / R_RPM**.89
+
+    return(np.clip((a / (.13 * b))**(1 / 1.13), min_RPM, max_RPM))
+
+def computation_stage(min_RPM = 1000., max_RPM = 20000., config = baseline, **kwargs): # refinement: computational weight at the optimal motor speed of every candidate
+    def evaluate(batch):
+        HP_out = batch["power"] * 1.34102
+        motor_speed = optimal_motor_speed(batch["power"], HP_out, batch["K_gearbox_metric"], batch["prop_RPM"], min_RPM, max_RPM, config.Motor_Density, config.S_stress, config.P_factor)
+        wt = motor_gearbox_weight(config.Motor_Density, batch["power"], HP_out, config.S_stress, config.P_factor, batch["K_gearbox_metric"], batch["prop_RPM"], motor_speed)
+        return({"motor_speed": motor_speed, "W_computation": batch["num_motors"] * wt})
+
+    return(Stage("computation", evaluate, "W_computation", **kwargs))
+
+def test_screening(num_candidates = 20000):
+    rng = np.random.RandomState(0)
+    candidates = ({"power": p, "motor_rpm": n, "prop_RPM": r, "K_gearbox_metric": 32.688, "num_motors": 4}
+                  for p, n, r in zip(rng.uniform(400, 600, num_candidates), rng.uniform(5000, 20000, num_candidates), rng.uniform(2000, 5000, num_candidates)))
+
+    pipeline = ScreeningPipeline([regression_stage(margin = .05), computation_stage(top_k = 10)])
+    survivors = concatenate(list(pipeline.run(candidates)))
+
+    return(pipeline, survivors)
+
+if __name__ == "__main__":
+
+    pipeline, survivors = test_screening(200000)
+
+    for stats in pipeline.report():
+        print("%(stage)12s: evaluated %(evaluated)8d, kept %(kept)8d, dropped %(dropped)8d, %(throughput)12.0f candidates/s" %stats)
+    print("Best candidate: %s kW at %s RPM weighs %s kg" %(survivors["power"][0], survivors["motor_speed"][0], survivors["W_computation"][0]))
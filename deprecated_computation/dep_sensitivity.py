@@ -0,0 +1,110 @@
+from collections import OrderedDict
+from multiprocessing import Pool
+import numpy as np
+import dep_input_file as input_file
+from dep_config import baseline
+from w_motor_reg import regression_coefficients
+from w_gearbox import gearbox_weight
+from dep_computational_sizing_component import motor_gearbox_weight
+
+### Global (Sobol) sensitivity of W_motor_gearbox to the sizing inputs over their ranges. Uses the Saltelli scheme: two independent sample matrices A and
+### B and, for every input i, the matrix AB_i (A with column i taken from B), so k inputs take (k + 2) * N evaluations of the batched weight formulas of
+### Regression + GearboxWeight or MotorGearboxWeight. First order indices use the Saltelli (2010) estimator and total indices the Jansen estimator. The
+### samples are drawn and evaluated in chunks that only return sums, so memory is bounded by the chunk size and the chunks run in parallel processes.
+### The integer_inputs, the motor count, are sampled uniformly over the integers from their lower to their upper bound, every other input continuously.
+
+default_bounds = OrderedDict([("power", (250., 1000.)), ("motor_rpm", (5000., 20000.)), ("prop_RPM", (2000., 5000.)),
+                              ("K_gearbox_metric", (.8 * baseline.K_gearbox_metric, 1.2 * baseline.K_gearbox_metric)),
+                              ("S_stress", (.8 * baseline.S_stress, 1.2 * baseline.S_stress)), ("P_factor", (.85, .98)),
+                              ("Motor_Density", (.8 * baseline.Motor_Density, 1.2 * baseline.Motor_Density)), ("num_motors", (2., 8.))])
+
+integer_inputs = ["num_motors"]
+
+_coefficients = {}   # regression coefficients of this process by keywords
+
+def assembly_weight(x, algorithm = "regression", keywords = input_file.keywords): # W_motor_gearbox for a dictionary of input arrays, the same formulas as the MotorGearbox group with motor_speed = motor_rpm
+    HP_out = x["power"] * 1.34102
+    if algorithm == "regression":
+        key = tuple(sorted(keywords))
+        if key not in _coefficients:
+            _coefficients[key] = regression_coefficients(keywords)
+        motor_wt = np.polyval(_coefficients[key], x["power"])
+        return(x["num_motors"] * (motor_wt + gearbox_weight(HP_out, x["K_gearbox_metric"], x["prop_RPM"], x["motor_rpm"])))
+    if algorithm == "computation":
+        return(x["num_motors"] * motor_gearbox_weight(x["Motor_Density"], x["power"], HP_out, x["S_stress"], x["P_factor"], x["K_gearbox_metric"], x["prop_RPM"], x["motor_rpm"]))
+
+    raise Exception("You have specified an algorithm of %s, choose from regression and computation" %(algorithm))
+
+def chunk_sums(chunk, chunk_size, bounds, algorithm, keywords, seed): # evaluates the A, B and AB_i samples of one chunk and returns the sums the estimators need
+    rng = np.random.RandomState([seed, chunk])   # every chunk has its own stream, so the result does not depend on how chunks are shared out
+    names = list(bounds)
+    lower = np.array([bounds[name][0] for name in names])
+    upper = np.array([bounds[name][1] for name in names])
+    integer = np.array([name in integer_inputs for name in names])
+
+    def sample(u): # maps uniform samples of the unit hypercube to the bounds, with one equally likely value per integer in the bounds of the integer_inputs
+        return(np.where(integer, np.floor(lower + u * (upper - lower + 1)), lower + u * (upper - lower)))
+
+    A = sample(rng.rand(chunk_size, len(names)))
+    B = sample(rng.rand(chunk_size, len(names)))
+
+    def evaluate(matrix):
+        return(assembly_weight(dict((name, matrix[:, i]) for i, name in enumerate(names)), algorithm, keywords))
+
+    f_A = evaluate(A)
+    f_B = evaluate(B)
+    first = np.zeros((2, len(names)))   # sum and sum of squares of f_B * (f_AB_i - f_A)
+    total = np.zeros((2, len(names)))   # sum and sum of squares of (f_A - f_AB_i)**2 / 2
+    for i in range(len(names)):
+        AB = np.copy(A)
+        AB[:, i] = B[:, i]
+        f_AB = evaluate(AB)
+        terms = [f_B * (f_AB - f_A), (f_A - f_AB)**2 / 2]
+        first[:, i] = [np.sum(terms[0]), np.sum(terms[0]**2)]
+        total[:, i] = [np.sum(terms[1]), np.sum(terms[1]**2)]
+    f = np.concatenate([f_A, f_B])
+
+    return({"n": chunk_size, "f": np.array([np.sum(f), np.sum(f**2)]), "first": first, "total": total})
+
+def _chunk_sums(args):
+    return(chunk_sums(*args))
+
+def sobol_indices(num_samples, bounds = default_bounds, algorithm = "regression", keywords = input_file.keywords, chunk_size = 10000, jobs = 1, seed = 0, z = 1.96): # returns the first order and total Sobol indices of every input with their confidence intervals (+- half widths at z standard errors)
+    bounds = OrderedDict(bounds)
+    tasks = [(chunk, min(chunk_size, num_samples - start), bounds, algorithm, keywords, seed) for chunk, start in enumerate(range(0, num_samples, chunk_size))]
+    if jobs == 1:
+        results = [chunk_sums(*task) for task in tasks]
+    else:
+        with Pool(jobs) as pool:
+            results = pool.map(_chunk_sums, tasks)
+
+    n = sum(result["n"] for result in results)
+    sums = dict((name, sum(result[name] for result in results)) for name in ["f", "first", "total"])
+
+    mean = sums["f"][0] / (2 * n)
+    variance = sums["f"][1] / (2 * n) - mean**2
+
+    def estimate(term_sums): # index and confidence half width from the sums of the per sample terms, ignoring the error in the variance
+        term_mean = term_sums[0] / n
+        term_std = np.sqrt(np.maximum(term_sums[1] / n - term_mean**2, 0))
+        return(term_mean / variance, z * term_std / (np.sqrt(n) * variance))
+
+    S1, S1_conf = estimate(sums["first"])
+    ST, ST_conf = estimate(sums["total"])
+    indices = OrderedDict((name, {"S1": S1[i], "S1_conf": S1_conf[i], "ST": ST[i], "ST_conf": ST_conf[i]}) for i, name in enumerate(bounds))
+
+    return({"indices": indices, "mean": mean, "variance": variance, "samples": n, "evaluations": (len(bounds) + 2) * n})
+
+def test_sensitivity(num_samples = 20000, jobs = 1):
+    return(sobol_indices(num_samples, algorithm = "regression", jobs = jobs), sobol_indices(num_samples, algorithm = "computation", jobs = jobs))
+
+if __name__ == "__main__":
+    from time import time
+
+    start = time()
+    results = test_sensitivity(10**5, jobs = 4)
+    print("%s evaluations in %.2f s" %(2 * results[0]["evaluations"], time() - start))
+    for algorithm, result in zip(["Regression", "Computation"], results):
+        print("\n%s: mean W_motor_gearbox %.1f kg, std %.1f kg" %(algorithm, result["mean"], np.sqrt(result["variance"])))
+        for name, index in result["indices"].items():
+            print("%18s  S1 = %6.3f +- %5.3f   ST = %6.3f +- %5.3f" %(name, index["S1"], index["S1_conf"], index["ST"], index["ST_conf"]))
@@ -0,0 +1,260 @@
+import os
+import json
+import asyncio
+import argparse
+from time import perf_counter
+from collections import deque, OrderedDict
+import numpy as np
+import dep_input_file as input_file
+from dep_config import baseline
+from w_motor_reg import regression_coefficients, catalog
+from w_gearbox import gearbox_weight
+from dep_computational_sizing_component import motor_gearbox_weight
+from dep_screening import optimal_motor_speed
+
+### Local motor + gearbox sizing service. Trade study tools POST a JSON design to /size over HTTP (TCP or a Unix socket) and get back the same weights
+### as a MotorGearbox group, without building a Problem per request. The service keeps one warm model per keyword set and algorithm, and every model
+### collects the requests that arrive within a short window into one batch that is evaluated with a single vectorized call. GET /metrics returns the
+### request latency and batch size statistics. Run it with: python dep_service.py --port 8642 (or --unix /tmp/sizing.sock)
+
+algorithms = ["regression", "computation"]
+request_fields = OrderedDict([("power", 500.), ("motor_rpm", 20000.), ("prop_RPM", baseline.prop_RPM), ("K_gearbox_metric", baseline.K_gearbox_metric), ("num_motors", 4.)])
+
+class RequestError(Exception): # a request that is malformed, answered with a 400. Any other error while sizing is the service's and is answered with a 500
+    pass
+
+class WarmModel(object): # Batched equivalent of a MotorGearbox group for one keyword set and algorithm, set up once and reused for every batch
+
+    def __init__(self, keywords = input_file.keywords, algorithm = "regression", config = baseline, min_RPM = 1000., max_RPM = 20000.):
+        if algorithm not in algorithms:
+            raise Exception("You have specified an algorithm of %s, the service supports %s" %(algorithm, " and ".join(algorithms)))
+        self.keywords = list(keywords)
+        self.algorithm = algorithm
+        self.config = config
+        self.min_RPM = min_RPM
+        self.max_RPM = max_RPM
+        self.coefficients = regression_coefficients(keywords) if algorithm == "regression" else None
+
+    def evaluate(self, batch): # batch is a dictionary of arrays with the request_fields, returns a dictionary of result arrays
+        HP_out = batch["power"] * 1.34102
+        if self.algorithm == "regression":
+            motor_wt = np.polyval(self.coefficients, batch["power"])
+            gb_wt = gearbox_weight(HP_out, batch["K_gearbox_metric"], batch["prop_RPM"], batch["motor_rpm"])
+            return({"motor_wt": motor_wt, "gb_wt": gb_wt, "motor_rpm": batch["motor_rpm"], "W_motor_gearbox": batch["num_motors"] * (motor_wt + gb_wt)})
+
+        config = self.config
+        motor_rpm = optimal_motor_speed(batch["power"], HP_out, batch["K_gearbox_metric"], batch["prop_RPM"], self.min_RPM, self.max_RPM, config.Motor_Density, config.S_stress, config.P_factor)
+        combined_wt = motor_gearbox_weight(config.Motor_Density, batch["power"], HP_out, config.S_stress, config.P_factor, batch["K_gearbox_metric"], batch["prop_RPM"], motor_rpm)
+
+        return({"combined_wt": combined_wt, "motor_rpm": motor_rpm, "W_motor_gearbox": batch["num_motors"] * combined_wt})
+
+class Metrics(object): # Request latencies and batch sizes, keeping the last `history` of each for the percentiles
+
+    def __init__(self, history = 100000):
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.latencies = deque(maxlen = history)    # seconds from the request being read to its response being ready
+        self.batch_sizes = deque(maxlen = history)
+
+    def snapshot(self):
+        latencies = np.array(self.latencies) * 1000
+        sizes = np.array(self.batch_sizes)
+        stats = {"requests": self.requests, "errors": self.errors, "batches": self.batches}
+        if np.size(latencies) > 0:
+            stats.update(dict(("latency_%s_ms" %name, float(np.percentile(latencies, q))) for name, q in [("p50", 50), ("p90", 90), ("p99", 99)]))
+            stats["latency_max_ms"] = float(np.max(latencies))
+        if np.size(sizes) > 0:
+            stats.update({"batch_size_mean": float(np.mean(sizes)), "batch_size_max": int(np.max(sizes)), "batch_size_p50": float(np.percentile(sizes, 50))})
+
+        return(stats)
+
+class Batcher(object): # Coalesces the requests for one warm model: a batch is evaluated `window` seconds after its first request, or as soon as it holds max_batch requests
+
+    def __init__(self, model, metrics, window = .002, max_batch = 4096):
+        self.model = model
+        self.metrics = metrics
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self.timer = None
+
+    def submit(self, request): # returns a future of the result dictionary for one request, which holds every request_field as a float
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((request, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+        return(future)
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+
+        # flush runs in a timer callback, so an error here must reach every pending future or their requests would wait forever
+        try:
+            batch = dict((name, np.array([request[name] for request, future in pending], dtype = float)) for name in request_fields)
+            results = self.model.evaluate(batch)
+            responses = [dict((name, float(values[i])) for name, values in results.items()) for i in range(len(pending))]
+        except Exception as error:
+            for request, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.metrics.batches += 1
+        self.metrics.batch_sizes.append(len(pending))
+        for (request, future), response in zip(pending, responses):
+            if not future.done():
+                future.set_result(response)
+
+class SizingService(object):
+
+    def __init__(self, window = .002, max_batch = 4096, max_models = 64, config = baseline):
+        self.window = window
+        self.max_batch = max_batch
+        self.max_models = max_models
+        self.config = config
+        self.metrics = Metrics()
+        self.batchers = OrderedDict()   # warm models by (keywords, algorithm), least recently used first
+
+    def batcher(self, keywords, algorithm): # returns the batcher of the warm model for a keyword set, setting the model up on first use
+        key = (tuple(sorted(keywords)), algorithm)
+        if key in self.batchers:
+            self.batchers.move_to_end(key)
+        else:
+            self.batchers[key] = Batcher(WarmModel(keywords, algorithm, self.config), self.metrics, self.window, self.max_batch)
+            if len(self.batchers) > self.max_models:
+                self.batchers.pop(next(iter(self.batchers))).flush()
+
+        return(self.batchers[key])
+
+    def parse(self, body): # returns the design in a request body
+        try:
+            return(json.loads(body))
+        except ValueError as error:
+            raise RequestError("The request body is not valid JSON: %s" %(error))
+
+    async def size(self, request): # sizes one design, request holds the request_fields plus optional keywords and algorithm
+        if not isinstance(request, dict):
+            raise RequestError("The request body must be a JSON object, not %r" %(request))
+        unknown = set(request) - set(request_fields) - set(["keywords", "algorithm"])
+        if unknown:
+            raise RequestError("Unknown request fields %s, choose from %s" %(sorted(unknown), list(request_fields) + ["keywords", "algorithm"]))
+        values = OrderedDict()
+        for name, default in request_fields.items():   # checked here so that one bad request is rejected alone instead of failing its whole batch
+            try:
+                values[name] = float(request.get(name, default))
+            except (TypeError, ValueError):
+                raise RequestError("You have specified a %s of %r, which is not a number" %(name, request[name]))
+        keywords = request.get("keywords", input_file.keywords)
+        if not isinstance(keywords, list) or not all(keyword in catalog.words for keyword in keywords):
+            raise RequestError("You have specified keywords of %r, which must be a list of %s" %(keywords, catalog.words))
+        algorithm = request.get("algorithm", "regression")
+        if algorithm not in algorithms:
+            raise RequestError("You have specified an algorithm of %r, the service supports %s" %(algorithm, " and ".join(algorithms)))
+
+        return(await self.batcher(keywords, algorithm).submit(values))
+
+    async def respond(self, method, path, body): # returns the status and JSON body of the response to one HTTP request
+        if method == "GET" and path == "/metrics":
+            return(200, self.metrics.snapshot())
+        if method == "GET" and path == "/health":
+            return(200, {"status": "ok", "models": len(self.batchers)})
+        if method != "POST" or path != "/size":
+            return(404, {"error": "Unknown endpoint %s %s, use POST /size, GET /metrics or GET /health" %(method, path)})
+
+        start = perf_counter()
+        self.metrics.requests += 1
+        try:
+            result = await self.size(self.parse(body))
+        except RequestError as error:
+            self.metrics.errors += 1
+            return(400, {"error": str(error)})
+        except Exception as error:
+            self.metrics.errors += 1
+            return(500, {"error": str(error)})
+        self.metrics.latencies.append(perf_counter() - start)
+
+        return(200, result)
+
+    async def handle(self, reader, writer): # serves the HTTP/1.1 requests of one connection, keeping it alive until the client closes it
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path = request_line.decode("latin-1").split()[:2]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in [b"\r\n", b"\n", b""]:
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self.respond(method, path, body)
+                data = json.dumps(payload).encode("utf-8")
+                close = headers.get("connection", "").lower() == "close"
+                writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n"
+                             %(status, b"OK" if status == 200 else b"Error", len(data), b"close" if close else b"keep-alive") + data)
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host = "127.0.0.1", port = 8642, unix = None): # starts listening on a Unix socket when unix is a path, otherwise on host:port (port 0 picks a free port)
+        if unix is not None:
+            if os.path.exists(unix):
+                os.remove(unix)
+            return(await asyncio.start_unix_server(self.handle, path = unix))
+
+        return(await asyncio.start_server(self.handle, host, port))
+
+async def request(address, method = "GET", path = "/metrics", payload = None, connection = None): # minimal client: sends one request and returns (status, JSON body, connection). address is (host, port) or a Unix socket path
+    if connection is None:
+        connection = await (asyncio.open_unix_connection(address) if isinstance(address, str) else asyncio.open_connection(*address))
+    reader, writer = connection
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(b"%s %s HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n" %(method.encode(), path.encode(), len(body)) + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in [b"\r\n", b""]:
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+
+    return(status, json.loads(await reader.readexactly(length)), connection)
+
+async def serve(host, port, unix, window, max_batch):
+    service = SizingService(window, max_batch)
+    server = await service.start(host, port, unix)
+    print("Sizing service listening on %s" %(unix if unix is not None else "%s:%s" %server.sockets[0].getsockname()[:2]))
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "Local motor + gearbox sizing service")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8642)
+    parser.add_argument("--unix", default = None, help = "serve on this Unix socket path instead of TCP")
+    parser.add_argument("--window-ms", type = float, default = 2., help = "how long a batch waits for more requests")
+    parser.add_argument("--max-batch", type = int, default = 4096)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.unix, args.window_ms / 1000, args.max_batch))
@@ -0,0 +1,73 @@
+import os
+import asyncio
+import argparse
+import tempfile
+from time import perf_counter
+import numpy as np
+from dep_service import SizingService, request
+
+### Load generator for the sizing service in dep_service.py. `concurrency` clients each keep one connection open and send their share of the requests
+### back to back. Reports the client side p50/p99 latency and the requests per second, along with the server's own metrics. Without an address, a
+### service is started in this process on a temporary Unix socket, so the benchmark runs offline: python dep_service_load.py --requests 20000
+
+def random_designs(num_requests, seed = 0): # random regression and computation sizing requests around the 500 kW baseline
+    rng = np.random.RandomState(seed)
+    designs = []
+    for power, motor_rpm, algorithm in zip(rng.uniform(100, 1000, num_requests), rng.uniform(5000, 20000, num_requests), rng.choice(["regression", "computation"], num_requests)):
+        designs.append({"power": float(power), "motor_rpm": float(motor_rpm), "algorithm": str(algorithm)})
+
+    return(designs)
+
+async def run_load(address, designs, concurrency = 64): # sends every design to the service at address and returns the latency and throughput statistics
+    latencies = np.zeros(len(designs))
+    statuses = np.zeros(len(designs), dtype = int)
+
+    async def client(indices):
+        connection = None
+        for i in indices:
+            start = perf_counter()
+            statuses[i], result, connection = await request(address, "POST", "/size", designs[i], connection)
+            latencies[i] = perf_counter() - start
+        if connection is not None:
+            connection[1].close()
+            await connection[1].wait_closed()
+
+    start = perf_counter()
+    await asyncio.gather(*[client(range(k, len(designs), concurrency)) for k in range(concurrency)])
+    elapsed = perf_counter() - start
+    status, server, connection = await request(address)
+    connection[1].close()
+    await connection[1].wait_closed()
+
+    return({"requests": len(designs), "errors": int(np.count_nonzero(statuses != 200)), "seconds": elapsed, "requests_per_second": len(designs) / elapsed,
+            "latency_p50_ms": float(np.percentile(latencies, 50) * 1000), "latency_p99_ms": float(np.percentile(latencies, 99) * 1000), "server": server})
+
+async def benchmark(num_requests, concurrency, address = None, window = .002):
+    if address is not None:
+        return(await run_load(address, random_designs(num_requests), concurrency))
+
+    address = os.path.join(tempfile.mkdtemp(), "sizing.sock")
+    server = await SizingService(window).start(unix = address)
+    try:
+        return(await run_load(address, random_designs(num_requests), concurrency))
+    finally:
+        server.close()
+        await server.wait_closed()
+        os.remove(address)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "Load generator for the sizing service")
+    parser.add_argument("--requests", type = int, default = 20000)
+    parser.add_argument("--concurrency", type = int, default = 64)
+    parser.add_argument("--host", default = None, help = "host of a running service, by default one is started in this process")
+    parser.add_argument("--port", type = int, default = 8642)
+    parser.add_argument("--unix", default = None, help = "Unix socket of a running service")
+    parser.add_argument("--window-ms", type = float, default = 2., help = "batch window of the in-process service")
+    args = parser.parse_args()
+
+    address = args.unix if args.unix is not None else None if args.host is None else (args.host, args.port)
+    stats = asyncio.run(benchmark(args.requests, args.concurrency, address, args.window_ms / 1000))
+
+    print("%(requests)d requests, %(errors)d errors in %(seconds).2f s: %(requests_per_second).0f requests/s, latency p50 %(latency_p50_ms).2f ms, p99 %(latency_p99_ms).2f ms" %stats)
+    print("Server: %s" %stats["server"])
@@ -0,0 +1,143 @@
+import os
+import sys
+import pickle
+import hashlib
+import inspect
+import json
+import numpy as np
+from openmdao.api import Problem, ExplicitComponent, KrigingSurrogate, ResponseSurface
+from artifacts import _atomic_write
+from dep_computational_sizing_component import MotorGearboxWeight
+
+### Surrogate of the computational motor + gearbox weight. The full model is sampled over a domain of its inputs (the others are held fixed), a kriging or
+### response surface model is trained on the samples, and the trained surrogate is pickled to disk under a hash of everything that went into it, so that
+### later runs, and other processes, load it instead of sampling the full model again. The weight is a sum of power laws of the inputs, so the surrogate
+### is trained on log(inputs) and log(weight), which is far smoother than the weight itself.
+
+surrogates = {"kriging": lambda: KrigingSurrogate(eval_rmse = True), "response_surface": ResponseSurface}
+
+def _dump(trained, path):
+    with open(path, "wb") as f:
+        pickle.dump(trained, f, protocol = pickle.HIGHEST_PROTOCOL)
+
+def surrogate_key(domain, fixed, num_samples, surrogate, seed): # hash of the training inputs and of the source of the full model module, weight formula included, used as the cache file name
+    text = json.dumps([sorted((name, list(map(float, bounds))) for name, bounds in domain.items()), sorted((name, float(val)) for name, val in fixed.items()),
+                       num_samples, surrogate, seed, inspect.getsource(sys.modules[MotorGearboxWeight.__module__])])
+
+    return(hashlib.sha1(text.encode("utf-8")).hexdigest())
+
+def latin_hypercube(num_samples, num_dims, seed = 0): # returns num_samples points in the unit hypercube with one point in every row and column stratum
+    rng = np.random.RandomState(seed)
+    strata = np.argsort(rng.rand(num_samples, num_dims), axis = 0)
+
+    return((strata + rng.rand(num_samples, num_dims)) / num_samples)
+
+def sample_full_model(domain, fixed, num_samples, seed = 0): # evaluates MotorGearboxWeight at Latin hypercube samples of the domain and returns the samples and weights
+    names = sorted(domain)
+    lower = np.array([domain[name][0] for name in names], dtype = float)
+    upper = np.array([domain[name][1] for name in names], dtype = float)
+    x = lower + latin_hypercube(num_samples, len(names), seed) * (upper - lower)
+    x[:2] = [lower, upper]   # always include the corners of the domain
+
+    prob = Problem()
+    prob.model.add_subsystem("full", MotorGearboxWeight(), promotes = ["*"])
+    prob.setup(check = False)
+    for name, val in fixed.items():
+        prob[name] = val
+
+    y = np.zeros((num_samples, 1))
+    for i in range(num_samples):
+        for j, name in enumerate(names):
+            prob[name] = x[i, j]
+        prob.run_model()
+        y[i] = prob["wt"]
+
+    return(x, y)
+
+def train_surrogate(domain, fixed = {}, num_samples = 50, surrogate = "kriging", cache_dir = None, seed = 0): # returns a dictionary with the trained surrogate, its training data and its domain, loading it from cache_dir when it was trained before
+    if surrogate not in surrogates:
+        raise Exception("You have specified a surrogate of %s, which does not exist, choose from %s" %(surrogate, sorted(surrogates)))
+    key = surrogate_key(domain, fixed, num_samples, surrogate, seed)
+    path = None if cache_dir is None else os.path.join(cache_dir, "motor_gb_surrogate_%s.pkl" %key)
+    if path is not None and os.path.exists(path):
+        with open(path, "rb") as f:
+            return(pickle.load(f))
+
+    x, y = sample_full_model(domain, fixed, num_samples, seed)
+    model = surrogates[surrogate]()
+    model.train(np.log(x), np.log(y))
+    trained = {"key": key, "names": sorted(domain), "lower": x.min(axis = 0), "upper": x.max(axis = 0), "x": x, "y": y, "model": model}
+
+    if path is not None:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        _atomic_write(path, lambda tmp: _dump(trained, tmp))
+
+    return(trained)
+
+class SurrogateMotorGearboxWeight(ExplicitComponent): # Drop in replacement for MotorGearboxWeight that evaluates a trained surrogate instead of the full model
+
+    def initialize(self):
+        self.options.declare("trained", types = dict, desc = "Trained surrogate returned by train_surrogate")
+
+    def setup(self):
+        trained = self.options["trained"]
+        units = {"Motor_Density": "kg / m**3", "P_out": "kW", "HP_out": "hp", "S_stress": "Pa", "R_RPM": "rpm", "motor_speed": "rpm"}
+
+        for name, lower, upper in zip(trained["names"], trained["lower"], trained["upper"]):
+            self.add_input(name, val = (lower + upper) / 2, units = units.get(name), desc = "Input of the full model that the surrogate was trained over")
+
+        self.add_output("wt", units = "kg", desc = "weight of motor and gearbox")
+        self.add_output("wt_rmse", units = "kg", desc = "kriging estimate of the surrogate error, zero for response surfaces")
+        self.add_output("extrapolation", desc = "distance outside of the trained domain, as a fraction of the domain size. Zero when the query is inside the domain")
+
+        self.declare_partials("wt", trained["names"])   # wt_rmse and extrapolation are diagnostics and have no derivatives
+
+    def _query(self, inputs):
+        return(np.array([[np.real(inputs[name][0]) for name in self.options["trained"]["names"]]]))
+
+    def _predict(self, x): # returns the predicted weight and the kriging estimate of its relative error
+        prediction = self.options["trained"]["model"].predict(np.log(x))
+        if isinstance(prediction, tuple):
+            return(np.exp(np.ravel(prediction[0])[0]), np.ravel(prediction[1])[0])
+
+        return(np.exp(np.ravel(prediction)[0]), 0.)
+
+    def compute(self, inputs, outputs):
+        trained = self.options["trained"]
+        x = self._query(inputs)
+        wt, log_rmse = self._predict(x)
+
+        outputs["wt"] = wt
+        outputs["wt_rmse"] = wt * log_rmse
+        outside = np.maximum(trained["lower"] - x[0], 0) + np.maximum(x[0] - trained["upper"], 0)
+        outputs["extrapolation"] = np.max(outside / (trained["upper"] - trained["lower"]))
+
+    def compute_partials(self, inputs, J):
+        trained = self.options["trained"]
+        x = self._query(inputs)
+        wt = self._predict(x)[0]
+        jac = np.atleast_2d(trained["model"].linearize(np.log(x)))   # d log(wt) / d log(x)
+
+        for j, name in enumerate(trained["names"]):
+            J["wt", name] = jac[0, j] * wt / x[0, j]
+
+def test_surrogate_weight(cache_dir = None):
+    trained = train_surrogate({"motor_speed": (1000, 20000)}, fixed = {"P_out": 500, "HP_out": 500 * 1.34102}, num_samples = 40, cache_dir = cache_dir)
+
+    prob = Problem()
+    prob.model.add_subsystem("surrogate", SurrogateMotorGearboxWeight(trained = trained), promotes = ["*"])
+
+    prob.setup(check = False)
+
+    prob["motor_speed"] = 15000
+    prob.run_model()
+
+    return(prob)
+
+if __name__ == "__main__":
+
+    prob = test_surrogate_weight()
+    prob.check_partials(compact_print = True, method = "fd")
+
+    print("Surrogate weight: %s kg, estimated error: %s kg" %(prob["wt"], prob["wt_rmse"]))
@@ -1,50 +1,137 @@
+from collections import namedtuple, OrderedDict
+import numpy as np
 from openmdao.api import Problem, Group, IndepVarComp, ScipyOptimizeDriver
 from warnings import warn as wrn
-from regression_motor_sizing import Regression
-import input_file as input_file
-from gearbox_weight_component import GearboxWeight
-from computational_sizing_component import MotorGearboxWeight
-from num_motors_component import NumMotors
+from w_motor_reg import Regression
+import dep_input_file as input_file
+from dep_config import SizingConfig, baseline
+from w_gearbox import GearboxWeight, MultiStageGearboxWeight
+from dep_computational_sizing_component import MotorGearboxWeight
+from dep_region_sizing_component import RegionMotorGearboxWeight
+from dep_num_motors_component import NumMotors
+from dep_surrogate import train_surrogate, SurrogateMotorGearboxWeight
 
 ### Below is a list of the valid keywords for the motor
 # ['Aero', 'Auto', 'OutRunner',  'InRunner',  'Dual', 'Axial',      'Radial', 'AirCool',    'LiquidCool', 'Development','Commercial', 'BMW',
 # 'Brusa','Emrax','Joby','Launchpoint','Magicall','MagniX','Magnax','McLaren','NeuMotor','Rotex','Siemens','ThinGap','UQM','YASA']
 
-### The two acceptable strings for algorithm type are: "computation" and "regression"
+### The algorithm option picks one of the sizing backends registered below: "regression", "computation" (lumped density), "region" (region resolved,
+### see dep_region_sizing_component.py) and "surrogate" (kriging surrogate of the computational model, see dep_surrogate.py)
+
+
+### Sizing backends ###
+# Every sizing method registers a factory that adds its subsystems to the MotorGearbox group and returns how they connect to NumMotors. Each backend
+# declares the group inputs it needs (from input_definitions), whether its components are vectorized, its cost class, whether motor_speed is left to
+# an optimizer, and its outputs: "split" for separate motor and gearbox weights or "combined" for one motor + gearbox weight. Screening runs can then be
+# routed to cheap backends and final candidates to expensive ones with the same group.
+
+cost_classes = ["cheap", "moderate", "expensive"]
+output_modes = OrderedDict([("split", ["motor_wt", "gb_wt"]), ("combined", ["combined_wt"])])   # NumMotors inputs the factory returns sources for
+SizingBackend = namedtuple("SizingBackend", ["name", "factory", "inputs", "vectorized", "cost", "optimize_speed", "outputs"])
+backends = OrderedDict()
+
+def register_backend(name, inputs, outputs, vectorized = False, cost = "cheap", optimize_speed = False): # decorator that registers a sizing backend factory under name
+    if cost not in cost_classes:
+        raise Exception("You have specified a cost class of %s, which does not exist, choose from %s" %(cost, cost_classes))
+    if outputs not in output_modes:
+        raise Exception("You have specified outputs of %s, which do not exist, choose from %s" %(outputs, list(output_modes)))
+
+    def register(factory):
+        backends[name] = SizingBackend(name, factory, list(inputs), vectorized, cost, optimize_speed, outputs)
+        return(factory)
+
+    return(register)
+
+def backend_names(max_cost = "expensive", vectorized = None): # names of the registered backends up to a cost class, cheapest first. vectorized = True or False also filters on vectorization support
+    limit = cost_classes.index(max_cost)
+    names = [name for name, backend in backends.items() if cost_classes.index(backend.cost) <= limit and vectorized in [None, backend.vectorized]]
+
+    return(sorted(names, key = lambda name: cost_classes.index(backends[name].cost)))
+
+def input_definitions(options): # value, units and description of every input a backend can declare, for the options of a MotorGearbox group
+    horsepower = options["power"] * 1.34102
+    config = options["config"]
+
+    return({"Motor_Density": (config.Motor_Density, "kg / m**3", "Volumetric Density of entire motor"),
+            "power": (options["power"], "kW", "Output power of the motor"),
+            "HP_out": (horsepower, "hp", "Output power of the motor in HP"),
+            "S_stress": (config.S_stress, "Pa", "Magnetic shear stress of motor"),
+            "P_factor": (config.P_factor, None, "Power factor of motor"),
+            "E": (config.E, None, "Efficiency of motor"),
+            "pole_num": (config.pole_num, None, "Number of poles of the motor"),
+            "D_out": (config.D_out, "m", "Outer diameter of the motor"),
+            "K_gearbox_metric": (config.K_gearbox_metric, None, "Technology level of gearbox"),
+            "prop_RPM": (config.prop_RPM, "rpm", "Propeller RPM, slower gearbox speed"),
+            "motor_speed": (options["max_RPM"], "rpm", "Motor speed, the value that will be varied by the optimizer")})
+
+@register_backend("regression", ["power", "HP_out", "K_gearbox_metric", "prop_RPM", "motor_speed"], "split", vectorized = True, cost = "cheap")
+def regression_backend(group):
+    n = group.options["vec_size"]
+    group.add_subsystem("motor", Regression(keywords = group.options["keywords"], vec_size = n), promotes_inputs = ["power"])
+    if group.options["gearbox_stages"] is None:
+        group.add_subsystem("gearbox", GearboxWeight(vec_size = n), promotes_inputs = ["HP_out", "K_gearbox_metric", "motor_speed"])
+    else:
+        group.add_subsystem("gearbox", MultiStageGearboxWeight(stages = group.options["gearbox_stages"], vec_size = n), promotes_inputs = ["HP_out", "K_gearbox_metric", "motor_speed"])
+    group.connect("prop_RPM", "gearbox.R_RPM")
+
+    return({"motor_wt": "motor.wt", "gb_wt": "gearbox.wt"})
+
+@register_backend("computation", ["Motor_Density", "power", "HP_out", "S_stress", "P_factor", "K_gearbox_metric", "prop_RPM", "motor_speed"], "combined", vectorized = True, cost = "moderate", optimize_speed = True)
+def computation_backend(group):
+    group.add_subsystem("combined_motor_gb", MotorGearboxWeight(vec_size = group.options["vec_size"]), promotes_inputs=["HP_out", "Motor_Density", "S_stress", "P_factor", "K_gearbox_metric", "motor_speed"])
+    group.connect("power", "combined_motor_gb.P_out")
+    group.connect("prop_RPM", "combined_motor_gb.R_RPM")
+
+    return({"combined_wt": "combined_motor_gb.wt"})
+
+@register_backend("region", ["power", "HP_out", "S_stress", "P_factor", "E", "pole_num", "D_out", "K_gearbox_metric", "prop_RPM", "motor_speed"], "combined", cost = "expensive", optimize_speed = True)
+def region_backend(group):
+    group.add_subsystem("combined_motor_gb", RegionMotorGearboxWeight(config = group.options["config"]), promotes_inputs=["HP_out", "S_stress", "P_factor", "E", "pole_num", "D_out", "K_gearbox_metric", "motor_speed"])
+    group.connect("power", "combined_motor_gb.P_out")
+    group.connect("prop_RPM", "combined_motor_gb.R_RPM")
+
+    return({"combined_wt": "combined_motor_gb.wt"})
+
+@register_backend("surrogate", ["motor_speed"], "combined", cost = "cheap", optimize_speed = True)
+def surrogate_backend(group):
+    config = group.options["config"]
+    fixed = {"Motor_Density": config.Motor_Density, "P_out": group.options["power"], "HP_out": group.options["power"] * 1.34102, "S_stress": config.S_stress,
+             "P_factor": config.P_factor, "K_gearbox_metric": config.K_gearbox_metric, "R_RPM": config.prop_RPM}
+    trained = train_surrogate({"motor_speed": (group.options["min_RPM"], group.options["max_RPM"])}, fixed, group.options["surrogate_samples"], cache_dir = group.options["cache_dir"])
+    group.add_subsystem("combined_motor_gb", SurrogateMotorGearboxWeight(trained = trained), promotes_inputs=["motor_speed"])
+
+    return({"combined_wt": "combined_motor_gb.wt"})
 
 
 ### Top level group to switch between algorithms ###
 class MotorGearbox(Group):
 
     def initialize(self):
-        self.options.declare("algorithm", default = "regression", desc = "Tells the group which algorithm to execute")
+        self.options.declare("algorithm", default = "regression", desc = "Name of the registered sizing backend the group executes")
         self.options.declare("power", default = 500, desc = "Power required from motor to size in kW")
         self.options.declare("max_RPM", default = 20000, desc = "Maximum limit on optimizer if running computational algorithm")
         self.options.declare("min_RPM", default = 1000, desc = "Minimum limit on optimizer if running computational algorithm")
         self.options.declare("max_trq", default = 0, desc = "Maximum limit on torque for optimizer if running computational algorithm")
         self.options.declare("min_trq", default = 0, desc = "Minimum limit on torque for optimizer if running computational algorithm")
         self.options.declare("keywords", default = input_file.keywords, types = list, desc = "Keywords to use in regression calculation")
+        self.options.declare("surrogate_samples", default = 40, types = int, desc = "Number of runs of the computational model used to train the surrogate")
+        self.options.declare("config", default = baseline, types = SizingConfig, desc = "Motor and gearbox inputs, defaults to the values in dep_input_file.py")
+        self.options.declare("cache_dir", default = None, allow_none = True, desc = "Directory the trained surrogate is cached in, None to retrain every setup")
+        self.options.declare("gearbox_stages", default = None, types = list, allow_none = True, desc = "Stage counts of a multi-stage gearbox (see w_gearbox.py) to pick the lightest from, None for the single stage formula. Regression backend only")
+        self.options.declare("vec_size", default = 1, types = int, desc = "Number of independent designs sized at once, vectorized backends only. The inputs and outputs are vectors of this length")
 
     def setup(self):
+        if self.options["algorithm"] not in backends:
+            raise Exception("You have specified an algorithm of %s, which does not exist" %(self.options["algorithm"]))
+        backend = backends[self.options["algorithm"]]
+        if self.options["gearbox_stages"] is not None and self.options["algorithm"] != "regression":
+            raise Exception("A multi-stage gearbox is only available with the regression algorithm, the %s algorithm sizes the gearbox with the motor" %(self.options["algorithm"]))
+        if self.options["vec_size"] > 1 and not backend.vectorized:
+            raise Exception("The %s algorithm is not vectorized, choose from %s for a vec_size of %s" %(self.options["algorithm"], backend_names(vectorized = True), self.options["vec_size"]))
+
         ### perform basic calculations and variable initializations
         horsepower = self.options["power"] * 1.34102  
-        if self.options["algorithm"] == "regression":
-            ### set up inputs
-            indeps = self.add_subsystem("indeps", IndepVarComp(), promotes = ["*"])
-            indeps.add_output("power", self.options["power"], units = "kW", desc = "Output power of the motor")
-            indeps.add_output("HP_out", horsepower, units = "hp", desc = "Outpt power of the motor in HP")
-            indeps.add_output("K_gearbox_metric", input_file.K_gearbox_metric, desc = "Technology level of gearbox")
-            indeps.add_output("prop_RPM", input_file.prop_RPM, units = "rpm", desc = "Propeller RPM, slower gearbox speed")
-            indeps. add_output("motor_speed", self.options["max_RPM"], units = "rpm", desc = "Motor speed")
-            ### create connections
-            self.add_subsystem("motor", Regression(keywords = self.options["keywords"]), promotes_inputs = ["power"])
-            self.add_subsystem("gearbox", GearboxWeight(), promotes_inputs = ["HP_out", "K_gearbox_metric", "motor_speed"])
-            self.add_subsystem("multiply", NumMotors(motors = 4), promotes_outputs = ["W_motor_gearbox"])
-            self.connect("prop_RPM", "gearbox.R_RPM")
-            self.connect("motor.wt", "multiply.motor_wt")
-            self.connect("gearbox.wt", "multiply.gb_wt")
-
-        elif self.options["algorithm"] == "computation": 
+        if backend.optimize_speed:
             wrn("The computational method used for motor weight estimation is still a work in progress and currently inaccurate", Warning)
 
             ### calculate torque from RPM if torque is provided
@@ -62,26 +149,21 @@ class MotorGearbox(Group):
 
             if self.options["min_RPM"] > self.options["max_RPM"]:
                 raise Exception("The minimum RPM is greater than the maximum RPM")
-            
-            ### set up inputs
-            indeps = self.add_subsystem("indeps", IndepVarComp(), promotes = ["*"])
-            indeps.add_output("Motor_Density", input_file.Motor_Density, units = "kg / m**3", desc = "Volumetric Density of entire motor")
-            indeps.add_output("power", self.options["power"], units = "kW", desc = "Output power of motor in W")
-            indeps.add_output("HP_out", horsepower, units = "hp", desc = "Output power of motor in HP")
-            indeps.add_output("S_stress", input_file.S_stress, units = "Pa", desc = "Magnetic shear stress of motor")
-            indeps.add_output("P_factor", input_file.P_factor, desc = "Power factor of motor")
-            indeps.add_output("K_gearbox_metric", input_file.K_gearbox_metric, desc = "Technology level of gearbox")
-            indeps.add_output("prop_RPM", input_file.prop_RPM, units = "rpm", desc = "Prop RPM, slower gearbox speed")
-            indeps.add_output("motor_speed", self.options["max_RPM"], units = "rpm", desc = "Motor speed, the value that will be varied by the optimizer")
-            
-            ### create connections
-            self.add_subsystem("combined_motor_gb", MotorGearboxWeight(), promotes_inputs=["HP_out", "Motor_Density", "S_stress", "P_factor", "K_gearbox_metric", "motor_speed"])
-            self.add_subsystem("multiply", NumMotors(motors = 4, algorithm = "computation"), promotes_outputs = ["W_motor_gearbox"])
-            self.connect("power", "combined_motor_gb.P_out")
-            self.connect("prop_RPM", "combined_motor_gb.R_RPM")
-            self.connect("combined_motor_gb.wt", "multiply.combined_wt")
-        else:
-            raise Exception("You have specified an algorithm of %s, which does not exist" %(self.options["algorithm"]))
+
+        ### set up the inputs the backend declares
+        definitions = input_definitions(self.options)
+        indeps = self.add_subsystem("indeps", IndepVarComp(), promotes = ["*"])
+        for name in backend.inputs:
+            val, units, desc = definitions[name]
+            indeps.add_output(name, val * np.ones(self.options["vec_size"]), units = units, desc = desc)
+
+        ### create connections
+        connections = backend.factory(self)
+        if sorted(connections) != sorted(output_modes[backend.outputs]):
+            raise Exception("The %s algorithm declares %s outputs, so its factory must return sources for %s, not %s" %(backend.name, backend.outputs, output_modes[backend.outputs], sorted(connections)))
+        self.add_subsystem("multiply", NumMotors(motors = 4, outputs = backend.outputs, vec_size = self.options["vec_size"]), promotes_outputs = ["W_motor_gearbox"])
+        for name, source in connections.items():
+            self.connect(source, "multiply.%s" %name)
 
 
 ### Test Functions ### 
@@ -95,9 +177,9 @@ def test_motor_weight_reg():
 
     return(prob)
 
-def test_motor_weight_comp():
+def test_motor_weight_comp(alg = "computation", recorder = None): # recorder, e.g. a dep_recorder.ColumnRecorder, is attached to the driver
     prob = Problem()
-    prob.model = MotorGearbox(algorithm = "computation")
+    prob.model = MotorGearbox(algorithm = alg)
     wrn("The computational method used for motor weight estimation is still a work in progress and currently inaccurate", Warning)
     
     prob.model.add_design_var("motor_speed", lower = prob.model.options["min_RPM"], upper = prob.model.options["max_RPM"])
@@ -106,6 +188,8 @@ def test_motor_weight_comp():
     prob.driver = ScipyOptimizeDriver()
     prob.driver.options["maxiter"] = 20000
     prob.driver.options["optimizer"] = "COBYLA"
+    if recorder is not None:
+        prob.driver.add_recorder(recorder)
 
     prob.setup(check = False, force_alloc_complex = True)
 
@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+from openmdao.utils.assert_utils import assert_rel_error
+
+import dep_computational_sizing as sizing
+from dep_adaptive_map import refine_map, boundary_points, feasible_minimum
+
+class TestAdaptiveMap(unittest.TestCase):
+
+    def setUp(self):
+        self.result = refine_map(tol = (1e-4, 10.))
+
+    def test_boundaries(self):
+        result = self.result
+        self.assertTrue(result["evaluations"] < .02 * result["uniform_evaluations"])
+
+        D, n = boundary_points(result, "Tip_speed_max")
+        self.assertTrue(len(D) > 100)
+        assert_rel_error(self, D, sizing.max_ts * 60 / (np.pi * n), 1e-4)
+
+        D, n = boundary_points(result, "Thermal_AR_max")   # Thermal_AR is proportional to 1 / (n * D**3)
+        assert_rel_error(self, D, (sizing.design_point(1., n)["Thermal_AR"] / sizing.Thermal_AR_max)**(1 / 3.), 1e-4)
+
+    def test_minimum(self): # the weight falls with speed, so the lightest design is where the tip speed and thermal aspect ratio limits meet
+        best = feasible_minimum(self.result)
+        k = sizing.max_ts * 60 / np.pi
+        c = sizing.design_point(1., 1.)["Thermal_AR"]
+        n = np.sqrt(sizing.Thermal_AR_max * k**3 / c)
+
+        self.assertTrue(abs(best["n"] - n) < 2 * self.result["step"][1])
+        self.assertTrue(abs(best["D_out_s"] - k / n) < 2 * self.result["step"][0])
+        assert_rel_error(self, best["weight"], sizing.design_point(k / n, n)["Motor_tot_w_s"] + sizing.design_point(k / n, n)["Gearbox_w_kg"], 1e-3)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
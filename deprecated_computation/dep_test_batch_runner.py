@@ -0,0 +1,86 @@
+import os
+import io
+import csv
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from openmdao.utils.assert_utils import assert_rel_error
+
+from dep_batch_runner import main, run, pyarrow, evaluate_chunk
+
+designs = """power,motor_rpm,prop_RPM,K_gearbox_metric,num_motors,keywords
+500,20000,4000,32.688,4,
+500,20000,4000,32.688,8,Axial;Aero;OutRunner;LiquidCool
+250,15000,3000,32.688,4,Aero OutRunner
+750,10000,4000,40,2,Aero;OutRunner
+"""
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "designs.csv")
+        with open(self.path, "w") as f:
+            f.write(designs)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self, path):
+        with open(path) as f:
+            return(list(csv.DictReader(f)))
+
+    def test_csv(self):
+        output = os.path.join(self.directory, "results.csv")
+        self.assertEqual(main([self.path, "-o", output, "--chunk-size", "3"]), 4)
+        rows = self.read(output)
+
+        assert_rel_error(self, float(rows[0]["W_motor_gearbox"]), 467.3726002, 1e-4)
+        assert_rel_error(self, float(rows[1]["W_motor_gearbox"]), 2 * 467.3726002, 1e-4)
+        self.assertEqual(rows[2]["keywords"], "Aero;OutRunner")
+        assert_rel_error(self, float(rows[2]["W_motor_gearbox"]), float(rows[2]["num_motors"]) * (float(rows[2]["motor_wt"]) + float(rows[2]["gb_wt"])), 1e-12)
+
+        parallel = os.path.join(self.directory, "parallel.csv")
+        main([self.path, "-o", parallel, "--chunk-size", "1", "--jobs", "2"])
+        self.assertEqual(self.read(parallel), rows)
+
+    def test_computation(self):
+        output = io.StringIO()
+        with open(self.path) as source:
+            run(source, output, algorithm = "computation", chunk_size = 2)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+
+        assert_rel_error(self, float(rows[0]["W_motor_gearbox"]), 109.87302349, 1e-4)
+        assert_rel_error(self, float(rows[0]["motor_rpm"]), 20000., 1e-12)   # the optimum is at the upper speed limit
+
+    def test_blank_lines(self): # a chunk of only blank lines is skipped
+        with open(self.path, "a") as f:
+            f.write("\n\n")
+        output = os.path.join(self.directory, "results.csv")
+        self.assertEqual(main([self.path, "-o", output, "--chunk-size", "2"]), 4)
+        self.assertEqual(len(self.read(output)), 4)
+
+        header = designs.splitlines()[0].split(",")
+        self.assertEqual(len(evaluate_chunk(header, [])["power"]), 0)
+
+    def test_blank_cells(self): # blank and missing cells take the column default
+        header = designs.splitlines()[0].split(",")
+        chunk = evaluate_chunk(header, [["500", "20000", "", " ", "4", ""], ["500", "20000"]])
+
+        assert_rel_error(self, chunk["prop_RPM"], 4000. * np.ones(2), 1e-12)
+        assert_rel_error(self, chunk["num_motors"], [4., 4.], 1e-12)
+        assert_rel_error(self, chunk["W_motor_gearbox"], 467.3726002 * np.ones(2), 1e-4)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet(self):
+        output = os.path.join(self.directory, "results.parquet")
+        main([self.path, "-o", output, "--chunk-size", "3"])
+        table = pyarrow.parquet.read_table(output)
+
+        self.assertEqual(table.num_rows, 4)
+        assert_rel_error(self, table.column("W_motor_gearbox").to_pylist()[0], 467.3726002, 1e-4)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
+from openmdao.utils.coloring import dynamic_total_coloring
+
+import dep_batched_sizing as batched
+import dep_computational_sizing_component as component
+
+class TestBatchedSizing(unittest.TestCase):
+
+    def test_partials(self):
+        prob = component.test_motor_gearbox_weight(vec_size = 4)
+        prob["motor_speed"] = [5000., 10000., 15000., 20000.]
+        prob.run_model()
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+    def test_colored_totals(self):
+        for algorithm in ["computation", "regression"]:
+            plain = batched.batched_problem(6, algorithm, coloring = False)
+            colored = batched.batched_problem(6, algorithm)
+            for prob in [plain, colored]:
+                prob["motor_speed"] = np.linspace(5000., 20000., 6)
+                prob.run_model()
+            dynamic_total_coloring(colored.driver, run_model = False)
+            J_plain = plain.compute_totals()
+            J_colored = colored.compute_totals()
+            for key in J_plain:
+                np.testing.assert_allclose(J_colored[key], J_plain[key], rtol = 1e-12, atol = 1e-14)
+
+    def test_solves(self):
+        rows = batched.benchmark((1, 10, 50))
+        self.assertEqual([row["uncolored"]["solves"] for row in rows], [1, 10, 50])
+        self.assertEqual([row["colored"]["solves"] for row in rows[1:]], [2, 2])   # one forward solve for the designs, one reverse solve for the objective
+
+    def test_optimize(self):
+        prob = batched.test_batched_sizing(5)
+        single = batched.test_batched_sizing(1)
+        assert_rel_error(self, prob["W_motor_gearbox"], single["W_motor_gearbox"][0] * np.ones(5), 1e-5)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
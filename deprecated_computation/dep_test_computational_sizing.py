@@ -1,7 +1,13 @@
+import os
+import shutil
+import tempfile
 import unittest
+import numpy as np
 from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
 
-from computational_sizing import test_computational_weight
+from dep_computational_sizing import test_computational_weight
+import dep_computational_sizing
+from dep_computational_sizing import design_map, load_design_map
 
 class TestComputationalSizing(unittest.TestCase):
 
@@ -13,6 +19,34 @@ class TestComputationalSizing(unittest.TestCase):
         cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
         assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
 
+class TestDesignMap(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_map(self):
+        data = design_map()
+
+        assert_rel_error(self, data["Motor_tot_w_s"][4, :3], np.array([266.83492176, 213.46793741, 177.88994784]), 1e-6)
+        assert_rel_error(self, data["Thermal_AR"][4, :2], np.array([163.04632513, 130.4370601]), 1e-6)
+
+    def test_artifact(self):
+        path = os.path.join(self.cache_dir, "design_map.npz")
+        artifact = load_design_map(path)
+        np.testing.assert_allclose(artifact["Motor_tot_w_s"], design_map()["Motor_tot_w_s"], rtol = 1e-15)
+        saved = os.path.getmtime(path)
+        self.assertEqual(os.path.getmtime(load_design_map(path).path), saved)
+
+        S_stress = dep_computational_sizing.S_stress
+        try:
+            dep_computational_sizing.S_stress = 2 * S_stress   # changing an input makes the saved map stale, so it is recomputed
+            assert_rel_error(self, load_design_map(path)["Motor_tot_w_s"][4, 0], 266.83492176 / 2, 1e-6)
+        finally:
+            dep_computational_sizing.S_stress = S_stress
+
 if __name__ == "__main__":
 
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,66 @@
+import pickle
+import unittest
+from dataclasses import FrozenInstanceError
+from openmdao.api import Problem
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
+
+import dep_input_file as input_file
+from dep_config import SizingConfig, baseline
+from dep_region_sizing_component import RegionMotorGearboxWeight
+from dep_switch_sizing_method import MotorGearbox
+
+def run_region(config):
+    prob = Problem()
+    prob.model.add_subsystem("region", RegionMotorGearboxWeight(config = config), promotes = ["*"])
+    prob.setup(check = False, force_alloc_complex = True)
+    prob["motor_speed"] = 4000
+    prob["S_stress"] = config.S_stress
+    prob.run_model()
+
+    return(prob)
+
+class TestSizingConfig(unittest.TestCase):
+
+    def test_config(self):
+        assert_rel_error(self, baseline.Motor_Density, input_file.Motor_Density, 1e-15)
+        assert_rel_error(self, baseline.K_gearbox_metric, input_file.K_gearbox_metric, 1e-15)
+        self.assertEqual(baseline, SizingConfig())
+        self.assertEqual(hash(baseline), hash(SizingConfig()))
+        self.assertEqual(baseline.key, SizingConfig().key)
+        self.assertEqual(pickle.loads(pickle.dumps(baseline)).key, baseline.key)
+
+        lighter = baseline.replace(Perm_mag_w = 10.)
+        self.assertNotEqual(lighter, baseline)
+        self.assertNotEqual(lighter.key, baseline.key)
+        self.assertTrue(lighter.Motor_Density < baseline.Motor_Density)
+        self.assertEqual(len({baseline: 1, SizingConfig(): 2, lighter: 3}), 2)
+
+        with self.assertRaises(FrozenInstanceError):
+            baseline.S_stress = 1.
+
+    def test_region(self):
+        prob = run_region(baseline)
+        assert_rel_error(self, prob["motor_wt"], 266.83492176, 1e-6)
+
+        stronger = run_region(baseline.replace(S_stress = 2 * baseline.S_stress))
+        assert_rel_error(self, stronger["motor_wt"], 266.83492176 / 2, 1e-6)
+
+        cpd = stronger.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+    def test_groups(self): # two configurations sized side by side in one process
+        probs = []
+        for config in [baseline, baseline.replace(K_gearbox = 2 * baseline.K_gearbox)]:
+            prob = Problem()
+            prob.model = MotorGearbox(algorithm = "computation", config = config)
+            prob.setup(check = False)
+            probs.append(prob)
+        for prob in probs:
+            prob.run_model()
+
+        assert_rel_error(self, probs[1]["K_gearbox_metric"], 2 * probs[0]["K_gearbox_metric"], 1e-15)
+        self.assertTrue(probs[1]["W_motor_gearbox"] > probs[0]["W_motor_gearbox"])
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+import unittest
+from math import pi
+import numpy as np
+from openmdao.utils.assert_utils import assert_rel_error
+
+import dep_computational_sizing as sizing
+import dep_incremental_map as incremental
+
+class TestIncrementalMap(unittest.TestCase):
+
+    def test_baseline(self):
+        design = incremental.test_incremental_map().design_map()
+        full = sizing.design_map()
+        for name, values in full.items():
+            assert_rel_error(self, design[name], values, 1e-12)
+
+    def test_electrical_update(self):
+        design = incremental.test_incremental_map()
+        design.design_map()
+        self.assertEqual(design.update(P_out = 500., E = .9), ["gearbox_power", "volume"])
+        updated = design.design_map()
+        self.assertEqual(design.computed["geometry"], 1)
+        self.assertEqual(design.computed["volume"], 2)
+
+        Vol_s = 500.*60 * 1000/(pi**2*sizing.S_stress*sizing.n*.9*sizing.P_factor)
+        assert_rel_error(self, updated["L_active_s"], Vol_s/(sizing.D_ratio*sizing.D_out_s[:, np.newaxis])**2, 1e-12)
+        assert_rel_error(self, updated["L_ts_max"], Vol_s/(updated["D_ts_max"]*sizing.D_ratio)**2, 1e-12)
+        assert_rel_error(self, updated["Gearbox_w_kg"], sizing.K_gearbox*(500.*1.34102)**.76*sizing.n**.13/sizing.Fan_RPM**.89*0.4535, 1e-12)
+        fresh = incremental.IncrementalDesignMap(P_out = 500., E = .9).design_map()
+        for name, values in fresh.items():
+            assert_rel_error(self, updated[name], values, 1e-12)
+
+    def test_invalidation(self):
+        design = incremental.test_incremental_map()
+        design.design_map()
+        self.assertEqual(design.update(P_out = sizing.P_out), [])     # unchanged inputs drop nothing
+        self.assertEqual(design.update(pole_num = 10), ["geometry"])
+        assert_rel_error(self, design.design_map()["Thermal_AR"], sizing.design_map()["Thermal_AR"] / 2, 1e-12)
+        self.assertEqual(design.update(n = sizing.n[::2]), ["gearbox_speed", "geometry", "tip_speed"])
+        self.assertEqual(np.shape(design.design_map()["L_active_s"]), (len(sizing.D_out_s), len(sizing.n[::2])))
+        with self.assertRaises(Exception):
+            design.update(Fan_RPM = 3000)
+
+    def test_from_design_map(self): # a saved map is rescaled without recomputing its geometry
+        design = incremental.from_design_map(sizing.design_map())
+        updated = design.at(P_out = 500.)
+        self.assertEqual(design.computed["geometry"], 0)
+        fresh = incremental.IncrementalDesignMap(P_out = 500.).design_map()
+        for name, values in fresh.items():
+            assert_rel_error(self, updated[name], values, 1e-12)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from openmdao.api import Problem
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
+
+from dep_multistart import SizingDesignWeight, multistart, start_points, domain
+from dep_adaptive_map import refine_map, feasible_minimum
+
+class TestMultistart(unittest.TestCase):
+
+    def test_partials(self):
+        prob = Problem()
+        prob.model = SizingDesignWeight()
+        prob.setup(check = False, force_alloc_complex = True)
+        prob.run_model()
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+    def test_start_points(self):
+        starts = start_points(10, seed = 3)
+        for name, (lower, upper) in domain.items():
+            values = np.sort([start[name] for start in starts])
+            np.testing.assert_array_equal(np.floor((values - lower) / (upper - lower) * 10), np.arange(10))   # one start in every stratum
+
+    def test_multistart(self):
+        result = multistart(8, jobs = 1)
+        best = result["best"]
+        self.assertTrue(min(best["margins"].values()) >= -1e-6)
+        self.assertEqual(best["design"]["pole_num"] % 2, 0)
+        self.assertEqual(sum(optimum["starts"] for optimum in result["optima"]) + result["failed"], 8)
+        self.assertEqual([optimum["wt"] for optimum in result["optima"]], sorted(optimum["wt"] for optimum in result["optima"]))
+
+        # the diameter and length are free, so the multi-start optimum is no heavier than the lightest feasible point of the map at 20 poles
+        self.assertTrue(best["wt"] <= feasible_minimum(refine_map())["weight"] * (1 + 1e-6))
+
+        pooled = multistart(8, jobs = 2)
+        assert_rel_error(self, pooled["best"]["wt"], best["wt"], 1e-10)
+        self.assertEqual([optimum["active"] for optimum in pooled["optima"]], [optimum["active"] for optimum in result["optima"]])
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,25 @@
+import unittest
+import numpy as np
+
+from dep_pareto import test_pareto, pareto_front
+
+class TestPareto(unittest.TestCase):
+
+    def test_weight_speed(self):
+        front, speed, weight = test_pareto()
+
+        self.assertEqual(np.size(front), 813)
+        self.assertTrue(np.all(np.pi * 0.3 * speed[front] / 60 <= 280.))
+        self.assertTrue(np.all(np.diff(weight[front]) < 0))
+
+    def test_k_objectives(self):
+        objectives = np.random.RandomState(0).rand(500, 3)
+        front = pareto_front(objectives, maximize = [False, False, True])
+
+        flipped = objectives * [1, 1, -1]
+        expected = [i for i in range(500) if not np.any(np.all(flipped <= flipped[i], axis = 1) & np.any(flipped < flipped[i], axis = 1))]
+        self.assertEqual(list(front), expected)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from openmdao.utils.assert_utils import assert_rel_error
+
+import dep_computational_sizing as sizing
+from dep_recorder import ColumnRecorder, load_cases, pyarrow
+
+class TestColumnRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_columns(self):
+        recorder = ColumnRecorder(["motor_speed", "combined_weight.wt"], capacity = 4)   # small, so that the columns grow during the run
+        prob = sizing.test_computational_weight(recorder)
+        prob.cleanup()
+
+        speed = recorder["motor_speed"]
+        self.assertTrue(len(speed) > 4)
+        self.assertTrue(np.shares_memory(speed, recorder.columns["motor_speed"]))
+        self.assertEqual(len(recorder["combined_weight.wt"]), len(speed))
+        np.testing.assert_array_equal(recorder["counter"], np.arange(1, len(speed) + 1))
+        assert_rel_error(self, speed[-1], prob["motor_speed"][0], 1e-6)
+        assert_rel_error(self, recorder["combined_weight.wt"][-1], prob["combined_weight.wt"][0], 1e-6)
+
+    def test_unknown_variable(self):
+        with self.assertRaises(Exception):
+            sizing.test_computational_weight(ColumnRecorder(["not_a_variable"]))
+
+    def test_npz(self):
+        path = os.path.join(self.directory, "cases.npz")
+        recorder = ColumnRecorder(["motor_speed", "combined_weight.wt"], path)
+        sizing.test_computational_weight(recorder).cleanup()
+
+        cases = load_cases(path)
+        np.testing.assert_array_equal(cases["motor_speed"], recorder["motor_speed"])
+        np.testing.assert_array_equal(cases["combined_weight.wt"], recorder["combined_weight.wt"])
+
+    def test_blocks(self):
+        path = os.path.join(self.directory, "cases.npz")
+        memory = ColumnRecorder(["motor_speed"])
+        sizing.test_computational_weight(memory).cleanup()
+        recorder = ColumnRecorder(["motor_speed"], path, block_size = 8)
+        sizing.test_computational_weight(recorder).cleanup()
+
+        self.assertEqual(recorder.blocks, int(np.ceil(len(memory["motor_speed"]) / 8.)))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "cases.part0000.npz")))
+        cases = load_cases(path)
+        np.testing.assert_array_equal(cases["motor_speed"], memory["motor_speed"])
+        np.testing.assert_array_equal(cases["counter"], memory["counter"])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet(self):
+        path = os.path.join(self.directory, "cases.parquet")
+        recorder = ColumnRecorder(["motor_speed"], path, block_size = 8)
+        sizing.test_computational_weight(recorder).cleanup()
+
+        cases = load_cases(path)
+        self.assertEqual(len(cases["motor_speed"]), recorder.flushed)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,20 @@
+import unittest
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
+
+from dep_region_sizing_component import test_region_weight
+
+class TestRegionMotorGearboxWeight(unittest.TestCase):
+
+    def test1(self):
+        prob = test_region_weight()
+
+        assert_rel_error(self, prob["motor_wt"], 266.83492176, 1e-4)
+        assert_rel_error(self, prob["wt"], 281.08028572, 1e-4)
+        assert_rel_error(self, prob["thermal_AR"], 20.92994448, 1e-4)
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from dep_report import build_report, chart_jobs, map_figures
+
+class TestReport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.keyword_sets = [["Axial"], ["Aero", "OutRunner"]]
+        self.powers = [250., 1000.]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def check_report(self, output_dir, formats):
+        index = build_report(output_dir, self.keyword_sets, self.powers, formats = formats, jobs = self.jobs, artifact_dir = os.path.join(self.directory, "artifacts"))
+        with open(index) as f:
+            page = f.read()
+
+        jobs = chart_jobs(output_dir, None, self.keyword_sets, self.powers, formats = formats)
+        self.assertEqual(len(jobs), len(self.keyword_sets) * len(self.powers) + len(map_figures) * len(self.powers))
+        for job in jobs:
+            for extension in formats:
+                name = "%s.%s" %(job["name"], extension)
+                self.assertTrue(os.path.getsize(os.path.join(output_dir, name)) > 0)
+                self.assertIn("href=\"%s\"" %name, page)
+            with open(os.path.join(output_dir, job["name"] + ".png"), "rb") as f:
+                self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+
+    def test_serial(self):
+        self.jobs = 1
+        self.check_report(os.path.join(self.directory, "serial"), ["png", "svg"])
+
+    def test_pool(self):
+        self.jobs = 2
+        self.check_report(os.path.join(self.directory, "pool"), ["png"])
+
+    def test_format(self):
+        with self.assertRaises(Exception):
+            build_report(self.directory, self.keyword_sets, self.powers, formats = ["pdf"])
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+from openmdao.utils.assert_utils import assert_rel_error
+
+from dep_screening import test_screening, ScreeningPipeline, computation_stage, concatenate
+
+class TestScreening(unittest.TestCase):
+
+    def test_pipeline(self):
+        pipeline, survivors = test_screening()
+        regression, computation = pipeline.report()
+
+        self.assertEqual(regression["evaluated"], 20000)
+        self.assertEqual(regression["kept"] + regression["dropped"], 20000)
+        self.assertEqual(computation["evaluated"], regression["kept"])
+        self.assertEqual(computation["kept"], 10)
+        self.assertTrue(np.all(np.diff(survivors["W_computation"]) >= 0))
+
+    def test_computation_stage(self):
+        pipeline = ScreeningPipeline([computation_stage()])
+        survivors = concatenate(list(pipeline.run([{"power": 500., "motor_rpm": 20000., "prop_RPM": 4000., "K_gearbox_metric": 32.688, "num_motors": 4}])))
+
+        assert_rel_error(self, survivors["motor_speed"], 20000., 1e-8)
+        assert_rel_error(self, survivors["W_computation"], 109.87302349, 1e-4)
+
+    def test_no_survivors(self):
+        pipeline = ScreeningPipeline([computation_stage(max_score = 0.)])
+        with self.assertRaises(Exception) as error:
+            concatenate(list(pipeline.run([{"power": 500., "motor_rpm": 20000., "prop_RPM": 4000., "K_gearbox_metric": 32.688, "num_motors": 4}])))
+        self.assertIn("No candidates survived", str(error.exception))
+
+        with self.assertRaises(Exception) as error:
+            pipeline.run([])
+        self.assertNotIsInstance(error.exception, StopIteration)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
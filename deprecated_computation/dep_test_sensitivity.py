@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+from collections import OrderedDict
+from openmdao.utils.assert_utils import assert_rel_error
+
+from dep_sensitivity import sobol_indices, assembly_weight, default_bounds
+
+def uniform_moments(lower, upper):
+    return((lower + upper) / 2., (upper - lower)**2 / 12.)
+
+def integer_uniform_moments(lower, upper):
+    return((lower + upper) / 2., ((upper - lower + 1)**2 - 1) / 12.)
+
+class TestSensitivity(unittest.TestCase):
+
+    def test_product(self): # only num_motors and Motor_Density vary, so the weight is the product of two independent uniform variables with known indices
+        bounds = OrderedDict((name, (np.mean(bound),) * 2) for name, bound in default_bounds.items())
+        bounds["num_motors"] = (2., 8.)
+        bounds["Motor_Density"] = (2000., 4000.)
+        fixed = dict((name, np.array([bound[0]])) for name, bound in bounds.items())
+        low = assembly_weight(dict(fixed, Motor_Density = np.array([2000.]), num_motors = np.array([1.])), "computation")[0]
+        high = assembly_weight(dict(fixed, Motor_Density = np.array([4000.]), num_motors = np.array([1.])), "computation")[0]
+
+        mean_n, var_n = integer_uniform_moments(2, 8)   # num_motors is an integer input
+        mean_w, var_w = uniform_moments(low, high)   # the weight of one motor is linear in Motor_Density
+        variance = (var_n + mean_n**2) * (var_w + mean_w**2) - (mean_n * mean_w)**2
+        S1 = {"num_motors": var_n * mean_w**2 / variance, "Motor_Density": var_w * mean_n**2 / variance}
+        ST = {"num_motors": var_n * (var_w + mean_w**2) / variance, "Motor_Density": var_w * (var_n + mean_n**2) / variance}
+
+        result = sobol_indices(200000, bounds, "computation")
+        for name in ["num_motors", "Motor_Density"]:
+            index = result["indices"][name]
+            self.assertTrue(abs(index["S1"] - S1[name]) < max(2 * index["S1_conf"], 1e-3))
+            self.assertTrue(abs(index["ST"] - ST[name]) < max(2 * index["ST_conf"], 1e-3))
+        assert_rel_error(self, result["indices"]["power"]["ST"], 0., 1e-12)
+        assert_rel_error(self, result["variance"], variance, 1e-2)
+
+    def test_parallel(self): # the chunks are seeded independently of the process that runs them
+        serial = sobol_indices(20000, chunk_size = 5000)
+        parallel = sobol_indices(20000, chunk_size = 5000, jobs = 2)
+        self.assertEqual(serial["evaluations"], 10 * 20000)
+        for name in default_bounds:
+            assert_rel_error(self, parallel["indices"][name]["ST"], serial["indices"][name]["ST"], 1e-10)
+
+        # with the regression motor weight, the motor properties have no effect
+        for name in ["S_stress", "P_factor", "Motor_Density"]:
+            self.assertEqual(serial["indices"][name]["ST"], 0.)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
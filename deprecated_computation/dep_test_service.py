@@ -0,0 +1,110 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from openmdao.utils.assert_utils import assert_rel_error
+
+from dep_service import SizingService, Batcher, Metrics, request, request_fields
+from dep_service_load import run_load, random_designs
+
+class TestSizingService(unittest.TestCase):
+
+    def test_tcp(self):
+        async def run():
+            service = SizingService(window = .01)
+            server = await service.start(port = 0)
+            address = server.sockets[0].getsockname()[:2]
+            try:
+                designs = [{}, {"algorithm": "computation"}] * 8
+                responses = await asyncio.gather(*[request(address, "POST", "/size", design) for design in designs])
+                bad_keyword = await request(address, "POST", "/size", {"keywords": ["NotAKeyword"]})
+                bad_path = await request(address, "GET", "/size")
+                metrics = (await request(address))[1]
+                for response in responses + [bad_keyword, bad_path]:
+                    response[2][1].close()
+            finally:
+                server.close()
+                await server.wait_closed()
+
+            return(responses, bad_keyword, bad_path, metrics)
+
+        responses, bad_keyword, bad_path, metrics = asyncio.run(run())
+
+        assert_rel_error(self, responses[0][1]["W_motor_gearbox"], 467.3726002, 1e-4)
+        assert_rel_error(self, responses[1][1]["W_motor_gearbox"], 109.87302349, 1e-4)
+        self.assertEqual(bad_keyword[0], 400)
+        self.assertEqual(bad_path[0], 404)
+        self.assertEqual(metrics["requests"], 17)
+        self.assertEqual(metrics["errors"], 1)
+        self.assertEqual(metrics["batches"], 2)   # one batch per warm model
+        self.assertEqual(metrics["batch_size_max"], 8)
+
+    def test_bad_requests(self):
+        async def run():
+            service = SizingService(window = .01)
+            server = await service.start(port = 0)
+            address = server.sockets[0].getsockname()[:2]
+            try:
+                designs = [{}, {"power": "abc"}, {"num_motors": None}, {"power": 250.}, {"keywords": "Axial"}, {"algorithm": "lookup"}]
+                responses = await asyncio.wait_for(asyncio.gather(*[request(address, "POST", "/size", design) for design in designs]), 5.)
+                for response in responses:
+                    response[2][1].close()
+            finally:
+                server.close()
+                await server.wait_closed()
+
+            return(responses)
+
+        responses = asyncio.run(run())
+
+        self.assertEqual([response[0] for response in responses], [200, 400, 400, 200, 400, 400])
+        self.assertIn("power", responses[1][1]["error"])
+        assert_rel_error(self, responses[0][1]["W_motor_gearbox"], 467.3726002, 1e-4)
+
+    def test_server_error(self): # an error that is not the request's fault is answered with a 500
+        class FailingModel(object):
+            def evaluate(self, batch):
+                raise Exception("evaluation failed")
+
+        service = SizingService(window = .01)
+        service.batcher = lambda keywords, algorithm: Batcher(FailingModel(), service.metrics, service.window)
+        status, payload = asyncio.run(service.respond("POST", "/size", b"{}"))
+        self.assertEqual(status, 500)
+        self.assertEqual(payload["error"], "evaluation failed")
+        self.assertEqual(asyncio.run(service.respond("POST", "/size", b"{power"))[0], 400)
+        self.assertEqual(service.metrics.errors, 2)
+
+    def test_failed_batch(self): # an error while a batch is evaluated reaches every request of the batch
+        class FailingModel(object):
+            def evaluate(self, batch):
+                raise Exception("evaluation failed")
+
+        async def run():
+            batcher = Batcher(FailingModel(), Metrics(), window = .01)
+            futures = [batcher.submit(dict(request_fields)) for i in range(3)]
+            return(await asyncio.wait_for(asyncio.gather(*futures, return_exceptions = True), 5.))
+
+        for result in asyncio.run(run()):
+            self.assertEqual(str(result), "evaluation failed")
+
+    def test_load(self):
+        async def run():
+            address = os.path.join(tempfile.mkdtemp(), "sizing.sock")
+            server = await SizingService().start(unix = address)
+            try:
+                return(await run_load(address, random_designs(500), concurrency = 32))
+            finally:
+                server.close()
+                await server.wait_closed()
+                os.remove(address)
+
+        stats = asyncio.run(run())
+
+        self.assertEqual(stats["errors"], 0)
+        self.assertEqual(stats["server"]["requests"], 500)
+        self.assertTrue(stats["server"]["batches"] < 500)
+        self.assertTrue(stats["latency_p99_ms"] >= stats["latency_p50_ms"])
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
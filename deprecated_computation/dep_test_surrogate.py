@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from openmdao.utils.assert_utils import assert_rel_error
+
+import dep_surrogate as surrogate
+import dep_computational_sizing_component as component
+from dep_surrogate import test_surrogate_weight
+
+class TestSurrogate(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test1(self):
+        prob = test_surrogate_weight(self.cache_dir)
+
+        assert_rel_error(self, prob["wt"], 32.78720486, 1e-4)
+        assert_rel_error(self, prob["extrapolation"], 0., 1e-15)
+        self.assertTrue(prob["wt_rmse"] < 1e-2)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        cached = test_surrogate_weight(self.cache_dir)
+        assert_rel_error(self, cached["wt"], prob["wt"], 1e-12)
+
+        cpd = prob.check_partials(out_stream = None, method = "fd", form = "central", step = 1.)
+        assert_rel_error(self, cpd["surrogate"]["wt", "motor_speed"]["J_fwd"], cpd["surrogate"]["wt", "motor_speed"]["J_fd"], 1e-6)
+
+    def test_extrapolation(self):
+        prob = test_surrogate_weight()
+
+        prob["motor_speed"] = 24750
+        prob.run_model()
+        assert_rel_error(self, prob["extrapolation"], .25, 1e-8)
+
+    def test_key(self): # the key changes with the weight formula, which is a function outside MotorGearboxWeight
+        key = surrogate.surrogate_key({"motor_speed": (1000., 20000.)}, {}, 40, "kriging", 0)
+        source = surrogate.inspect.getsource
+        with mock.patch.object(surrogate.inspect, "getsource", lambda obj: source(obj).replace("def motor_gearbox_weight", "def motor_gearbox_weight_v2") if obj is component else source(obj)):
+            self.assertNotEqual(surrogate.surrogate_key({"motor_speed": (1000., 20000.)}, {}, 40, "kriging", 0), key)
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
@@ -1,7 +1,10 @@
 import unittest
 from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
 
-from switch_sizing_method import test_motor_weight_reg, test_motor_weight_comp
+from dep_switch_sizing_method import test_motor_weight_reg, test_motor_weight_comp, backend_names, register_backend, backends, MotorGearbox
+from openmdao.api import Problem
+from w_motor_reg import Regression
+from w_gearbox import GearboxWeight
 
 class TestSwitchSizingMethod(unittest.TestCase):
 
@@ -25,6 +28,69 @@ class TestSwitchSizingMethod(unittest.TestCase):
         cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
         assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
 
+    def test_surrogate(self):
+        prob = test_motor_weight_comp("surrogate")
+
+        assert_rel_error(self, prob["combined_motor_gb.wt"], 27.46825587, 1e-4)
+        assert_rel_error(self, prob["W_motor_gearbox"], 109.87302349, 1e-4)
+
+    def test_region(self):
+        prob = test_motor_weight_comp("region")
+
+        assert_rel_error(self, prob["combined_motor_gb.wt"], 37.0529692, 1e-4)
+        assert_rel_error(self, prob["W_motor_gearbox"], 148.21187678, 1e-4)
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+    def test_registry(self):
+        self.assertEqual(backend_names(max_cost = "cheap"), ["regression", "surrogate"])
+        self.assertEqual(backend_names(), ["regression", "surrogate", "computation", "region"])
+
+        @register_backend("aero_motor", ["power", "HP_out", "K_gearbox_metric", "prop_RPM", "motor_speed"], "split", cost = "cheap")
+        def aero_motor(group): # regression of the Aero motors with a single stage gearbox, a split backend with its own component names
+            group.add_subsystem("aero", Regression(keywords = ["Aero"]), promotes_inputs = ["power"])
+            group.add_subsystem("reduction", GearboxWeight(), promotes_inputs = ["HP_out", "K_gearbox_metric", "motor_speed"])
+            group.connect("prop_RPM", "reduction.R_RPM")
+            return({"motor_wt": "aero.wt", "gb_wt": "reduction.wt"})
+
+        @register_backend("mislabeled", ["power", "HP_out", "K_gearbox_metric", "prop_RPM", "motor_speed"], "combined", cost = "cheap")
+        def mislabeled(group): # declares combined outputs but returns split ones
+            return(backends["regression"].factory(group))
+
+        try:
+            prob = Problem()
+            prob.model = MotorGearbox(algorithm = "aero_motor")
+            prob.setup(check = False)
+            prob.run_model()
+            assert_rel_error(self, prob["W_motor_gearbox"], 4 * (101.67467209 + 10.36947702), 1e-4)
+
+            prob = Problem()
+            prob.model = MotorGearbox(algorithm = "mislabeled")
+            self.assertRaises(Exception, prob.setup)
+        finally:
+            del backends["aero_motor"]
+            del backends["mislabeled"]
+
+        self.assertRaises(Exception, register_backend, "bad", ["power"], "split", cost = "free")
+        self.assertRaises(Exception, register_backend, "bad", ["power"], "separate")
+
+    def test_multistage_gearbox(self):
+        prob = Problem()
+        prob.model = MotorGearbox(gearbox_stages = [1, 2, 3, 4])
+        prob.setup(check = False, force_alloc_complex = True)
+        prob.run_model()
+
+        assert_rel_error(self, prob["gearbox.wt"], 10.36947702, 1e-4)   # one stage is the lightest at a ratio of 5
+        assert_rel_error(self, prob["W_motor_gearbox"], 467.3726002, 1e-4)
+
+        cpd = prob.check_partials(compact_print = True, show_only_incorrect = True, method = "cs")
+        assert_check_partials(cpd, atol = 1e-6, rtol = 1e-6)
+
+        prob = Problem()
+        prob.model = MotorGearbox(algorithm = "computation", gearbox_stages = [1, 2])
+        self.assertRaises(Exception, prob.setup)
+
 if __name__ == "__main__":
 
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from openmdao.utils.assert_utils import assert_rel_error
+
+import dep_input_file as input_file
+import dep_computational_sizing as sizing
+import dep_topologies as topologies
+from dep_incremental_map import IncrementalDesignMap
+from w_motor_reg import regression_coefficients, catalog
+from w_gearbox import gearbox_weight
+
+class TestTopologies(unittest.TestCase):
+
+    def test_poles(self):
+        result = topologies.pole_topologies(500., [8, 20, 40])
+        design = IncrementalDesignMap(P_out = 500.)
+        for i, pole_num in enumerate([8, 20, 40]):   # one map per pole count
+            point = design.at(pole_num = pole_num)
+            point["Tip_speed"] = np.pi * point["D_out_s"][:, np.newaxis] * point["n"] / 60
+            feasible = np.all([margin >= 0 for margin in sizing.design_margins(point).values()], axis = 0)
+            weight = point["Motor_tot_w_s"] + point["Gearbox_w_kg"]
+            self.assertEqual(result["feasible"][i], np.any(feasible))
+            if np.any(feasible):
+                assert_rel_error(self, result["wt"][i], np.min(weight[feasible]), 1e-12)
+                self.assertTrue(result["Thermal_AR"][i] <= sizing.Thermal_AR_max)
+        self.assertFalse(result["feasible"][2])
+        self.assertTrue(np.isnan(result["wt"][2]))
+
+    def test_keywords(self):
+        result = topologies.keyword_topology_weights(100., extrapolate = True)
+        self.assertEqual(len(result["keywords"]), 8)
+        for i, keywords in enumerate(result["keywords"]):   # one regression per topology
+            mask = catalog.keyword_mask(keywords)
+            if np.sum(mask) < 2:
+                self.assertFalse(result["realizable"][i])
+                continue
+            slope, intercept = regression_coefficients(keywords)
+            speeds = sizing.n[sizing.n <= np.max(catalog.columns["rpm_max"][mask])]
+            weight = slope * 100. + intercept + gearbox_weight(134.102, input_file.K_gearbox_metric, input_file.prop_RPM, speeds)
+            assert_rel_error(self, result["wt"][i], np.min(weight), 1e-10)
+
+        limited = topologies.keyword_topology_weights(500.)
+        np.testing.assert_array_equal(limited["feasible"], limited["realizable"] & (limited["max_power"] >= 500.))
+
+    def test_enumerate(self):
+        result = topologies.test_topologies()
+        self.assertEqual(len(result["poles"]["pole_num"]), 19)
+        self.assertTrue(np.any(result["poles"]["feasible"]))
+        self.assertTrue(np.any(result["keywords"]["feasible"]))
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+from openmdao.utils.assert_utils import assert_rel_error
+
+import dep_input_file as input_file
+from w_motor_reg import filter_data, regression_coefficients
+from dep_uncertainty import propagate, sample_weights, bootstrap_coefficients, StreamingStats, fixed
+
+class TestUncertainty(unittest.TestCase):
+
+    def test_point_values(self): # without spread the samples reproduce the MotorGearbox weights
+        regression = propagate(1000, "regression", uncertainty = {}, bootstrap = False)
+        assert_rel_error(self, regression["percentiles"][50], 467.3726002, 1e-6)
+        self.assertTrue(regression["std"] < 1e-9)
+
+        computation = propagate(1000, "computation", uncertainty = {"P_factor": fixed(input_file.P_factor)})
+        assert_rel_error(self, computation["mean"], 109.87302349, 1e-4)
+
+    def test_bootstrap(self):
+        power, weight = filter_data(input_file.keywords)[:2]
+        coefficients = bootstrap_coefficients(power, weight, 20000, np.random.RandomState(0))
+        self.assertEqual(coefficients.shape, (20000, 2))
+        self.assertTrue(np.all(np.isfinite(coefficients)))
+        assert_rel_error(self, np.median(coefficients, axis = 0), regression_coefficients(input_file.keywords), .2)
+
+    def test_streaming(self):
+        weights = sample_weights(100000, np.random.RandomState(1), motor_data = filter_data(input_file.keywords))[0]
+        stats = StreamingStats()
+        for chunk in np.array_split(weights, 17):
+            stats.update(chunk)
+        merged = StreamingStats()
+        merged.update(weights[:500])
+        rest = StreamingStats()
+        rest.update(weights[500:])
+        merged.merge(rest)
+
+        q = [5, 50, 95]
+        bin_width = (stats.upper - stats.lower) / stats.bins
+        for result in [stats, merged]:
+            self.assertEqual(result.count, 100000)
+            assert_rel_error(self, result.mean, np.mean(weights), 1e-12)
+            assert_rel_error(self, result.std, np.std(weights, ddof = 1), 1e-10)
+            self.assertTrue(np.all(np.abs(result.percentile(q) - np.percentile(weights, q)) < 4 * bin_width))
+
+    def test_chunks(self): # the statistics do not depend on the chunk size beyond the histogram resolution
+        small = propagate(50000, "computation", chunk_size = 1000)
+        large = propagate(50000, "computation", chunk_size = 50000)
+        assert_rel_error(self, small["percentiles"][50], large["percentiles"][50], 1e-2)
+        self.assertTrue(small["percentiles"][5] < small["percentiles"][50] < small["percentiles"][95])
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+import unittest
+from openmdao.api import ExplicitComponent
+from w_gearbox import GearboxWeight
+
+import dep_verify_partials
+from dep_verify_partials import register_check, verify_partials, check_component
+
+class WrongPartials(ExplicitComponent):
+
+    def setup(self):
+        self.add_input("x", val = 2.)
+        self.add_output("y")
+        self.declare_partials("y", "x")
+
+    def compute(self, inputs, outputs):
+        outputs["y"] = inputs["x"]**2
+
+    def compute_partials(self, inputs, J):
+        J["y", "x"] = inputs["x"]
+
+class TestVerifyPartials(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        dep_verify_partials.checks.pop("wrong", None)
+        dep_verify_partials.checks.pop("slow_gearbox", None)
+
+    def test_registered(self):
+        results = verify_partials(cache_dir = self.cache_dir)
+        for result in results:
+            self.assertTrue(result["passed"], result)
+            self.assertFalse(result["skipped"])
+
+        results = verify_partials(cache_dir = self.cache_dir)   # nothing changed, so every check is skipped
+        self.assertTrue(all(result["skipped"] and result["passed"] for result in results))
+
+    def test_wrong_partials(self):
+        register_check("wrong")(lambda: (WrongPartials(), {"x": 3.}))
+        result = verify_partials(["wrong"], cache_dir = self.cache_dir)[0]
+        self.assertFalse(result["passed"])
+        self.assertEqual(result["worst"], ("y", "x"))
+        self.assertFalse(verify_partials(["wrong"], cache_dir = self.cache_dir)[0]["skipped"])   # failed checks are not cached
+
+    def test_parallel(self):
+        names = ["gearbox", "mission_sizing", "region"]
+        serial = verify_partials(names)
+        parallel = verify_partials(names, jobs = 2)
+        for a, b in zip(serial, parallel):
+            self.assertEqual((a["key"], a["max_abs"], a["passed"]), (b["key"], b["max_abs"], b["passed"]))
+
+    def test_key(self): # the key changes with the check point
+        a = check_component("gearbox")["key"]
+        self.assertEqual(a, check_component("gearbox")["key"])
+        register_check("slow_gearbox")(lambda: (GearboxWeight(), {"HP_out": 670.51, "R_RPM": 4000., "motor_speed": 10000.}))
+        self.assertNotEqual(a, check_component("slow_gearbox")["key"])
+
+if __name__ == "__main__":
+
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+from math import pi
+from itertools import product
+import numpy as np
+import dep_input_file as input_file
+import dep_computational_sizing as sizing
+from dep_incremental_map import IncrementalDesignMap
+from w_motor_reg import catalog, fit_keyword_sets
+from w_gearbox import gearbox_weight
+from regression_fits import evaluate
+
+### Discrete topology enumeration. Every topology is one entry of a leading topology axis, and the whole (topologies, diameters, speeds) or
+### (topologies, speeds) grid is evaluated and reduced to the lightest feasible design of every topology in one broadcast pass, instead of one model
+### per discrete choice.
+###   pole counts  computational map of dep_computational_sizing.py. The pole count only enters the thermal aspect ratio, which is proportional to it,
+###                so the map is computed once (see dep_incremental_map.py) and broadcast against the pole counts
+###   keywords     rotor (InRunner / OutRunner) x flux (Axial / Radial) x cooling (AirCool / LiquidCool) motor regressions, all fitted in one batched
+###                solve (see w_motor_reg.fit_keyword_sets). A topology is realizable when the catalog has enough of its motors to fit, and a design
+###                is feasible when its power and speed are within the pwr_max and rpm_max of those motors (the power check is skipped with extrapolate)
+### Example: python dep_topologies.py
+
+rotor_types = ["InRunner", "OutRunner"]
+flux_types = ["Axial", "Radial"]
+cooling_types = ["AirCool", "LiquidCool"]
+keyword_topologies = [list(topology) for topology in product(rotor_types, flux_types, cooling_types)]
+
+def _lightest(weight, feasible): # index of the lightest feasible entry of every topology (leading axis) over the other axes, and whether there is one
+    masked = np.where(feasible, weight, np.inf).reshape(len(weight), -1)
+    best = np.argmin(masked, axis = 1)
+
+    return(best, np.isfinite(masked[np.arange(len(best)), best]))
+
+def pole_topologies(power = sizing.P_out, poles = np.arange(4, 42, 2), n = sizing.n, D_out_s = sizing.D_out_s): # lightest feasible map design of every pole count, one entry per pole count, nan where none is feasible
+    poles = np.asarray(poles, dtype = float)
+    design = IncrementalDesignMap(n, D_out_s, P_out = power).design_map()
+    D, n = design["D_out_s"][:, np.newaxis], design["n"]
+    point = {"Tip_speed": pi*D*n/60, "Thermal_AR": design["Thermal_AR"] * (poles / sizing.pole_num)[:, np.newaxis, np.newaxis], "L_D_AR": design["L_D_AR"]}
+    feasible = np.ones((len(poles),) + np.shape(design["L_active_s"]), dtype = bool)
+    for margin in sizing.design_margins(point).values():
+        feasible &= margin >= 0     # (poles, diameters, speeds)
+
+    motor = design["Motor_tot_w_s"]
+    gearbox = np.broadcast_to(design["Gearbox_w_kg"], np.shape(motor))
+    weight = np.broadcast_to(motor + gearbox, feasible.shape)
+    best, found = _lightest(weight, feasible)
+    row, column = np.unravel_index(best, np.shape(motor))
+
+    def pick(values):
+        return(np.where(found, values, np.nan))
+
+    return({"pole_num": poles, "feasible": found, "wt": pick((motor + gearbox)[row, column]), "motor_wt": pick(motor[row, column]), "gearbox_wt": pick(gearbox[row, column]),
+            "D_out_s": pick(design["D_out_s"][row]), "motor_speed": pick(design["n"][column]), "L_active_s": pick(design["L_active_s"][row, column]),
+            "Thermal_AR": pick(point["Thermal_AR"][np.arange(len(poles)), row, column])})
+
+def keyword_topology_weights(power = 500., topologies = keyword_topologies, n = sizing.n, model = "linear", extrapolate = False,
+                             K_gearbox_metric = input_file.K_gearbox_metric, prop_RPM = input_file.prop_RPM): # lightest feasible regression motor + gearbox of every keyword topology, nan where none is feasible
+    n = np.asarray(n, dtype = float)
+    fits = fit_keyword_sets(topologies, (model,))[model]
+    coefficients = fits["coefficients"]                                        # (topologies, parameters)
+    masks = np.array([catalog.keyword_mask(topology) for topology in topologies])
+    realizable = ~np.any(np.isnan(coefficients), axis = 1)
+    max_power = np.max(np.where(masks, catalog.columns["pwr_max"], -np.inf), axis = 1)
+    max_speed = np.max(np.where(masks, catalog.columns["rpm_max"], -np.inf), axis = 1)
+
+    motor = evaluate(model, coefficients.T, power)                             # (topologies,)
+    gearbox = gearbox_weight(power * 1.34102, K_gearbox_metric, prop_RPM, n)   # (speeds,)
+    feasible = (realizable & (extrapolate | (power <= max_power)))[:, np.newaxis] & (n <= max_speed[:, np.newaxis])   # (topologies, speeds)
+    weight = motor[:, np.newaxis] + gearbox
+    best, found = _lightest(weight, feasible)
+
+    def pick(values):
+        return(np.where(found, values, np.nan))
+
+    return({"keywords": [list(topology) for topology in topologies], "realizable": realizable, "motors": fits["stats"]["count"], "feasible": found,
+            "wt": pick(weight[np.arange(len(best)), best]), "motor_wt": pick(motor), "gearbox_wt": pick(gearbox[best]), "motor_speed": pick(n[best]),
+            "max_power": np.where(realizable, max_power, np.nan), "max_speed": np.where(realizable, max_speed, np.nan)})
+
+def enumerate_topologies(power = 500., poles = np.arange(4, 42, 2), topologies = keyword_topologies, n = sizing.n, D_out_s = sizing.D_out_s, model = "linear", extrapolate = False): # the lightest feasible design of every pole count and of every keyword topology at one power in kW
+    return({"poles": pole_topologies(power, poles, n, D_out_s), "keywords": keyword_topology_weights(power, topologies, n, model, extrapolate)})
+
+def test_topologies():
+    return(enumerate_topologies())
+
+if __name__ == "__main__":
+
+    result = test_topologies()
+    poles = result["poles"]
+    print("Computational map, lightest feasible design of every pole count")
+    for i, pole_num in enumerate(poles["pole_num"]):
+        if poles["feasible"][i]:
+            print("%4d poles  %8.3f kg  D_out = %.3f m  %6.0f RPM  L = %.3f m" %(pole_num, poles["wt"][i], poles["D_out_s"][i], poles["motor_speed"][i], poles["L_active_s"][i]))
+        else:
+            print("%4d poles  infeasible" %(pole_num))
+
+    keywords = result["keywords"]
+    print("\nRegression, lightest feasible motor + gearbox of every keyword topology")
+    for i, topology in enumerate(keywords["keywords"]):
+        name = " ".join(topology)
+        if keywords["feasible"][i]:
+            print("%-30s %8.3f kg  %6.0f RPM  (%d motors)" %(name, keywords["wt"][i], keywords["motor_speed"][i], keywords["motors"][i]))
+        elif not keywords["realizable"][i]:
+            print("%-30s not realizable, %d motors in the catalog" %(name, keywords["motors"][i]))
+        else:
+            print("%-30s infeasible, its motors reach %.0f kW and %.0f RPM" %(name, keywords["max_power"][i], keywords["max_speed"][i]))
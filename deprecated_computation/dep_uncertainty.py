@@ -0,0 +1,181 @@
+import numpy as np
+import dep_input_file as input_file
+from dep_config import baseline
+from w_motor_reg import filter_data, query_data
+from w_gearbox import gearbox_weight
+from dep_computational_sizing_component import motor_gearbox_weight
+from dep_screening import optimal_motor_speed
+
+### Monte Carlo propagation of the uncertain technology assumptions (K_gearbox_metric, S_stress, P_factor, Motor_Density) and of the scatter of the motor
+### regression through the MotorGearbox chain to W_motor_gearbox. The regression uncertainty comes from bootstrap resampling of the catalog motors the
+### regression is fitted to. Samples are drawn and evaluated in chunks, each as one vectorized batch, and accumulated into streaming statistics whose
+### memory does not grow with the number of samples, so 10**6 samples and more take seconds.
+
+### Distributions: each returns a function of (rng, size) that draws samples ###
+def normal(mean, std):
+    return(lambda rng, size: rng.normal(mean, std, size))
+
+def uniform(lower, upper):
+    return(lambda rng, size: rng.uniform(lower, upper, size))
+
+def triangular(lower, mode, upper):
+    return(lambda rng, size: rng.triangular(lower, mode, upper, size))
+
+def fixed(value):
+    return(lambda rng, size: np.full(size, float(value)))
+
+def default_uncertainty(config = baseline): # spread of the technology assumptions around the configuration values
+    return({"K_gearbox_metric": normal(config.K_gearbox_metric, .1 * config.K_gearbox_metric),
+            "S_stress": triangular(.8 * config.S_stress, config.S_stress, 1.1 * config.S_stress),
+            "P_factor": uniform(.9, .98),
+            "Motor_Density": normal(config.Motor_Density, .05 * config.Motor_Density)})
+
+def bootstrap_coefficients(power, weight, num_samples, rng): # slope and intercept of the regression fitted to num_samples bootstrap resamples of the motors, as (num_samples, 2)
+    power = np.asarray(power, dtype = float)
+    weight = np.asarray(weight, dtype = float)
+    index = rng.randint(0, len(power), (num_samples, len(power)))
+    x = power[index]
+    y = weight[index]
+    dx = x - x.mean(axis = 1, keepdims = True)
+    variance = np.sum(dx**2, axis = 1)
+    full = np.polyfit(power, weight, 1)
+    degenerate = variance == 0   # every resampled motor has the same power, so the slope is undefined: keep the fit to all the motors
+    slope = np.where(degenerate, full[0], np.sum(dx * y, axis = 1) / np.where(degenerate, 1., variance))
+    intercept = np.where(degenerate, full[1], y.mean(axis = 1) - slope * x.mean(axis = 1))
+
+    return(np.column_stack([slope, intercept]))
+
+### Streaming statistics ###
+class StreamingStats(object): # Count, mean, variance, extremes and a histogram for percentiles, updated one batch at a time in constant memory
+
+    def __init__(self, bins = 4096):
+        self.bins = bins + bins % 2   # even, so that doubling the histogram range merges whole pairs of bins
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.                  # sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+        self.counts = None
+        self.lower = None
+        self.upper = None
+
+    def update(self, values):
+        values = np.ravel(np.asarray(values, dtype = float))
+        if np.size(values) == 0:
+            return
+        # merge the batch mean and variance into the running ones (Chan et al.)
+        n, mean, m2 = len(values), np.mean(values), np.sum((values - np.mean(values))**2)
+        delta = mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self.m2 += m2 + delta**2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, np.min(values))
+        self.max = max(self.max, np.max(values))
+
+        if self.counts is None:
+            spread = max(np.max(values) - np.min(values), 1e-12 * max(abs(np.mean(values)), 1.))
+            self.lower = np.min(values) - spread / 2
+            self.upper = np.max(values) + spread / 2
+            self.counts = np.zeros(self.bins, dtype = np.int64)
+        while self.min < self.lower or self.max >= self.upper:
+            self._double(self.max >= self.upper)
+        bin_index = ((values - self.lower) * (self.bins / (self.upper - self.lower))).astype(np.int64)
+        self.counts += np.bincount(np.clip(bin_index, 0, self.bins - 1), minlength = self.bins)
+
+    def _double(self, right): # doubles the histogram range to the right or to the left by merging pairs of bins
+        merged = self.counts.reshape(-1, 2).sum(axis = 1)
+        padding = np.zeros(self.bins // 2, dtype = np.int64)
+        width = self.upper - self.lower
+        if right:
+            self.counts = np.concatenate([merged, padding])
+            self.upper = self.lower + 2 * width
+        else:
+            self.counts = np.concatenate([padding, merged])
+            self.lower = self.upper - 2 * width
+
+    @property
+    def std(self):
+        return(np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.)
+
+    def percentile(self, q): # percentiles from the histogram, interpolated linearly inside a bin. Accurate to a bin width
+        q = np.asarray(q, dtype = float)
+        edges = np.linspace(self.lower, self.upper, self.bins + 1)
+        cumulative = np.concatenate([[0], np.cumsum(self.counts)]) / float(self.count)
+        values = np.interp(q / 100., cumulative, edges)
+
+        return(np.clip(values, self.min, self.max))
+
+    def merge(self, other): # combines the statistics of another StreamingStats, for example from another process
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(dict((name, np.copy(value) if isinstance(value, np.ndarray) else value) for name, value in other.__dict__.items()))
+            return
+        while other.min < self.lower or other.max >= self.upper:
+            self._double(other.max >= self.upper)
+        edges = np.linspace(other.lower, other.upper, other.bins + 1)
+        centers = np.clip((edges[:-1] + edges[1:]) / 2, other.min, other.max)   # other's samples are placed at their bin centers
+        bin_index = np.clip(((centers - self.lower) * (self.bins / (self.upper - self.lower))).astype(np.int64), 0, self.bins - 1)
+        self.counts += np.bincount(bin_index, weights = other.counts, minlength = self.bins).astype(np.int64)
+
+        delta = other.mean - self.mean
+        total = self.count + other.count
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta**2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+### Sampling ###
+def sample_weights(num_samples, rng, algorithm = "regression", power = 500., motor_rpm = 20000., prop_RPM = baseline.prop_RPM, num_motors = 4,
+                   uncertainty = None, motor_data = None, bootstrap = True, config = baseline, min_RPM = 1000., max_RPM = 20000.): # draws num_samples designs and returns their W_motor_gearbox and sampled inputs
+    uncertainty = default_uncertainty(config) if uncertainty is None else uncertainty
+    samples = dict((name, draw(rng, num_samples)) for name, draw in uncertainty.items())
+    K_gearbox = samples.get("K_gearbox_metric", np.full(num_samples, config.K_gearbox_metric))
+    HP_out = power * 1.34102
+
+    if algorithm == "regression":
+        if bootstrap:
+            coefficients = bootstrap_coefficients(motor_data[0], motor_data[1], num_samples, rng)
+        else:
+            coefficients = np.tile(np.polyfit(motor_data[0], motor_data[1], 1), (num_samples, 1))
+        samples["slope"], samples["intercept"] = coefficients[:, 0], coefficients[:, 1]
+        motor_wt = coefficients[:, 0] * power + coefficients[:, 1]
+        return(num_motors * (motor_wt + gearbox_weight(HP_out, K_gearbox, prop_RPM, motor_rpm)), samples)
+
+    if algorithm == "computation":
+        rho = samples.get("Motor_Density", np.full(num_samples, config.Motor_Density))
+        S_stress = samples.get("S_stress", np.full(num_samples, config.S_stress))
+        P_factor = samples.get("P_factor", np.full(num_samples, config.P_factor))
+        motor_speed = optimal_motor_speed(power, HP_out, K_gearbox, prop_RPM, min_RPM, max_RPM, rho, S_stress, P_factor)   # every sample is sized at its own optimal speed
+        samples["motor_speed"] = motor_speed
+        return(num_motors * motor_gearbox_weight(rho, power, HP_out, S_stress, P_factor, K_gearbox, prop_RPM, motor_speed), samples)
+
+    raise Exception("You have specified an algorithm of %s, choose from regression and computation" %(algorithm))
+
+def propagate(num_samples, algorithm = "regression", keywords = input_file.keywords, ranges = None, chunk_size = 100000, seed = 0, percentiles = (5, 50, 95), bins = 4096, **kwargs): # returns the statistics of W_motor_gearbox over num_samples Monte Carlo samples, drawn chunk_size at a time
+    rng = np.random.RandomState(seed)
+    motor_data = None
+    if algorithm == "regression":
+        motor_data = filter_data(keywords) if ranges is None else query_data(keywords, ranges)
+    stats = StreamingStats(bins)
+
+    for start in range(0, num_samples, chunk_size):
+        weights = sample_weights(min(chunk_size, num_samples - start), rng, algorithm, motor_data = motor_data, **kwargs)[0]
+        stats.update(weights)
+
+    return({"samples": stats.count, "mean": stats.mean, "std": stats.std, "min": stats.min, "max": stats.max,
+            "percentiles": dict(zip(percentiles, stats.percentile(percentiles))), "stats": stats})
+
+def test_uncertainty(num_samples = 100000):
+    return(propagate(num_samples, "regression"), propagate(num_samples, "computation"))
+
+if __name__ == "__main__":
+    from time import time
+
+    start = time()
+    regression, computation = test_uncertainty(10**6)
+    print("10**6 samples of each algorithm in %.2f s" %(time() - start))
+    for name, result in [("Regression", regression), ("Computation", computation)]:
+        print("%s W_motor_gearbox: mean %.2f kg, std %.2f kg, percentiles %s" %(name, result["mean"], result["std"], dict((q, round(v, 2)) for q, v in result["percentiles"].items())))
@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import hashlib
+import inspect
+import argparse
+from collections import namedtuple, OrderedDict
+from multiprocessing import Pool
+import numpy as np
+from openmdao.api import Problem
+from openmdao.utils.assert_utils import assert_check_partials
+from artifacts import _atomic_write
+
+### Derivative verification harness for the sizing components. Every component registered below is set up on its own and its declared partials are
+### compared to a complex step (or finite difference) by Problem.check_partials. Components are checked in parallel worker processes, and the key of every
+### component that passed (a hash of the source of the modules it is defined with, its options and the point it is checked at) is kept in cache_dir, so
+### components that have not changed since they last passed are skipped.
+### Example: python dep_verify_partials.py --jobs 4 --cache-dir .partials_cache
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))   # repository root, only modules below it are hashed
+
+### Registered components ###
+# Every check registers a factory returning the component and the values of the inputs it is checked at (the others keep their defaults)
+
+PartialsCheck = namedtuple("PartialsCheck", ["name", "factory", "method", "step", "atol", "rtol", "diagnostics"])
+checks = OrderedDict()
+
+def register_check(name, method = "cs", step = None, atol = 1e-6, rtol = 1e-6, diagnostics = ()): # decorator that registers a component factory under name. diagnostics are outputs without derivatives, left out of the check
+    if method not in ["cs", "fd"]:
+        raise Exception("You have specified a method of %s, choose from cs and fd" %(method))
+
+    def register(factory):
+        checks[name] = PartialsCheck(name, factory, method, (1e-40 if method == "cs" else 1e-6) if step is None else step, atol, rtol, tuple(diagnostics))
+        return(factory)
+
+    return(register)
+
+@register_check("gearbox")
+def gearbox_check():
+    from w_gearbox import GearboxWeight
+    return(GearboxWeight(), {"HP_out": 670.51, "R_RPM": 4000., "motor_speed": 15000.})
+
+@register_check("multistage_gearbox")
+def multistage_gearbox_check(): # vectorized, designs on both sides of the single to multi-stage switch
+    from w_gearbox import MultiStageGearboxWeight
+    R_RPM = np.linspace(200., 4000., 200)
+    return(MultiStageGearboxWeight(vec_size = len(R_RPM), max_stage_ratio = 6.), {"R_RPM": R_RPM, "motor_speed": 20000.})
+
+@register_check("regression")
+def regression_check():
+    from w_motor_reg import Regression
+    return(Regression(keywords = ["Axial"]), {"power": 500.})
+
+@register_check("num_motors")
+def num_motors_check():
+    from num_motors import NumMotors
+    return(NumMotors(num_motors = 4), {})
+
+@register_check("mission_sizing")
+def mission_sizing_check(): # vectorized, one input entry per time step
+    from mission_profile import MissionSizing
+    t = np.arange(1200.)
+    return(MissionSizing(num_nodes = len(t), dt = 1., peak_ratio = 1.3), {"power": 400. + 100. * np.sin(t / 300.) + 150. * np.exp(-((t - 600.) / 20.)**2)})
+
+@register_check("point_max")
+def point_max_check():
+    from multi_point import PointMax
+    return(PointMax(point_names = ["takeoff", "climb", "cruise"]), {"motor_wt_takeoff": 90., "motor_wt_climb": 85., "motor_wt_cruise": 60., "gb_wt_takeoff": 10., "gb_wt_climb": 12., "gb_wt_cruise": 8.})
+
+@register_check("computation")
+def computation_check():
+    from dep_computational_sizing_component import MotorGearboxWeight
+    return(MotorGearboxWeight(), {"motor_speed": 15000.})
+
+@register_check("region")
+def region_check():
+    from dep_region_sizing_component import RegionMotorGearboxWeight
+    return(RegionMotorGearboxWeight(), {"motor_speed": 15000.})
+
+@register_check("dep_num_motors_regression")
+def dep_num_motors_regression_check():
+    from dep_num_motors_component import NumMotors
+    return(NumMotors(algorithm = "regression", motors = 4), {})
+
+@register_check("dep_num_motors_computation")
+def dep_num_motors_computation_check():
+    from dep_num_motors_component import NumMotors
+    return(NumMotors(algorithm = "computation", motors = 4), {})
+
+@register_check("surrogate", method = "fd", step = 1., atol = 1e-4, rtol = 1e-4, diagnostics = ["wt_rmse", "extrapolation"])   # the surrogate takes the real part of its inputs, so it cannot be complex stepped
+def surrogate_check():
+    from dep_surrogate import train_surrogate, SurrogateMotorGearboxWeight
+    trained = train_surrogate({"motor_speed": (1000, 20000)}, fixed = {"P_out": 500, "HP_out": 500 * 1.34102}, num_samples = 40)
+    return(SurrogateMotorGearboxWeight(trained = trained), {"motor_speed": 12345.})
+
+### Hashing ###
+def _stable(value): # text of an option or input value that does not change between processes
+    if isinstance(value, dict):
+        return("{%s}" %", ".join("%r: %s" %(key, _stable(value[key])) for key in sorted(value, key = str)))
+    if isinstance(value, (list, tuple)):
+        return("[%s]" %", ".join(_stable(item) for item in value))
+    if isinstance(value, np.ndarray):
+        return(repr(value.tolist()))
+    text = repr(value)
+
+    return(type(value).__name__ if " at 0x" in text else text)   # objects without a value repr are covered by the source and output hashes
+
+def source_fingerprint(component): # hash of the source of the module the component is defined in and of the repository modules it uses
+    module = sys.modules[type(component).__module__]
+    modules = set([module])
+    for value in vars(module).values():
+        used = inspect.getmodule(value)
+        if used is not None and getattr(used, "__file__", None) and os.path.abspath(used.__file__).startswith(root):
+            modules.add(used)
+    sha = hashlib.sha1()
+    for used in sorted(modules, key = lambda used: used.__name__):
+        sha.update(inspect.getsource(used).encode("utf-8"))
+
+    return(sha.hexdigest())
+
+def check_key(check, component, inputs, outputs): # everything a pass result depends on. The outputs at the check point pick up changes in data files
+    text = "\n".join([source_fingerprint(component), type(component).__name__, _stable(dict((name, component.options[name]) for name in component.options)),
+                      _stable(inputs), _stable(outputs), _stable([check.method, check.step, check.atol, check.rtol, check.diagnostics])])
+
+    return(hashlib.sha1(text.encode("utf-8")).hexdigest())
+
+### Checking ###
+def _error(value): # an entry of the abs or rel error of check_partials, which is None for undeclared pairs and nan or inf when both Jacobians are zero
+    return(0. if value is None or not np.isfinite(value) else float(value))
+
+def check_component(name, passed = ()): # checks the partials of one registered component with Problem.check_partials and returns its errors. Skipped when its key is in passed
+    check = checks[name]
+    component, values = check.factory()
+    prob = Problem()
+    prob.model.add_subsystem("comp", component, promotes = ["*"])
+    prob.setup(check = False, force_alloc_complex = check.method == "cs")
+    for input_name, value in values.items():
+        prob[input_name] = value
+    prob.run_model()
+
+    inputs = OrderedDict((meta["prom_name"], np.copy(prob[meta["prom_name"]])) for abs_name, meta in component.list_inputs(prom_name = True, out_stream = None))
+    outputs = OrderedDict((meta["prom_name"], np.copy(prob[meta["prom_name"]])) for abs_name, meta in component.list_outputs(prom_name = True, out_stream = None))
+    key = check_key(check, component, inputs, outputs)
+    result = {"name": name, "key": key, "skipped": key in passed, "passed": key in passed, "max_abs": 0., "max_rel": 0., "worst": None}
+    if result["skipped"]:
+        return(result)
+
+    data = prob.check_partials(out_stream = None, includes = ["comp"], method = check.method, step = check.step, compact_print = True)
+    data["comp"] = dict((pair, error) for pair, error in data["comp"].items() if pair[0] not in check.diagnostics)
+    errors = [(_error(error["abs error"].forward), _error(error["rel error"].forward), pair) for pair, error in data["comp"].items()]
+    if errors:
+        worst = max(errors, key = lambda error: (error[0] > check.atol and error[1] > check.rtol, error[1]))
+        result.update({"max_abs": max(error[0] for error in errors), "max_rel": max(error[1] for error in errors), "worst": tuple(worst[2])})
+    try:
+        assert_check_partials(data, atol = check.atol, rtol = check.rtol)
+        result["passed"] = True
+    except ValueError:
+        result["passed"] = False
+
+    return(result)
+
+def _check_component(args):
+    return(check_component(*args))
+
+def _dump(passed, path):
+    with open(path, "w") as f:
+        json.dump(passed, f, indent = 1, sort_keys = True)
+
+def _cache_path(cache_dir):
+    return(os.path.join(cache_dir, "partials_passed.json"))
+
+def load_passed(cache_dir): # keys of the checks that passed, by component name
+    if cache_dir is None or not os.path.exists(_cache_path(cache_dir)):
+        return({})
+    with open(_cache_path(cache_dir)) as f:
+        return(json.load(f))
+
+def verify_partials(names = None, jobs = 1, cache_dir = None): # checks the registered components (all of them by default) and returns their results in registration order
+    names = list(checks) if names is None else list(names)
+    for name in names:
+        if name not in checks:
+            raise Exception("You have specified a component of %s, which is not registered, choose from %s" %(name, list(checks)))
+    passed = load_passed(cache_dir)
+    tasks = [(name, [passed[name]] if name in passed else []) for name in names]
+    if jobs == 1:
+        results = [check_component(*task) for task in tasks]
+    else:
+        with Pool(min(jobs, len(tasks))) as pool:
+            results = pool.map(_check_component, tasks, chunksize = 1)
+
+    if cache_dir is not None:
+        for result in results:
+            if result["passed"]:
+                passed[result["name"]] = result["key"]
+            else:
+                passed.pop(result["name"], None)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        _atomic_write(_cache_path(cache_dir), lambda tmp: _dump(passed, tmp))
+
+    return(results)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Check the partial derivatives of the registered sizing components")
+    parser.add_argument("names", nargs = "*", help = "components to check, all registered components by default")
+    parser.add_argument("--jobs", type = int, default = 1, help = "number of worker processes")
+    parser.add_argument("--cache-dir", default = None, help = "directory the keys of passed checks are kept in, components that have not changed are skipped")
+    args = parser.parse_args(argv)
+
+    results = verify_partials(args.names or None, args.jobs, args.cache_dir)
+    for result in results:
+        status = "skipped" if result["skipped"] else "passed" if result["passed"] else "FAILED"
+        print("%28s  %7s  abs %.2e  rel %.2e%s" %(result["name"], status, result["max_abs"], result["max_rel"], "" if result["passed"] else "  worst %s" %(result["worst"],)))
+
+    return(all(result["passed"] for result in results))
+
+if __name__ == "__main__":
+
+    sys.exit(0 if main() else 1)